@@ -0,0 +1,52 @@
+"""Add customer search indexes
+
+Revision ID: b5e1c7d2a9f4
+Revises: 73102ef2d3da
+Create Date: 2026-10-18 10:12:31.402317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1c7d2a9f4'
+down_revision: Union[str, None] = '73102ef2d3da'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns searched by GET /customers/search
+SEARCH_COLUMNS = ('name', 'email')
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Built concurrently, outside the migration transaction, so writes are not
+    # blocked while a large customers table is indexed
+    with op.get_context().autocommit_block():
+        for column in SEARCH_COLUMNS:
+            op.create_index(
+                f'ix_customers_{column}_prefix',
+                'customers',
+                [sa.text(f'lower({column}) text_pattern_ops')],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            op.create_index(
+                f'ix_customers_{column}_trgm',
+                'customers',
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in reversed(SEARCH_COLUMNS):
+            op.drop_index(f'ix_customers_{column}_trgm', table_name='customers', postgresql_concurrently=True, if_exists=True)
+            op.drop_index(f'ix_customers_{column}_prefix', table_name='customers', postgresql_concurrently=True, if_exists=True)
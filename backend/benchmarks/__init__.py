@@ -0,0 +1,7 @@
+"""Performance benchmarks for the CloudLinker backend."""
+
+import os
+
+# Benchmarks only need placeholder settings, reuse the test environment file
+# unless another one is given explicitly
+os.environ.setdefault("ENV_FILE", os.path.join(os.path.dirname(__file__), "..", "tests", ".env.test"))
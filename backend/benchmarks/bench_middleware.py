@@ -0,0 +1,132 @@
+"""Benchmark the per-request overhead of the API key / rate limit middleware.
+
+Compares the previous pair of BaseHTTPMiddleware classes with the pure ASGI
+APIKeyMiddleware by calling each ASGI stack directly, without any HTTP client or
+server in the way. Run from the backend directory:
+
+    python -m benchmarks.bench_middleware
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import HTTPException, Request
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from src.middleware.api_key import APIKeyMiddleware
+from src.middleware.rate_limit import RateLimiter, TokenBucket
+from src.settings import settings
+
+API_KEY = "bench_key"
+
+class LegacyAPIKeyMiddleware(BaseHTTPMiddleware):
+    """The previous API key middleware."""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path == "/health":
+            return await call_next(request)
+        api_key = request.headers.get("X-API-Key")
+        if not api_key:
+            raise HTTPException(status_code=401, detail="API key is missing")
+        valid_api_keys = [key.strip() for key in settings.api_keys.split(",")]
+        if api_key not in valid_api_keys:
+            raise HTTPException(status_code=401, detail="Invalid API key")
+        return await call_next(request)
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """The previous rate limit middleware."""
+
+    def __init__(self, app, requests_per_minute: int):
+        super().__init__(app)
+        self.requests_per_minute = requests_per_minute
+        self.token_buckets = {}
+        self.bucket_lock = asyncio.Lock()
+
+    async def get_bucket(self, api_key: str) -> TokenBucket:
+        async with self.bucket_lock:
+            if api_key not in self.token_buckets:
+                self.token_buckets[api_key] = TokenBucket(self.requests_per_minute, self.requests_per_minute / 60)
+            return self.token_buckets[api_key]
+
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path == "/health":
+            return await call_next(request)
+        api_key = request.headers.get("X-API-Key")
+        if not api_key:
+            return await call_next(request)
+        bucket = await self.get_bucket(api_key)
+        if await bucket.consume():
+            return await call_next(request)
+        return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded", "retry_after": 60})
+
+async def endpoint(request):
+    return PlainTextResponse("ok")
+
+def build_apps(requests_per_minute: int) -> dict:
+    """Build one application per middleware stack being compared."""
+    bare = Starlette(routes=[Route("/data", endpoint)])
+
+    legacy = Starlette(routes=[Route("/data", endpoint)])
+    legacy.add_middleware(LegacyRateLimitMiddleware, requests_per_minute=requests_per_minute)
+    legacy.add_middleware(LegacyAPIKeyMiddleware)
+
+    current = Starlette(routes=[Route("/data", endpoint)])
+    current.add_middleware(APIKeyMiddleware, rate_limiter=RateLimiter(requests_per_minute=requests_per_minute))
+
+    return {"no middleware": bare, "legacy BaseHTTPMiddleware": legacy, "pure ASGI": current}
+
+async def drive(app, requests: int) -> float:
+    """Send requests straight to an ASGI app and get the mean time per request."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/data",
+        "raw_path": b"/data",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"x-api-key", API_KEY.encode())],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    elapsed = time.perf_counter() - start
+    assert set(status) == {200}, set(status)
+    return elapsed / requests
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    settings.api_keys = f"other_key,{API_KEY}"
+    apps = build_apps(requests_per_minute=args.requests * 10)
+    for app in apps.values():
+        await drive(app, 200)
+
+    results = {name: await drive(app, args.requests) for name, app in apps.items()}
+    baseline = results["no middleware"]
+    print(f"{'stack':<28} {'µs/request':>11} {'overhead µs':>12}")
+    for name, seconds in results.items():
+        print(f"{name:<28} {seconds * 1e6:>11.1f} {(seconds - baseline) * 1e6:>12.1f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""Benchmark the SQL sanitizer against the previous per-keyword regex loop.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_sql_sanitizer
+"""
+
+import argparse
+import random
+import re
+import timeit
+
+from src.utils.sql_sanitizer import BLOCKED_KEYWORDS, _verdict, is_safe_select
+
+# Keyword list of the previous implementation, duplicates included
+LEGACY_BLOCKED_KEYWORDS = [
+    "UPDATE", "DELETE", "INSERT", "DROP", "TRUNCATE", "ALTER", "CREATE", "GRANT",
+    "REVOKE", "EXECUTE", "EXEC", "MERGE", "REPLACE", "LOAD", "COPY", "LOCK",
+    "UNLOCK", "COMMIT", "ROLLBACK", "SAVEPOINT", "SET", "SHOW", "USE", "DESCRIBE",
+    "EXPLAIN", "HELP", "SHUTDOWN", "KILL", "FLUSH", "RESET", "PURGE", "OPTIMIZE",
+    "REPAIR", "ANALYZE", "CHECK", "CHECKSUM", "BACKUP", "RESTORE", "IMPORT",
+    "EXPORT", "DUMP", "LOAD", "BULK", "INSERT", "BULK", "INSERT", "BULK", "INSERT"
+]
+
+def legacy_is_safe_select(sql: str) -> bool:
+    """The previous implementation: one regex search per blocked keyword."""
+    sql = sql.upper().strip()
+    if not sql.startswith("SELECT"):
+        return False
+    if ";" in sql:
+        return False
+    for keyword in LEGACY_BLOCKED_KEYWORDS:
+        pattern = r'\b' + re.escape(keyword) + r'\b'
+        if re.search(pattern, sql):
+            return False
+    if "UNION" in sql:
+        return False
+    if "--" in sql or "/*" in sql or "*/" in sql:
+        return False
+    return True
+
+def generate_query(conditions: int, seed: int) -> str:
+    """Build a long, safe SELECT resembling LLM generated SQL."""
+    rng = random.Random(seed)
+    columns = ", ".join(f"c.col_{i} AS alias_{i}" for i in range(conditions // 2 + 1))
+    where = " AND ".join(
+        rng.choice([
+            f"c.name ILIKE '%customer {i}%'",
+            f"c.id > {rng.randint(1, 10_000)}",
+            f"c.created_at >= '2024-{rng.randint(1, 12):02d}-01'",
+            f"o.total BETWEEN {rng.randint(1, 100)} AND {rng.randint(100, 1000)}",
+        ])
+        for i in range(conditions)
+    )
+    return (
+        f"SELECT {columns} FROM customers c "
+        f"JOIN orders o ON o.customer_id = c.id "
+        f"WHERE {where} ORDER BY c.created_at DESC LIMIT 100"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conditions", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'conditions':>10} {'length':>8} {'legacy µs':>10} {'scanner µs':>11} {'cached µs':>10} {'speedup':>8}")
+    for conditions in args.conditions:
+        sql = generate_query(conditions, seed=conditions)
+        assert legacy_is_safe_select(sql) == is_safe_select(sql)
+
+        legacy = timeit.timeit(lambda: legacy_is_safe_select(sql), number=args.number) / args.number
+        scanner = timeit.timeit(lambda: _verdict.__wrapped__(sql), number=args.number) / args.number
+        cached = timeit.timeit(lambda: is_safe_select(sql), number=args.number) / args.number
+        print(
+            f"{conditions:>10} {len(sql):>8} {legacy * 1e6:>10.1f} {scanner * 1e6:>11.1f} "
+            f"{cached * 1e6:>10.2f} {legacy / scanner:>7.1f}x"
+        )
+
+    print(f"\n{len(BLOCKED_KEYWORDS)} distinct blocked keywords (legacy list had {len(LEGACY_BLOCKED_KEYWORDS)})")
+
+if __name__ == "__main__":
+    main()
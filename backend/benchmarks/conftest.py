@@ -0,0 +1,139 @@
+"""Fixtures for the micro-benchmarks.
+
+Micro-benchmarks are not collected by the default test run; run them with:
+
+    python -m pytest benchmarks
+
+Each benchmark is compared with its baseline in baselines.json and fails when it
+is slower than the baseline by more than the threshold (--bench-threshold,
+default 0.5 for 50%). Timings are normalized by a calibration loop measured in
+the same run, so baselines recorded on one machine remain meaningful on another.
+The timings are listed in the terminal summary and recorded as test properties
+(e.g. in a --junitxml report). After an intended change in performance, record
+new baselines with:
+
+    python -m pytest benchmarks --bench-update
+"""
+
+import json
+import os
+import time
+from typing import Callable, Dict, List
+
+import pytest
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+# Number of times each measurement is repeated, the fastest one is kept
+REPEAT = 5
+
+# Result lines of the run, listed in the terminal summary
+SUMMARY_KEY = pytest.StashKey[List[str]]()
+
+def pytest_addoption(parser):
+    group = parser.getgroup("micro-benchmarks")
+    group.addoption(
+        "--bench-threshold",
+        type=float,
+        default=float(os.getenv("BENCH_THRESHOLD", "0.5")),
+        help="Allowed slowdown relative to the baseline, as a fraction (default 0.5)",
+    )
+    group.addoption(
+        "--bench-update",
+        action="store_true",
+        help="Record the measured timings as the new baselines",
+    )
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    lines = config.stash.get(SUMMARY_KEY, [])
+    if lines:
+        terminalreporter.section("micro-benchmarks")
+        for line in lines:
+            terminalreporter.write_line(line)
+
+def best_time(fn: Callable[[], None], number: int, repeat: int = REPEAT) -> float:
+    """Get the fastest time per call of a function over several repeats.
+
+    Args:
+        fn: The function to time
+        number: Calls per repeat
+        repeat: Number of repeats
+
+    Returns:
+        float: Seconds per call
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+def _calibration_loop() -> None:
+    """Fixed pure-Python workload used as the unit of every timing."""
+    total = 0
+    for i in range(1000):
+        total += i * i
+    values = {str(i): i for i in range(200)}
+    "".join(sorted(values))
+
+@pytest.fixture(scope="session")
+def baselines() -> Dict[str, float]:
+    """Baseline timings in calibration units, by benchmark name."""
+    if not os.path.exists(BASELINES_PATH):
+        return {}
+    with open(BASELINES_PATH) as baselines_file:
+        return json.load(baselines_file)["benchmarks"]
+
+@pytest.fixture(scope="session")
+def calibration() -> float:
+    """Seconds taken by the calibration loop on this machine."""
+    return best_time(_calibration_loop, number=200, repeat=REPEAT * 2)
+
+@pytest.fixture(scope="session")
+def measured(request):
+    """Timings measured in this run, written as baselines when --bench-update is given."""
+    results: Dict[str, float] = {}
+    yield results
+    if request.config.getoption("--bench-update") and results:
+        existing = {}
+        if os.path.exists(BASELINES_PATH):
+            with open(BASELINES_PATH) as baselines_file:
+                existing = json.load(baselines_file)["benchmarks"]
+        existing.update(results)
+        with open(BASELINES_PATH, "w") as baselines_file:
+            json.dump(
+                {"unit": "calibration loop runs", "benchmarks": dict(sorted(existing.items()))},
+                baselines_file,
+                indent=2,
+            )
+            baselines_file.write("\n")
+
+@pytest.fixture
+def bench(request, record_property, baselines, calibration, measured):
+    """Time a benchmark and compare it with its baseline.
+
+    Call it with the benchmark name, the function to time, the number of calls
+    per repeat and the number of operations each call performs; it returns the
+    measured seconds per operation.
+    """
+    summary = request.config.stash.setdefault(SUMMARY_KEY, [])
+    threshold = request.config.getoption("--bench-threshold")
+    update = request.config.getoption("--bench-update")
+
+    def run(name: str, fn: Callable[[], None], number: int, ops: int = 1) -> float:
+        seconds = best_time(fn, number) / ops
+        units = seconds / calibration
+        measured[name] = float(f"{units:.4g}")
+        baseline = baselines.get(name)
+        record_property(name, units)
+        summary.append(f"{name}: {seconds * 1e6:.2f} µs/op, {units:.3f} units (baseline {baseline})")
+        if not update and baseline is not None:
+            assert units <= baseline * (1 + threshold), (
+                f"{name} regressed: {units:.3f} units per call, "
+                f"baseline {baseline:.3f} (threshold +{threshold:.0%})"
+            )
+        return seconds
+
+    return run
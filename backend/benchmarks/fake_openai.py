@@ -0,0 +1,113 @@
+"""Local stand-in for the openai.AsyncOpenAI chat completions client.
+
+The fake answers chat completion requests with canned SQL after a configurable
+delay and fails a configurable fraction of calls, so the service can be measured
+without network access or API costs. Install it in place of the LLM backend's
+client:
+
+    translator.llm_backend.client = FakeAsyncOpenAI(latency=0.2, failure_rate=0.01)
+"""
+
+import asyncio
+import json
+import random
+import re
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+import httpx
+import openai
+
+_NUMBER_RE = re.compile(r"\d+")
+
+def default_answer(question: str) -> str:
+    """Answer a question with a customers query selecting on the first number in it.
+
+    Args:
+        question: The natural language question
+
+    Returns:
+        str: A SQL query over the customers table
+    """
+    match = _NUMBER_RE.search(question)
+    if match is None:
+        return "SELECT id, name, email FROM customers ORDER BY id LIMIT 10"
+    return f"SELECT id, name, email FROM customers WHERE id = {int(match.group())}"
+
+class FakeCompletions:
+    """The chat.completions resource of the fake client.
+
+    Attributes:
+        calls: Number of create calls received
+        failures: Number of create calls that raised an injected failure
+    """
+
+    def __init__(
+        self,
+        latency: float,
+        jitter: float,
+        failure_rate: float,
+        answer: Callable[[str], str],
+        rng: random.Random,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.answer = answer
+        self.rng = rng
+        self.calls = 0
+        self.failures = 0
+
+    async def create(self, *, messages: list, **kwargs) -> SimpleNamespace:
+        """Mimic AsyncOpenAI.chat.completions.create for JSON responses (single or batched).
+
+        Args:
+            messages: Chat messages, the last one holding the question
+            **kwargs: Other request parameters (ignored)
+
+        Returns:
+            SimpleNamespace: Object shaped like a ChatCompletion
+
+        Raises:
+            openai.APITimeoutError: For the injected fraction of failing calls
+        """
+        self.calls += 1
+        delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+        await asyncio.sleep(max(0.0, delay))
+
+        if self.rng.random() < self.failure_rate:
+            self.failures += 1
+            raise openai.APITimeoutError(request=httpx.Request("POST", "http://fake-openai/v1/chat/completions"))
+
+        question = messages[-1]["content"]
+        if question.startswith("["):
+            # Batched request: a JSON array of questions
+            content = json.dumps({"answers": [self.answer(item) for item in json.loads(question)]})
+        else:
+            content = json.dumps({"sql": self.answer(question)})
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")])
+
+class FakeAsyncOpenAI:
+    """Stand-in for openai.AsyncOpenAI exposing chat.completions.create."""
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        answer: Callable[[str], str] = default_answer,
+        seed: Optional[int] = None,
+    ):
+        """Initialize the fake client.
+
+        Args:
+            latency: Mean seconds each completion takes
+            jitter: Maximum deviation in seconds from the mean latency
+            failure_rate: Fraction of calls raising openai.APITimeoutError
+            answer: Function mapping a question to the SQL returned for it
+            seed: Seed of the latency and failure random generator
+        """
+        self.chat = SimpleNamespace(
+            completions=FakeCompletions(latency, jitter, failure_rate, answer, random.Random(seed))
+        )
@@ -0,0 +1,273 @@
+"""Load test the API with a fake LLM and a local SQLite database.
+
+The FastAPI app runs in-process behind httpx's ASGI transport. The translator
+talks to FakeAsyncOpenAI, which answers after a configurable latency and fails a
+configurable fraction of calls, and the database is a seeded SQLite file, so runs
+are reproducible and need neither network access nor PostgreSQL. Each scenario
+sends a fixed number of requests from a pool of concurrent clients and reports
+latency percentiles, throughput, status codes, peak memory and the mean time of
+each query stage. Run from the backend directory:
+
+    python -m benchmarks.load_test --concurrency 32 --requests 5000 --output run.json
+
+Results are printed and written as JSON so runs can be compared.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src import translator
+from src.db import get_db, get_read_db, get_session_factory
+from src.main import app
+from src.middleware.rate_limit import rate_limiter
+from src.models.customer import Base, Customer
+from src.services.result_cache import result_cache
+from src.services.translation_cache import translation_cache
+from src.settings import settings
+from src.translator.batching import TranslationBatcher
+from src.utils.metrics import STAGES, registry
+
+from .fake_openai import FakeAsyncOpenAI
+
+API_KEY = "load_test_key"
+SCENARIOS = ("query", "customers")
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Get a nearest-rank percentile of sorted values.
+
+    Args:
+        sorted_values: Values in ascending order
+        fraction: Percentile as a fraction between 0 and 1
+
+    Returns:
+        float: The percentile (0 for no values)
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def stage_totals() -> Dict[str, tuple]:
+    """Read the (count, sum) of every stage histogram from the metrics registry."""
+    totals = {}
+    for stage in STAGES:
+        labels = {"stage": stage}
+        totals[stage] = (
+            registry.get_sample_value("cloudlinker_query_stage_seconds_count", labels) or 0.0,
+            registry.get_sample_value("cloudlinker_query_stage_seconds_sum", labels) or 0.0,
+        )
+    return totals
+
+def max_rss_bytes() -> int:
+    """Get the peak resident set size of the process."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return max_rss if platform.system() == "Darwin" else max_rss * 1024
+
+async def seed_database(database_url: str, customers: int) -> sessionmaker:
+    """Create the schema in a fresh database and insert customers.
+
+    Args:
+        database_url: SQLAlchemy URL of the database
+        customers: Number of customers to insert
+
+    Returns:
+        sessionmaker: Factory creating sessions on the database
+    """
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        now = datetime.now(timezone.utc)
+        await conn.execute(insert(Customer), [
+            {"name": f"Customer {i}", "email": f"customer{i}@example.com", "created_at": now, "updated_at": now}
+            for i in range(1, customers + 1)
+        ])
+    return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+def request_factory(scenario: str, args: argparse.Namespace, rng: random.Random) -> Callable[[httpx.AsyncClient], "asyncio.Future"]:
+    """Build the function sending one request of a scenario."""
+    headers = {"X-API-Key": API_KEY}
+    if scenario == "query":
+        def send(client: httpx.AsyncClient):
+            question = args.question_template.format(n=rng.randint(1, args.distinct_questions))
+            return client.post("/query", json={"question": question}, headers=headers)
+    else:
+        def send(client: httpx.AsyncClient):
+            return client.get("/customers", params={"limit": args.page_size}, headers=headers)
+    return send
+
+async def run_scenario(client: httpx.AsyncClient, scenario: str, args: argparse.Namespace) -> dict:
+    """Send the requests of one scenario and summarize them.
+
+    Args:
+        client: HTTP client bound to the app
+        scenario: One of SCENARIOS
+        args: Command line arguments
+
+    Returns:
+        dict: Latency percentiles, throughput, status codes, memory and stage timings
+    """
+    send = request_factory(scenario, args, random.Random(args.seed))
+    for _ in range(args.warmup):
+        await send(client)
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    remaining = args.requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await send(client)
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    stages_before = stage_totals()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    stages_after = stage_totals()
+
+    latencies.sort()
+    stages = {}
+    for stage in STAGES:
+        count = stages_after[stage][0] - stages_before[stage][0]
+        if count:
+            total = stages_after[stage][1] - stages_before[stage][1]
+            stages[stage] = {"count": int(count), "mean_ms": total / count * 1000}
+
+    return {
+        "requests": len(latencies),
+        "elapsed_s": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p95": percentile(latencies, 0.95) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+            "max": latencies[-1] * 1000 if latencies else 0.0,
+        },
+        "status_codes": statuses,
+        "max_rss_bytes": max_rss_bytes(),
+        "stages": stages,
+    }
+
+async def run(args: argparse.Namespace) -> dict:
+    """Set up the fake LLM and database, then run every scenario."""
+    settings.api_keys = API_KEY
+    rate_limiter.requests_per_minute = 10 ** 9
+    rate_limiter.reset()
+    translation_cache.clear()
+    result_cache.clear()
+
+    fake_client = FakeAsyncOpenAI(
+        latency=args.llm_latency,
+        jitter=args.llm_jitter,
+        failure_rate=args.llm_failure_rate,
+        seed=args.seed,
+    )
+    llm_backend = translator.llm_backend
+    original_client, original_batcher = llm_backend.client, llm_backend.batcher
+    llm_backend.client = fake_client
+    if args.batch_window_ms:
+        llm_backend.batcher = TranslationBatcher(
+            llm_backend.complete_batch, llm_backend.complete, args.batch_window_ms / 1000, args.batch_max_size
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        session_factory = await seed_database(
+            f"sqlite+aiosqlite:///{os.path.join(directory, 'load_test.db')}", args.customers
+        )
+
+        async def override_get_db():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+
+        app.dependency_overrides[get_read_db] = override_get_db
+        app.dependency_overrides[get_session_factory] = lambda: session_factory
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+                scenarios = {scenario: await run_scenario(client, scenario, args) for scenario in args.scenarios}
+        finally:
+            app.dependency_overrides.clear()
+            llm_backend.client, llm_backend.batcher = original_client, original_batcher
+            await session_factory.kw["bind"].dispose()
+
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "llm": {"calls": fake_client.chat.completions.calls, "failures": fake_client.chat.completions.failures},
+        "scenarios": scenarios,
+    }
+
+def print_report(report: dict) -> None:
+    """Print a summary table of a report."""
+    print(f"{'scenario':<10} {'requests':>9} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max RSS MiB':>12}  status codes")
+    for scenario, result in report["scenarios"].items():
+        latency = result["latency_ms"]
+        print(
+            f"{scenario:<10} {result['requests']:>9} {result['rps']:>9.1f} {latency['p50']:>9.2f} "
+            f"{latency['p95']:>9.2f} {latency['p99']:>9.2f} {result['max_rss_bytes'] / 2 ** 20:>12.1f}  "
+            f"{result['status_codes']}"
+        )
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=list(SCENARIOS),
+                        help="Comma-separated scenarios to run: query, customers")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="Requests sent before measuring each scenario")
+    parser.add_argument("--customers", type=int, default=1000, help="Customers seeded in the database")
+    parser.add_argument("--page-size", type=int, default=100, help="Customers requested per page")
+    parser.add_argument("--distinct-questions", type=int, default=100, help="Distinct questions sent to /query")
+    parser.add_argument("--question-template", default="which customer signed up as number {n}",
+                        help="Question sent to /query, {n} is replaced by a number below --distinct-questions "
+                             "(the default goes to the LLM, e.g. 'show customer {n}' is answered locally)")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Mean fake LLM latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.02, help="Maximum deviation from the mean LLM latency")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0, help="Fraction of failing LLM calls")
+    parser.add_argument("--batch-window-ms", type=float, default=0.0,
+                        help="Micro-batch LLM requests within this window (0 disables)")
+    parser.add_argument("--batch-max-size", type=int, default=16, help="Maximum questions per batched LLM request")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of every random choice")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+def main() -> None:
+    args = parse_args()
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Micro-benchmarks of the hot paths of a request.
+
+Run with ``python -m pytest benchmarks``; see conftest.py for thresholds and
+baselines.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from src.middleware.api_key import APIKeyMiddleware
+from src.middleware.rate_limit import MemoryBackend, RateLimiter, SharedMemoryBackend
+from src.models.customer import Base, Customer
+from src.schemas.customer import CustomerRead
+from src.services.query_service import QueryService
+from src.settings import settings
+from src.utils.sql_sanitizer import _verdict, is_safe_select
+
+API_KEY = "bench_key"
+ROWS = 10_000
+
+# SQL shaped like the translator's output
+GENERATED_SQL = [
+    "SELECT * FROM customers",
+    "SELECT COUNT(*) AS total FROM customers",
+    "SELECT id, name, email FROM customers WHERE name LIKE '%John%' ORDER BY created_at DESC LIMIT 50",
+    "SELECT c.name, c.email, c.created_at FROM customers c WHERE c.created_at >= '2024-01-01' "
+    "AND c.email LIKE '%@example.com' ORDER BY c.created_at DESC, c.id LIMIT 100",
+    "SELECT DATE_TRUNC('month', created_at) AS month, COUNT(*) AS signups FROM customers "
+    "WHERE created_at BETWEEN '2023-01-01' AND '2023-12-31' GROUP BY 1 ORDER BY 1",
+    "SELECT name FROM customers WHERE id IN (SELECT id FROM customers WHERE email LIKE '%.org') "
+    "AND name <> 'O''Brien' ORDER BY name",
+]
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="module")
+def customer_rows() -> List[dict]:
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {"id": i, "name": f"Customer {i}", "email": f"customer{i}@example.com", "created_at": now, "updated_at": now}
+        for i in range(1, ROWS + 1)
+    ]
+
+def test_is_safe_select_uncached(bench):
+    """Full scan of generated SQL, as for a query seen for the first time."""
+    scan = _verdict.__wrapped__
+
+    def check_all():
+        for sql in GENERATED_SQL:
+            scan(sql)
+
+    bench("is_safe_select.uncached", check_all, number=2000, ops=len(GENERATED_SQL))
+
+def test_is_safe_select_cached(bench):
+    """Memoized verdict of a repeated query."""
+    def check_all():
+        for sql in GENERATED_SQL:
+            is_safe_select(sql)
+
+    bench("is_safe_select.cached", check_all, number=20000, ops=len(GENERATED_SQL))
+
+def test_rate_limiter_check(bench):
+    """Budget checks of requests from many keys, through the in-process backend."""
+    keys = [f"key_{i}" for i in range(100)]
+    limiter = RateLimiter(requests_per_minute=10 ** 12, backend=MemoryBackend(max_keys=len(keys)))
+
+    def check_all():
+        for key in keys:
+            limiter.check(key)
+
+    bench("rate_limiter.check", check_all, number=200, ops=len(keys))
+
+def test_rate_limiter_check_shared_contended(bench, tmp_path):
+    """Workers checking one key at once through the shared-memory backend.
+
+    Each thread maps the table through its own file descriptor, as the worker
+    processes do, so the checks contend for the flock of the table.
+    """
+    threads, calls = 4, 250
+    path = str(tmp_path / "rate-limit")
+    limiters = [
+        RateLimiter(requests_per_minute=10 ** 12, backend=SharedMemoryBackend(path, slots=1024))
+        for _ in range(threads)
+    ]
+
+    def worker(limiter):
+        for _ in range(calls):
+            limiter.check("shared")
+
+    with ThreadPoolExecutor(threads) as executor:
+        def contend():
+            list(executor.map(worker, limiters))
+
+        bench("rate_limiter.check_shared_contended", contend, number=10, ops=threads * calls)
+    for limiter in limiters:
+        limiter.backend.close()
+
+def test_api_key_middleware_dispatch(bench, loop, monkeypatch):
+    """Key validation and rate limiting of one request, without HTTP parsing."""
+    monkeypatch.setattr(settings, "api_keys", f"other_key,{API_KEY}")
+
+    async def endpoint(request):
+        return PlainTextResponse("ok")
+
+    app = APIKeyMiddleware(
+        Starlette(routes=[Route("/data", endpoint)]),
+        rate_limiter=RateLimiter(requests_per_minute=10 ** 12),
+    )
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/data",
+        "raw_path": b"/data",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"x-api-key", API_KEY.encode())],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    requests = 200
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200
+
+    async def dispatch():
+        for _ in range(requests):
+            await app(dict(scope), receive, send)
+
+    bench("api_key_middleware.dispatch", lambda: loop.run_until_complete(dispatch()), number=10, ops=requests)
+
+def test_customer_read_serialization(bench, customer_rows):
+    """Validating and encoding 10k customers through the CustomerRead schema."""
+    adapter = TypeAdapter(List[CustomerRead])
+    bench("customer_read.serialize_10k", lambda: adapter.dump_json(adapter.validate_python(customer_rows)), number=3)
+
+def test_fetch_rows(bench, loop, customer_rows):
+    """Executing a generated query over 10k customers and materializing its rows."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(Customer), customer_rows)
+
+    loop.run_until_complete(setup())
+    session = AsyncSession(engine)
+    try:
+        rows = loop.run_until_complete(QueryService._fetch_rows(session, "SELECT * FROM customers"))
+        assert len(rows) == ROWS and len(rows.columns) == 5
+
+        bench(
+            "query_service.fetch_rows_10k",
+            lambda: loop.run_until_complete(QueryService._fetch_rows(session, "SELECT * FROM customers")),
+            number=5,
+        )
+    finally:
+        loop.run_until_complete(session.close())
+        loop.run_until_complete(engine.dispose())
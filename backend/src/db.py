@@ -1,19 +1,245 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import text
-from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+"""Database engines and sessions.
+
+Writes go to the primary (DATABASE_URL). Generated queries read from the
+replicas of DATABASE_READ_URLS in round-robin, so analytic traffic does not
+compete with writes for connections; without replicas they read from the
+primary through a pool of their own. Each engine has its own pool settings.
+
+A replica whose connections fail is left out for DB_REPLICA_RETRY seconds, and
+reads fall back to the primary when no replica is left. The pools time their
+checkouts and count invalidations. Connections are replaced after
+DB_POOL_RECYCLE seconds; with DB_POOL_PRE_PING off they are not pinged on
+checkout, and a connection found broken by a query is invalidated by SQLAlchemy
+so the next checkout opens a new one.
+With DB_READ_YOUR_WRITES set, a client that has just written reads from the
+primary for that many seconds, so it sees its own writes despite replication
+lag.
+"""
+
+import itertools
+import time
+from functools import partial
+from typing import AsyncGenerator, Callable, Dict, List
+
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from .settings import settings
+from .utils.logger import get_logger
+from .utils.metrics import POOL_CHECKOUTS, POOL_INVALIDATIONS, POOL_WAIT_SECONDS, REPLICA_FAILOVERS
+
+logger = get_logger(__name__)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool observing how long checkouts wait for a connection.
+
+    Attributes:
+        label: Engine name used as the metrics label
+    """
+
+    label = "primary"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT_SECONDS.labels(self.label).observe(time.perf_counter() - start)
+
+    def saturated(self) -> bool:
+        """Check whether every connection the pool may open is checked out."""
+        return self.checkedin() == 0 and self._max_overflow >= 0 and self.overflow() >= self._max_overflow
+
+    def recreate(self) -> "InstrumentedPool":
+        pool = super().recreate()
+        pool.label = self.label
+        return pool
+
+def create_engine(
+    url: str,
+    label: str,
+    pool_size: int,
+    max_overflow: int,
+    pool_timeout: float,
+    pre_ping: bool = True,
+    pool_recycle: float = -1,
+) -> AsyncEngine:
+    """Create an async engine with its own instrumented connection pool.
+
+    Args:
+        url: The database URL
+        label: Engine name used as the metrics label
+        pool_size: Connections kept open in the pool
+        max_overflow: Connections opened beyond pool_size under load
+        pool_timeout: Seconds to wait for a free connection
+        pre_ping: Whether connections are pinged on every checkout
+        pool_recycle: Seconds after which a connection is replaced (-1 never)
+
+    Returns:
+        AsyncEngine: The engine
+    """
+    engine = create_async_engine(
+        url,
+        echo=False,  # Set to True for SQL query logging
+        poolclass=InstrumentedPool,
+        pool_pre_ping=pre_ping,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+    )
+    pool = engine.sync_engine.pool
+    pool.label = label
+    event.listen(pool, "checkout", partial(_count_checkout, label))
+    event.listen(pool, "invalidate", partial(_count_invalidation, label))
+    event.listen(pool, "soft_invalidate", partial(_count_invalidation, label))
+    return engine
+
+def _count_checkout(label: str, dbapi_connection, connection_record, connection_proxy) -> None:
+    """Count connections checked out of a pool."""
+    POOL_CHECKOUTS.labels(label).inc()
+
+def _count_invalidation(label: str, dbapi_connection, connection_record, exception) -> None:
+    """Count connections invalidated in a pool."""
+    POOL_INVALIDATIONS.labels(label).inc()
+
+class ReadRouter:
+    """Round-robin over the read replicas, skipping replicas whose connections failed."""
+
+    def __init__(self, replicas: List[AsyncEngine], primary: AsyncEngine, retry_interval: float):
+        """Initialize the router.
+
+        Args:
+            replicas: Engines of the read replicas
+            primary: Engine used when there is no healthy replica
+            retry_interval: Seconds a failed replica is left out
+        """
+        self.replicas = replicas
+        self.primary = primary
+        self.retry_interval = retry_interval
+        self._down_until: Dict[AsyncEngine, float] = {}
+        self._next = itertools.cycle(range(len(replicas))) if replicas else None
+        for replica in replicas:
+            event.listen(replica.sync_engine, "handle_error", self._make_error_handler(replica))
+
+    def pick(self) -> AsyncEngine:
+        """Get the engine for the next read.
+
+        Returns:
+            AsyncEngine: The next healthy replica, or the primary when none is healthy
+        """
+        if self._next is None:
+            return self.primary
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._next)]
+            if self._down_until.get(replica, 0.0) <= now:
+                return replica
+        return self.primary
+
+    def mark_down(self, replica: AsyncEngine) -> None:
+        """Leave a replica out of the rotation for retry_interval seconds."""
+        if self._down_until.get(replica, 0.0) <= time.monotonic():
+            REPLICA_FAILOVERS.inc()
+            logger.warning("db.replica.down", replica=replica.url.render_as_string(), retry_in=self.retry_interval)
+        self._down_until[replica] = time.monotonic() + self.retry_interval
+
+    def mark_up(self, replica: AsyncEngine) -> None:
+        """Put a replica back into the rotation."""
+        self._down_until.pop(replica, None)
+
+    def healthy(self) -> List[AsyncEngine]:
+        """Get the replicas currently in the rotation."""
+        now = time.monotonic()
+        return [replica for replica in self.replicas if self._down_until.get(replica, 0.0) <= now]
+
+    def _make_error_handler(self, replica: AsyncEngine) -> Callable:
+        """Create the handle_error listener marking a replica down on connection failures."""
+        def handle_error(context) -> None:
+            # No connection means the connection could not be established
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(replica)
+        return handle_error
+
+class WritePins:
+    """Clients that wrote recently, whose reads go to the primary (read-your-writes)."""
+
+    def __init__(self, window: float, max_clients: int = 10000):
+        """Initialize the pins.
+
+        Args:
+            window: Seconds a client reads from the primary after a write (0 disables pinning)
+            max_clients: Pins kept before expired pins are dropped
+        """
+        self.window = window
+        self.max_clients = max_clients
+        self._until: Dict[str, float] = {}
+
+    def pin(self, client: str) -> None:
+        """Send the reads of a client to the primary for the next window seconds."""
+        if self.window <= 0:
+            return
+        now = time.monotonic()
+        if len(self._until) >= self.max_clients:
+            self._until = {key: until for key, until in self._until.items() if until > now}
+        self._until[client] = now + self.window
+
+    def pinned(self, client: str) -> bool:
+        """Check whether the reads of a client go to the primary."""
+        return self._until.get(client, 0.0) > time.monotonic()
 
-# Create async engine
-engine = create_async_engine(
+    def clear(self) -> None:
+        """Forget every pin."""
+        self._until.clear()
+
+# Engine of the primary, used for writes
+engine = create_engine(
     settings.database_url,
-    echo=False,  # Set to True for SQL query logging
-    pool_pre_ping=True,  # Enable connection health checks
+    label="primary",
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pre_ping=settings.db_pool_pre_ping,
+    pool_recycle=settings.db_pool_recycle,
 )
 
-# Create async session factory
+def _read_engines() -> List[AsyncEngine]:
+    """Create the engines of the read replicas, or a read pool on the primary without replicas."""
+    urls = [url.strip() for url in settings.database_read_urls.split(",") if url.strip()]
+    labels = [f"replica{n}" for n in range(1, len(urls) + 1)] if urls else ["read"]
+    return [
+        create_engine(
+            url,
+            label=label,
+            pool_size=settings.db_read_pool_size,
+            max_overflow=settings.db_read_max_overflow,
+            pool_timeout=settings.db_read_pool_timeout,
+            pre_ping=settings.db_pool_pre_ping,
+            pool_recycle=settings.db_pool_recycle,
+        )
+        for label, url in zip(labels, urls or [settings.database_url])
+    ]
+
+# Read engines, the primary being the fallback when every replica is down
+read_engines = _read_engines()
+read_router = ReadRouter(read_engines, engine, settings.db_replica_retry)
+write_pins = WritePins(settings.db_read_your_writes)
+
+def engines() -> Dict[str, AsyncEngine]:
+    """Get every engine by its metrics label.
+
+    Returns:
+        dict: The primary, then the read engines
+    """
+    return {
+        each.sync_engine.pool.label: each
+        for each in (engine, *read_engines)
+    }
+
+# Create async session factory (primary)
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -22,10 +248,51 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False,
 )
 
-@asynccontextmanager
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Provide a transactional scope around a series of operations.
-    
+def ReadSessionLocal() -> AsyncSession:
+    """Create a session on the next read engine.
+
+    Returns:
+        AsyncSession: A session bound to a replica (or the primary as a fallback)
+    """
+    return AsyncSession(bind=read_router.pick(), expire_on_commit=False, autoflush=False)
+
+def note_write(session: Session) -> None:
+    """Record that the transaction of a session wrote, for read-your-writes pinning.
+
+    ORM flushes are recorded automatically; Core statements must be recorded
+    with this function.
+
+    Args:
+        session: The session (sync or async) running the transaction
+    """
+    session.info["pending_writes"] = True
+
+@event.listens_for(Session, "after_flush")
+def _note_pending_writes(session: Session, flush_context) -> None:
+    """Remember that the transaction wrote, for read-your-writes pinning."""
+    note_write(session)
+
+@event.listens_for(Session, "after_commit")
+def _note_committed_writes(session: Session) -> None:
+    """Remember that the session committed writes."""
+    if session.info.pop("pending_writes", False):
+        session.info["committed_writes"] = True
+
+@event.listens_for(Session, "after_rollback")
+def _forget_pending_writes(session: Session) -> None:
+    """Forget the writes of a rolled back transaction."""
+    session.info.pop("pending_writes", None)
+
+def client_key(request: Request) -> str:
+    """Identify the client of a request for read-your-writes pinning."""
+    return request.headers.get("X-API-Key") or (request.client.host if request.client else "")
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Provide a session on the primary, for writes and reads of the written data.
+
+    Args:
+        request: The current request (its client is pinned to the primary after a write)
+
     Yields:
         AsyncSession: Database session for performing operations
     """
@@ -36,17 +303,49 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
             raise
         finally:
+            if session.info.pop("committed_writes", False):
+                write_pins.pin(client_key(request))
             await session.close()
 
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Provide a session for generated read-only queries.
+
+    Args:
+        request: The current request
+
+    Yields:
+        AsyncSession: Session on a read replica (or the primary, see get_session_factory)
+    """
+    async with get_session_factory(request)() as session:
+        yield session
+
+def get_session_factory(request: Request) -> Callable[[], AsyncSession]:
+    """Provide the session factory for work that outlives the request handler.
+
+    Streaming responses keep reading from the database after the handler has
+    returned, so they open and close their own session with this factory. It
+    creates read sessions, as only generated queries use it.
+
+    Args:
+        request: The current request
+
+    Returns:
+        Callable: ReadSessionLocal, or AsyncSessionLocal while the client is
+            pinned to the primary after a write
+    """
+    if write_pins.pinned(client_key(request)):
+        return AsyncSessionLocal
+    return ReadSessionLocal
+
 async def test_connection() -> int:
     """Test database connection by executing a simple query.
-    
+
     Returns:
         int: Result of SELECT 1 query (should be 1)
-        
+
     Raises:
         Exception: If database connection fails
     """
     async with engine.connect() as conn:
         result = await conn.execute(text("SELECT 1"))
-        return result.scalar()
\ No newline at end of file
+        return result.scalar()
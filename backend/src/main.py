@@ -1,10 +1,24 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from .settings import settings
 from .db import test_connection
-from .routers import customers, query  # Import the query router
+from .routers import customers, metrics, query  # Import the routers
 from .middleware.api_key import APIKeyMiddleware  # Import the API key middleware
-from .middleware.rate_limit import RateLimitMiddleware  # Import the rate limit middleware
+from .middleware.rate_limit import rate_limiter  # Import the shared rate limiter
+from .services.readiness import readiness_probe
+from .utils.logger import configure_logging, log_queue
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Configure logging and start the readiness probe on startup; stop them on shutdown."""
+    configure_logging()
+    readiness_probe.start()
+    yield
+    await readiness_probe.stop()
+    log_queue.stop()
 
 app = FastAPI(
     title="CloudLinker API",
@@ -12,6 +26,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -21,17 +36,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
-# Add rate limiting middleware (before API key middleware)
-app.add_middleware(RateLimitMiddleware)
-
-# Add API key middleware
-app.add_middleware(APIKeyMiddleware)
+# Add API key middleware (also applies rate limiting to valid keys)
+app.add_middleware(APIKeyMiddleware, rate_limiter=rate_limiter)
 
 # Include the routers
 app.include_router(customers.router, prefix="/customers", tags=["customers"])
 app.include_router(query.router, prefix="/query", tags=["query"])
+app.include_router(metrics.router, prefix="/metrics", tags=["health"])
 
 @app.get("/health", tags=["health"])
 async def health() -> dict[str, bool]:
@@ -42,6 +56,18 @@ async def health() -> dict[str, bool]:
     """
     return {"ok": True}
 
+@app.get("/ready", tags=["health"])
+async def ready() -> JSONResponse:
+    """Check if the API can serve requests, from the last background database probe.
+    
+    No connection is opened by this route, so it can be polled often.
+    
+    Returns:
+        JSONResponse: 200 with the per-engine checks when ready, 503 otherwise
+    """
+    is_ready, body = readiness_probe.status()
+    return JSONResponse(body, status_code=200 if is_ready else 503)
+
 @app.get("/test-db", tags=["health"])
 async def test_db() -> dict[str, str]:
     """Test database connection.
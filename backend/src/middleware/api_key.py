@@ -1,57 +1,167 @@
 """API key middleware for authentication.
 
-This module provides middleware for validating API keys from request headers.
+This module provides middleware for validating API keys from request headers and
+applying per-key rate limits in the same pass.
 """
 
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+import hashlib
+import hmac
+import json
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from ..settings import settings
+from ..utils.logger import get_logger
+from .rate_limit import RateLimiter, retry_after_seconds
+
+logger = get_logger(__name__)
+
+API_KEY_HEADER = b"x-api-key"
+
+# Paths served without an API key (and without rate limiting)
+EXEMPT_PATHS = frozenset({"/health", "/ready", "/metrics"})
+
+def hash_api_key(api_key: str) -> bytes:
+    """Hash an API key so keys are compared as fixed-size digests.
+
+    Args:
+        api_key: The API key
+
+    Returns:
+        bytes: SHA-256 digest of the key
+    """
+    return hashlib.sha256(api_key.encode()).digest()
+
+class APIKeyMiddleware:
+    """Middleware for validating API keys and rate limiting requests.
+
+    This is a pure ASGI middleware: it reads the X-API-Key header straight from
+    the connection scope and either answers with an error or hands the untouched
+    scope, receive and send callables to the application, so streaming responses
+    pass through without extra tasks or buffering.
 
-class APIKeyMiddleware(BaseHTTPMiddleware):
-    """Middleware for validating API keys.
-    
-    This middleware checks for the presence of an X-API-Key header in the request
-    and validates it against the list of valid API keys in the settings.
+    Valid keys are kept as a precomputed set of SHA-256 digests, rebuilt only when
+    the API_KEYS setting changes, and compared in constant time.
     """
-    
-    async def dispatch(self, request: Request, call_next):
-        """Process the request and validate the API key.
-        
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate_limiter: Optional[RateLimiter] = None,
+        exempt_paths: Iterable[str] = EXEMPT_PATHS,
+    ):
+        """Initialize the API key middleware.
+
         Args:
-            request: The incoming request
-            call_next: The next middleware or route handler
-            
-        Returns:
-            Response: The response from the next middleware or route handler
-            
-        Raises:
-            HTTPException: If the API key is missing or invalid
+            app: The ASGI application
+            rate_limiter: Rate limiter applied to requests with a valid key (None disables rate limiting)
+            exempt_paths: Paths that skip API key validation and rate limiting
+        """
+        self.app = app
+        self.rate_limiter = rate_limiter
+        self.exempt_paths = frozenset(exempt_paths)
+        self._raw_api_keys: Optional[str] = None
+        self._key_digests: Tuple[bytes, ...] = ()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Validate the API key and apply rate limiting before calling the application.
+
+        Args:
+            scope: The connection scope
+            receive: The ASGI receive callable
+            send: The ASGI send callable
         """
-        # Skip API key validation for health check endpoint
-        if request.url.path == "/health":
-            return await call_next(request)
-        
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
         # Get the API key from the request header
-        api_key = request.headers.get("X-API-Key")
-        
+        api_key = None
+        for name, value in scope["headers"]:
+            if name == API_KEY_HEADER:
+                api_key = value.decode("latin-1")
+                break
+
         # Check if the API key is present
         if not api_key:
-            raise HTTPException(
-                status_code=401,
-                detail="API key is missing"
-            )
-        
-        # Get the list of valid API keys from settings
-        valid_api_keys = [key.strip() for key in settings.api_keys.split(",")]
-        
+            await _send_json(send, 401, {"detail": "API key is missing"})
+            return
+
         # Check if the API key is valid
-        if api_key not in valid_api_keys:
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid API key"
+        if not self.is_valid(api_key):
+            await _send_json(send, 401, {"detail": "Invalid API key"})
+            return
+
+        wait = self.rate_limiter.check(api_key) if self.rate_limiter is not None else 0.0
+        if wait:
+            retry_after = retry_after_seconds(wait)
+            logger.warning("rate_limit.exceeded", api_key_hash=hash(api_key), retry_after=retry_after)
+            await _send_json(
+                send,
+                429,
+                {
+                    "detail": "Rate limit exceeded. Please try again later.",
+                    "retry_after": retry_after,
+                },
+                headers=[(b"retry-after", str(retry_after).encode())],
             )
-        
+            return
+
         # Continue to the next middleware or route handler
-        return await call_next(request) 
\ No newline at end of file
+        await self.app(scope, receive, send)
+
+    def is_valid(self, api_key: str) -> bool:
+        """Check an API key against the configured keys.
+
+        Every configured key is compared, without stopping at the first match,
+        so the time taken does not reveal which key matched.
+
+        Args:
+            api_key: The API key from the request
+
+        Returns:
+            bool: True if the key is one of the configured API keys
+        """
+        digest = hash_api_key(api_key)
+        valid = False
+        for key_digest in self.valid_key_digests():
+            valid |= hmac.compare_digest(digest, key_digest)
+        return valid
+
+    def valid_key_digests(self) -> Tuple[bytes, ...]:
+        """Get the digests of the configured API keys.
+
+        Returns:
+            tuple: SHA-256 digests of the keys in the API_KEYS setting
+        """
+        raw_api_keys = settings.api_keys
+        if raw_api_keys != self._raw_api_keys:
+            self._key_digests = tuple(parse_api_keys(raw_api_keys))
+            self._raw_api_keys = raw_api_keys
+        return self._key_digests
+
+def parse_api_keys(raw_api_keys: str) -> FrozenSet[bytes]:
+    """Parse the comma-separated API_KEYS setting into key digests.
+
+    Args:
+        raw_api_keys: Comma-separated list of API keys
+
+    Returns:
+        frozenset: SHA-256 digests of the non-empty keys
+    """
+    return frozenset(hash_api_key(key.strip()) for key in raw_api_keys.split(",") if key.strip())
+
+async def _send_json(send: Send, status_code: int, content: dict, headers: Optional[list] = None) -> None:
+    """Send a complete JSON response."""
+    body = json.dumps(content).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *(headers or []),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
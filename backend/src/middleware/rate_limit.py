@@ -1,19 +1,23 @@
-"""Rate limiting middleware.
+"""Rate limiting for API requests.
 
-This module provides middleware for rate limiting API requests using a token bucket algorithm.
+This module provides rate limiting of API requests using a token bucket algorithm.
+Bucket state lives in a pluggable backend: an in-process backend for a single
+worker, and a shared-memory backend that enforces one limit across all the
+uvicorn workers of a host.
 """
 
-import asyncio
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
 import time
-from typing import Dict, Tuple
+from collections import OrderedDict
+from typing import Dict, Optional
 
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
-
-from ..utils.logger import get_logger
-
-logger = get_logger(__name__)
+from ..settings import settings
 
 # Rate limit configuration
 REQUESTS_PER_MINUTE = 30
@@ -22,118 +26,344 @@ TOKEN_REFILL_RATE = REQUESTS_PER_MINUTE / 60  # tokens per second
 
 class TokenBucket:
     """Token bucket for rate limiting.
-    
-    This class implements a token bucket algorithm for rate limiting.
+
+    This class implements a token bucket algorithm for rate limiting. Updates
+    never await, so a bucket is consistent within an event loop without a lock.
     """
-    
-    def __init__(self, capacity: int, refill_rate: float):
+
+    __slots__ = ("capacity", "refill_rate", "tokens", "last_update")
+
+    def __init__(self, capacity: float, refill_rate: float, now: Optional[float] = None):
         """Initialize the token bucket.
-        
+
         Args:
             capacity: Maximum number of tokens the bucket can hold
             refill_rate: Number of tokens to add per second
+            now: Creation time (defaults to the current monotonic time)
         """
         self.capacity = capacity
         self.refill_rate = refill_rate
         self.tokens = capacity
-        self.last_update = time.time()
-        self.lock = asyncio.Lock()
-    
+        self.last_update = time.monotonic() if now is None else now
+
+    def take(self, now: Optional[float] = None) -> float:
+        """Take a token from the bucket if one is available.
+
+        Args:
+            now: Current monotonic time (read from the clock when omitted)
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until one is available
+        """
+        if now is None:
+            now = time.monotonic()
+        # Add new tokens based on time passed
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_update) * self.refill_rate)
+        self.last_update = now
+
+        # Check if there are enough tokens
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.refill_rate
+
     async def consume(self) -> bool:
         """Consume a token from the bucket.
-        
+
         Returns:
             bool: True if a token was consumed, False otherwise
         """
-        async with self.lock:
-            now = time.time()
-            # Calculate time passed since last update
-            time_passed = now - self.last_update
-            # Add new tokens based on time passed
-            new_tokens = time_passed * self.refill_rate
-            self.tokens = min(self.capacity, self.tokens + new_tokens)
-            self.last_update = now
-            
-            # Check if there are enough tokens
-            if self.tokens >= 1:
-                self.tokens -= 1
-                return True
-            return False
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Middleware for rate limiting API requests.
-    
-    This middleware limits the number of requests a client can make per minute
-    using a token bucket algorithm.
+        return self.take() == 0.0
+
+    def is_idle(self, now: float) -> bool:
+        """Check whether the bucket has refilled completely.
+
+        A full bucket behaves exactly like a missing one, so it can be dropped.
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            bool: True if the bucket would be full at this time
+        """
+        return self.tokens + (now - self.last_update) * self.refill_rate >= self.capacity
+
+class RateLimitBackend:
+    """Storage of token bucket state.
+
+    Backends take one token for a key and report how long the caller has to wait
+    when none is left.
+    """
+
+    def take(self, key: str, capacity: float, refill_rate: float) -> float:
+        """Take a token from the bucket of a key.
+
+        Args:
+            key: The rate limited key
+            capacity: Bucket capacity for this key
+            refill_rate: Tokens added per second for this key
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until one is available
+        """
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        """Forget every bucket."""
+        raise NotImplementedError
+
+class MemoryBackend(RateLimitBackend):
+    """In-process backend keeping __slots__ buckets in LRU order.
+
+    Buckets that have refilled completely are evicted as they reach the front of
+    the LRU order, and the least recently used bucket is dropped once max_keys
+    buckets exist, so memory stays bounded however many keys are seen.
     """
-    
-    def __init__(self, app, requests_per_minute: int = REQUESTS_PER_MINUTE):
-        """Initialize the rate limit middleware.
-        
+
+    def __init__(self, max_keys: int):
+        """Initialize the memory backend.
+
         Args:
-            app: The ASGI application
-            requests_per_minute: Maximum number of requests per minute
+            max_keys: Maximum number of buckets kept
+        """
+        self.max_keys = max_keys
+        self.token_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.evictions = 0
+
+    def take(self, key: str, capacity: float, refill_rate: float) -> float:
+        now = time.monotonic()
+        bucket = self.token_buckets.get(key)
+        if bucket is None or bucket.capacity != capacity:
+            bucket = self.token_buckets[key] = TokenBucket(capacity, refill_rate, now)
+        else:
+            bucket.refill_rate = refill_rate
+        self.token_buckets.move_to_end(key)
+        wait = bucket.take(now)
+        self._evict(now)
+        return wait
+
+    def _evict(self, now: float) -> None:
+        """Drop idle buckets from the front of the LRU order and enforce max_keys."""
+        buckets = self.token_buckets
+        while buckets:
+            oldest_key = next(iter(buckets))
+            if len(buckets) <= self.max_keys and not buckets[oldest_key].is_idle(now):
+                break
+            del buckets[oldest_key]
+            self.evictions += 1
+
+    def reset(self) -> None:
+        self.token_buckets.clear()
+
+class SharedMemoryBackend(RateLimitBackend):
+    """Backend sharing bucket state between processes through a memory-mapped file.
+
+    Buckets are stored in a fixed-size open-addressing table of packed slots
+    (key digest, tokens, last update, capacity, refill rate), so every worker
+    process mapping the same file enforces the same limit. Each update holds an
+    exclusive flock on the file for a few microseconds. Slots whose bucket has
+    refilled completely, judged by the limit of the key owning it, are reused
+    for new keys, which keeps the table bounded.
+    """
+
+    SLOT = struct.Struct("<Qdddd")
+    PROBES = 16
+
+    def __init__(self, path: str, slots: int):
+        """Initialize the shared-memory backend.
+
+        Args:
+            path: File backing the shared table (created when missing)
+            slots: Number of bucket slots in the table
+        """
+        self.path = path
+        self.slots = slots
+        size = slots * self.SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size != size:
+                # A table of another size or layout is dropped rather than misread
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+
+    @staticmethod
+    def _digest(key: str) -> int:
+        """Hash a key to a non-zero 64-bit integer stable across processes."""
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def take(self, key: str, capacity: float, refill_rate: float) -> float:
+        digest = self._digest(key)
+        # Wall clock time, shared by every process on the host
+        now = time.time()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            offset = self._find_slot(digest, now)
+            stored, tokens, last_update, _, _ = self.SLOT.unpack_from(self._map, offset)
+            if stored != digest:
+                tokens, last_update = capacity, now
+            tokens = min(capacity, tokens + max(0.0, now - last_update) * refill_rate)
+            if tokens >= 1:
+                wait = 0.0
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / refill_rate
+            self.SLOT.pack_into(self._map, offset, digest, tokens, now, capacity, refill_rate)
+            return wait
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _find_slot(self, digest: int, now: float) -> int:
+        """Find the slot of a key, or a free, idle or least recently used slot for it."""
+        slot_size = self.SLOT.size
+        start = digest % self.slots
+        candidate = None
+        oldest = None
+        for probe in range(min(self.PROBES, self.slots)):
+            offset = ((start + probe) % self.slots) * slot_size
+            stored, tokens, last_update, capacity, refill_rate = self.SLOT.unpack_from(self._map, offset)
+            if stored == digest:
+                return offset
+            reusable = stored == 0 or tokens + (now - last_update) * refill_rate >= capacity
+            if reusable and candidate is None:
+                candidate = offset
+            if oldest is None or last_update < oldest[1]:
+                oldest = (offset, last_update)
+        return candidate if candidate is not None else oldest[0]
+
+    def reset(self) -> None:
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            self._map[:] = bytes(len(self._map))
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        """Unmap the shared table and close its file."""
+        self._map.close()
+        os.close(self._fd)
+
+class RateLimiter:
+    """Per-key rate limiter.
+
+    This class applies per-key request budgets on top of a bucket backend and is
+    used by the API key middleware once the key has been validated.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = REQUESTS_PER_MINUTE,
+        backend: Optional[RateLimitBackend] = None,
+        limits: Optional[Dict[str, int]] = None,
+    ):
+        """Initialize the rate limiter.
+
+        Args:
+            requests_per_minute: Default maximum number of requests per minute
+            backend: Bucket storage (defaults to an in-process MemoryBackend)
+            limits: Requests per minute for specific keys, overriding the default
         """
-        super().__init__(app)
         self.requests_per_minute = requests_per_minute
-        self.token_buckets: Dict[str, TokenBucket] = {}
-        self.bucket_lock = asyncio.Lock()
-    
-    async def get_bucket(self, api_key: str) -> TokenBucket:
-        """Get or create a token bucket for an API key.
-        
+        self.backend = backend or MemoryBackend(max_keys=settings.rate_limit_max_keys)
+        self.limits = dict(limits or {})
+        self.limited = 0
+
+    def limit_for(self, api_key: str) -> int:
+        """Get the requests per minute allowed for an API key.
+
         Args:
-            api_key: The API key to get a bucket for
-            
+            api_key: The API key
+
         Returns:
-            TokenBucket: The token bucket for the API key
+            int: Requests per minute for this key
         """
-        async with self.bucket_lock:
-            if api_key not in self.token_buckets:
-                self.token_buckets[api_key] = TokenBucket(
-                    TOKEN_BUCKET_CAPACITY,
-                    TOKEN_REFILL_RATE
-                )
-            return self.token_buckets[api_key]
-    
-    async def dispatch(self, request: Request, call_next):
-        """Process the request and apply rate limiting.
-        
+        return self.limits.get(api_key, self.requests_per_minute)
+
+    def check(self, api_key: str) -> float:
+        """Consume one request from the budget of an API key.
+
         Args:
-            request: The incoming request
-            call_next: The next middleware or route handler
-            
+            api_key: The API key making the request
+
         Returns:
-            Response: The response from the next middleware or route handler
-            
-        Raises:
-            HTTPException: If the rate limit is exceeded
+            float: 0 if the request is allowed, otherwise the seconds to wait before retrying
         """
-        # Skip rate limiting for health check endpoint
-        if request.url.path == "/health":
-            return await call_next(request)
-        
-        # Get the API key from the request header
-        api_key = request.headers.get("X-API-Key")
-        
-        # If no API key, skip rate limiting (will be caught by API key middleware)
-        if not api_key:
-            return await call_next(request)
-        
-        # Get the token bucket for the API key
-        bucket = await self.get_bucket(api_key)
-        
-        # Try to consume a token
-        if await bucket.consume():
-            # Token consumed, proceed with the request
-            return await call_next(request)
-        else:
-            # Rate limit exceeded
-            logger.warning("rate_limit.exceeded", api_key_hash=hash(api_key))
-            return JSONResponse(
-                status_code=429,
-                content={
-                    "detail": "Rate limit exceeded. Please try again later.",
-                    "retry_after": 60
-                }
-            ) 
\ No newline at end of file
+        limit = self.limit_for(api_key)
+        wait = self.backend.take(api_key, limit, limit / 60)
+        if wait:
+            self.limited += 1
+        return wait
+
+    async def consume(self, api_key: str) -> bool:
+        """Consume one request from the budget of an API key.
+
+        Args:
+            api_key: The API key making the request
+
+        Returns:
+            bool: True if the request is allowed, False if the rate limit is exceeded
+        """
+        return self.check(api_key) == 0.0
+
+    def reset(self) -> None:
+        """Forget every bucket, restoring the full budget of every key."""
+        self.backend.reset()
+
+def retry_after_seconds(wait: float) -> int:
+    """Round a wait time up to the whole seconds of a Retry-After header.
+
+    Args:
+        wait: Seconds until the next request is allowed
+
+    Returns:
+        int: Whole seconds, at least 1
+    """
+    return max(1, math.ceil(wait))
+
+def parse_rate_limits(raw_limits: str) -> Dict[str, int]:
+    """Parse per-key limits from a "key=requests_per_minute,..." setting.
+
+    Args:
+        raw_limits: Comma-separated key=limit pairs
+
+    Returns:
+        dict: Requests per minute by API key
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    limits = {}
+    for entry in raw_limits.split(","):
+        if not entry.strip():
+            continue
+        key, separator, limit = entry.rpartition("=")
+        if not separator or not key.strip():
+            raise ValueError(f"Invalid rate limit entry: {entry!r}")
+        limits[key.strip()] = int(limit)
+    return limits
+
+def create_rate_limiter() -> RateLimiter:
+    """Create the rate limiter described by the settings.
+
+    Returns:
+        RateLimiter: Rate limiter with the configured backend and limits
+    """
+    if settings.rate_limit_backend == "mmap":
+        path = settings.rate_limit_mmap_path or os.path.join(
+            "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+            "cloudlinker-rate-limit",
+        )
+        backend = SharedMemoryBackend(path, slots=settings.rate_limit_max_keys)
+    else:
+        backend = MemoryBackend(max_keys=settings.rate_limit_max_keys)
+    return RateLimiter(
+        requests_per_minute=settings.rate_limit_per_minute,
+        backend=backend,
+        limits=parse_rate_limits(settings.rate_limit_overrides),
+    )
+
+# Global rate limiter instance
+rate_limiter = create_rate_limiter()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import DeclarativeBase
 
@@ -22,4 +22,20 @@ class Customer(Base):
     name = Column(String, nullable=False)
     email = Column(String, unique=True, nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+# Search indexes (see GET /customers/search): lower(column) text_pattern_ops
+# serves prefix matches, and pg_trgm GIN indexes serve substring and similarity
+# matches. Other databases get plain indexes.
+for _column in (Customer.name, Customer.email):
+    Index(
+        f"ix_customers_{_column.name}_prefix",
+        func.lower(_column).label(f"{_column.name}_lower"),
+        postgresql_ops={f"{_column.name}_lower": "text_pattern_ops"},
+    )
+    Index(
+        f"ix_customers_{_column.name}_trgm",
+        _column,
+        postgresql_using="gin",
+        postgresql_ops={_column.name: "gin_trgm_ops"},
+    )
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import Response
+from typing import List, Literal, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..schemas.customer import CustomerCreate, CustomerRead
 from ..services.customer_service import CustomerService
-from ..db import get_db
+from ..db import get_db, get_read_db
+from ..settings import settings
+from ..utils.bulk_input import bulk_format, iter_records
+from ..utils.json_stream import JSON_MEDIA_TYPE, dumps
 
 router = APIRouter()
 
@@ -25,17 +29,97 @@ async def create_customer(
     service = CustomerService(db)
     return await service.create_customer(customer)
 
+@router.post("/bulk")
+async def bulk_create_customers(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+) -> Response:
+    """Create customers from an NDJSON or CSV upload.
+    
+    The body is streamed (Content-Type application/x-ndjson or text/csv, CSV
+    with a header naming the name and email columns) and loaded in chunks of
+    CUSTOMERS_BULK_CHUNK_SIZE rows. Rows that are invalid or whose email is
+    already registered are reported with their line number; the other rows are
+    loaded.
+    
+    Args:
+        request: The request whose body is the upload
+        db: Database session
+        
+    Returns:
+        Response: JSON report with the received, inserted and failed row counts,
+            and the row errors
+    """
+    records = iter_records(request.stream(), bulk_format(request.headers.get("content-type")), ("name", "email"))
+    service = CustomerService(db)
+    report = await service.bulk_create_customers(
+        records,
+        chunk_size=settings.customers_bulk_chunk_size,
+        max_errors=settings.customers_bulk_max_errors,
+    )
+    return Response(content=dumps(report), media_type=JSON_MEDIA_TYPE)
+
+@router.get("/search", response_model=List[CustomerRead])
+async def search_customers(
+    q: str = Query(..., min_length=1, max_length=100, description="Text to search for"),
+    mode: Literal["prefix", "fuzzy"] = Query("prefix"),
+    field: Literal["name", "email", "any"] = Query("any"),
+    limit: int = Query(20, ge=1, le=settings.customers_max_page_size),
+    db: AsyncSession = Depends(get_read_db)
+) -> Response:
+    """Search customers by name and/or email without going through the translator.
+    
+    Prefix mode returns the customers whose name or email starts with the text;
+    fuzzy mode returns those containing it or spelled similarly, best matches
+    first. Both are served by the search indexes.
+    
+    Args:
+        q: Text to search for
+        mode: "prefix" or "fuzzy"
+        field: Column searched: "name", "email" or "any" (both)
+        limit: Maximum number of customers to return
+        db: Read database session
+        
+    Returns:
+        Response: JSON list of customers
+    """
+    service = CustomerService(db)
+    rows = await service.search_customers(q, mode=mode, field=field, limit=limit)
+    return Response(content=dumps(rows), media_type=JSON_MEDIA_TYPE)
+
 @router.get("", response_model=List[CustomerRead])
 async def get_customers(
+    limit: int = Query(settings.customers_page_size, ge=1, le=settings.customers_max_page_size),
+    cursor: Optional[str] = Query(None, description="Continuation token from the X-Next-Cursor header"),
+    order_by: Literal["id", "created_at"] = Query("id"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
     db: AsyncSession = Depends(get_db)
-) -> List[CustomerRead]:
-    """Get all customers.
+) -> Response:
+    """Get one page of customers.
+    
+    When more customers are available, the continuation token for the next page
+    is returned in the X-Next-Cursor header.
     
     Args:
+        limit: Maximum number of customers to return
+        cursor: Continuation token from the previous page
+        order_by: Sort order, either "id" or "created_at"
+        fields: Comma-separated list of fields to return (all fields when omitted)
         db: Database session
         
     Returns:
-        List[CustomerRead]: List of all customers
+        Response: JSON list of customers
     """
     service = CustomerService(db)
-    return await service.get_customers()
\ No newline at end of file
+    projection = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+    rows, next_cursor = await service.get_customers(
+        limit=limit,
+        cursor=cursor,
+        order_by=order_by,
+        fields=projection,
+    )
+    
+    # Rows are already plain dicts, so encode them directly instead of going
+    # through response model validation
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=dumps(rows), media_type=JSON_MEDIA_TYPE, headers=headers)
@@ -0,0 +1,47 @@
+"""Router exposing the application metrics.
+
+This module provides the /metrics route serving the metrics registry in
+Prometheus text format.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from ..db import engines
+from ..middleware.rate_limit import rate_limiter
+from ..services.query_guard import query_guard
+from ..services.result_cache import result_cache
+from ..services.translation_cache import translation_cache
+from ..translator import translator_chain
+from ..utils.metrics import PoolCollector, StatsCollector, registry
+from ..utils.sql_sanitizer import verdict_cache_info
+
+router = APIRouter()
+
+def _sanitizer_stats() -> tuple:
+    info = verdict_cache_info()
+    return info.hits, info.misses
+
+registry.register(StatsCollector(
+    cache_stats={
+        "translation": lambda: (translation_cache.hits, translation_cache.misses),
+        "result": lambda: (result_cache.hits, result_cache.misses),
+        "plan": lambda: (query_guard.cache_hits, query_guard.explains),
+        "sanitizer": _sanitizer_stats,
+    },
+    rate_limited=lambda: rate_limiter.limited,
+    translator_hits=lambda: translator_chain.hits,
+))
+registry.register(PoolCollector(
+    lambda: {name: engine.sync_engine.pool for name, engine in engines().items()}
+))
+
+@router.get("", include_in_schema=False)
+async def metrics() -> Response:
+    """Get the application metrics.
+
+    Returns:
+        Response: The metrics in Prometheus text format
+    """
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -4,12 +4,26 @@ This module provides routes for translating natural language questions into SQL
 and executing them against the database.
 """
 
-from fastapi import APIRouter, Depends, Header
-from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from ..db import get_db
-from ..services.query_service import QueryService
+from ..db import get_read_db, get_session_factory
+from ..services.query_service import NON_EXECUTABLE_SQL, QueryService
+from ..settings import settings
+from ..utils.json_stream import JSON_MEDIA_TYPE, NDJSON_MEDIA_TYPE, dumps, json_array_stream, ndjson_stream
+from ..utils.metrics import time_stage
+from ..utils.result_format import (
+    ARROW_MEDIA_TYPE,
+    COLUMNAR_JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    encode_result,
+    negotiate,
+)
 
 router = APIRouter()
 
@@ -27,25 +41,179 @@ class QueryResponse(BaseModel):
     Attributes:
         sql: The SQL query generated from the question
         result: The result of executing the SQL query
+        cache_age: Seconds since the result was computed, when served from the
+            result cache (None for a fresh execution)
     """
     sql: str
     result: list
+    cache_age: Optional[float] = None
 
-@router.post("", response_model=QueryResponse)
+class BatchQueryRequest(BaseModel):
+    """Request model for the batch query endpoint.
+    
+    Attributes:
+        questions: The natural language questions to translate
+    """
+    questions: List[str] = Field(..., min_length=1, max_length=settings.batch_max_questions)
+
+class BatchQueryError(BaseModel):
+    """Error of one item of a batch.
+    
+    Attributes:
+        status_code: HTTP status code the question would have failed with
+        detail: Description of the error
+    """
+    status_code: int
+    detail: str
+
+class BatchQueryItem(BaseModel):
+    """Result of one question of a batch.
+    
+    Attributes:
+        index: Position of the question in the request
+        question: The natural language question
+        sql: The SQL query generated from the question (None if translation failed)
+        result: The result of executing the SQL query
+        cache_age: Seconds since the result was computed, when served from the result cache
+        error: The error of this question, if it failed
+    """
+    index: int
+    question: str
+    sql: Optional[str] = None
+    result: list = []
+    cache_age: Optional[float] = None
+    error: Optional[BatchQueryError] = None
+
+class BatchQueryResponse(BaseModel):
+    """Response model for the batch query endpoint.
+    
+    Attributes:
+        results: One result per question, in request order
+    """
+    results: List[BatchQueryItem]
+
+@router.post(
+    "",
+    response_model=QueryResponse,
+    responses={
+        200: {
+            "content": {
+                COLUMNAR_JSON_MEDIA_TYPE: {},
+                MSGPACK_MEDIA_TYPE: {},
+                ARROW_MEDIA_TYPE: {},
+            },
+            "description": "The result, in the format negotiated with the Accept header",
+        },
+        406: {"description": "None of the accepted result formats is supported"},
+    },
+)
 async def process_query(
     query: QueryRequest,
     x_api_key: str = Header(..., alias="X-API-Key"),
-    db: AsyncSession = Depends(get_db)
+    accept: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db)
 ) -> QueryResponse:
     """Process a natural language query.
     
+    The result format is negotiated with the Accept header: row objects in JSON
+    by default, or columnar JSON, MessagePack or Arrow IPC (see
+    utils.result_format).
+    
     Args:
         query: The query request containing the natural language question
         x_api_key: The API key from request headers
+        accept: The Accept header of the request
         db: The database session
         
     Returns:
         QueryResponse: The response containing the SQL query and its result
+        
+    Raises:
+        HTTPException: 406 if none of the accepted result formats is supported
     """
+    # Negotiated first so an unsupported format does not cost a translation
+    media_type = negotiate(accept)
     service = QueryService(db)
-    return await service.process_query(query.question, x_api_key) 
\ No newline at end of file
+    response = await service.process_query(query.question, x_api_key)
+    
+    # Encoded here rather than by FastAPI so the encoding time is measured
+    with time_stage("encode"):
+        body = encode_result(media_type, response["sql"], response["result"], response.get("cache_age"))
+    return Response(body, media_type=media_type)
+
+@router.post("/stream", response_class=StreamingResponse)
+async def stream_query(
+    query: QueryRequest,
+    format: Literal["ndjson", "json"] = Query("ndjson"),
+    x_api_key: str = Header(..., alias="X-API-Key"),
+    db: AsyncSession = Depends(get_read_db),
+    session_factory: sessionmaker = Depends(get_session_factory)
+) -> StreamingResponse:
+    """Process a natural language query and stream its result.
+    
+    Rows are read through a server-side cursor and sent as they arrive, so memory
+    use does not grow with the size of the result.
+    
+    Args:
+        query: The query request containing the natural language question
+        format: "ndjson" for one JSON document per line, "json" for a single chunked document
+        x_api_key: The API key from request headers
+        db: The database session
+        session_factory: Factory for the session owned by the stream
+        
+    Returns:
+        StreamingResponse: The SQL query followed by its rows
+    """
+    service = QueryService(db, session_factory)
+    sql = await service.prepare_query(query.question, x_api_key)
+    
+    # Streaming exists for large results, so only the cost check applies here
+    admitted_sql = None
+    if sql not in NON_EXECUTABLE_SQL:
+        admitted_sql = await service.admit(sql, add_limit=False)
+    
+    async def batches():
+        if admitted_sql is not None:
+            async for batch in service.stream_rows(admitted_sql, x_api_key):
+                yield batch
+    
+    if format == "ndjson":
+        return StreamingResponse(ndjson_stream(sql, batches()), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(json_array_stream(sql, batches()), media_type=JSON_MEDIA_TYPE)
+
+@router.post("/batch", response_model=BatchQueryResponse)
+async def process_batch(
+    batch: BatchQueryRequest,
+    stream: bool = Query(False, description="Stream each result as NDJSON as soon as it is ready"),
+    x_api_key: str = Header(..., alias="X-API-Key"),
+    db: AsyncSession = Depends(get_read_db),
+    session_factory: sessionmaker = Depends(get_session_factory)
+):
+    """Process many natural language queries in one request.
+    
+    Each question is answered independently: a failing question reports its
+    error in its own result instead of failing the whole batch.
+    
+    Args:
+        batch: The batch request containing the natural language questions
+        stream: Whether to stream results as NDJSON in completion order
+        x_api_key: The API key from request headers
+        db: The database session
+        session_factory: Factory for the sessions shared by the batch queries
+        
+    Returns:
+        BatchQueryResponse: One result per question in request order, or a
+            StreamingResponse with one result per line when streaming
+    """
+    service = QueryService(db, session_factory)
+    items = service.process_batch(batch.questions, x_api_key)
+    
+    if stream:
+        async def lines():
+            async for item in items:
+                yield (dumps(item) + "\n").encode()
+        return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+    
+    results = [item async for item in items]
+    results.sort(key=lambda item: item["index"])
+    return {"results": results}
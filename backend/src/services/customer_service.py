@@ -1,10 +1,87 @@
+from datetime import datetime
+from typing import AsyncIterator, Callable, Optional, Sequence
+
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from fastapi import HTTPException
 
+from ..db import note_write
 from ..models.customer import Customer
 from ..schemas.customer import CustomerCreate
+from ..utils.bulk_input import Record
+from ..utils.logger import get_logger
+from ..utils.metrics import CUSTOMERS_BULK_ROWS
+from ..utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from .result_cache import result_cache
+
+logger = get_logger(__name__)
+
+# Columns that can be requested through field projection
+CUSTOMER_FIELDS = ("id", "name", "email", "created_at", "updated_at")
+
+# Columns searched by GET /customers/search, by the field parameter
+SEARCH_FIELDS = {"name": ("name",), "email": ("email",), "any": ("name", "email")}
+
+# Staging table bulk uploads are copied into on PostgreSQL, dropped at commit
+BULK_STAGING_TABLE = f"{Customer.__table__.name}_bulk_load"
+
+# Keyset columns for each supported sort order (id breaks ties)
+SORT_KEYS = {
+    "id": ("id",),
+    "created_at": ("created_at", "id"),
+}
+
+# Escape character of the LIKE patterns built from search terms (a backslash would
+# need escaping itself in SQL literals, depending on standard_conforming_strings)
+LIKE_ESCAPE = "!"
+
+def _like_escape(value: str) -> str:
+    """Escape the LIKE wildcards of a search term."""
+    for character in (LIKE_ESCAPE, "%", "_"):
+        value = value.replace(character, LIKE_ESCAPE + character)
+    return value
+
+def search_statement(term: str, mode: str, field: str, dialect_name: str, limit: Optional[int] = None):
+    """Build the query searching customers by name and/or email.
+    
+    Prefix searches compare lower(column) with LIKE 'term%', served by the
+    text_pattern_ops indexes. Fuzzy searches on PostgreSQL match substrings
+    (ILIKE '%term%') and similar spellings (the pg_trgm % operator), served by
+    the trigram indexes and ranked by similarity; other databases fall back to
+    a substring match.
+    
+    Args:
+        term: The searched text
+        mode: "prefix" or "fuzzy"
+        field: "name", "email" or "any", see SEARCH_FIELDS
+        dialect_name: Name of the database dialect the query runs on
+        limit: Maximum number of customers returned (no LIMIT when None)
+        
+    Returns:
+        Select: The search query, returning every column of the customers
+    """
+    columns = Customer.__table__.c
+    searched = [columns[name] for name in SEARCH_FIELDS[field]]
+    term = term.strip().lower()
+    
+    if mode == "fuzzy" and dialect_name == "postgresql":
+        pattern = f"%{_like_escape(term)}%"
+        condition = or_(*(
+            or_(column.ilike(pattern, escape=LIKE_ESCAPE), column.op("%")(term))
+            for column in searched
+        ))
+        scores = [func.similarity(column, term) for column in searched]
+        order = [(scores[0] if len(scores) == 1 else func.greatest(*scores)).desc(), columns.id]
+    else:
+        pattern = f"{_like_escape(term)}%" if mode == "prefix" else f"%{_like_escape(term)}%"
+        condition = or_(*(func.lower(column).like(pattern, escape=LIKE_ESCAPE) for column in searched))
+        order = [func.lower(searched[0]), columns.id]
+    
+    stmt = select(*(columns[name] for name in CUSTOMER_FIELDS)).where(condition).order_by(*order)
+    return stmt if limit is None else stmt.limit(limit)
 
 class CustomerService:
     """Service layer for customer operations.
@@ -45,11 +122,244 @@ class CustomerService:
                 detail="Email already registered"
             )
     
-    async def get_customers(self) -> list[Customer]:
-        """Get all customers.
+    async def bulk_create_customers(
+        self,
+        records: AsyncIterator[Record],
+        chunk_size: int,
+        max_errors: int,
+    ) -> dict:
+        """Create customers from the records of an upload, loading them in chunks.
+        
+        Records are validated as they arrive and loaded chunk_size at a time, each
+        chunk in one transaction and one statement (on PostgreSQL, COPY into a
+        staging table then one INSERT from it). Invalid records and emails that
+        are already registered are reported by line, without stopping the load.
+        
+        Args:
+            records: Parsed upload records, see utils.bulk_input
+            chunk_size: Rows loaded per transaction
+            max_errors: Row errors listed in the report (the rest are only counted)
+            
+        Returns:
+            dict: Counts of received, inserted and failed rows, and the row errors
+        """
+        report = {"received": 0, "inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+        
+        def fail(line: int, error: str, outcome: str) -> None:
+            report["failed"] += 1
+            CUSTOMERS_BULK_ROWS.labels(outcome).inc()
+            if len(report["errors"]) < max_errors:
+                report["errors"].append({"line": line, "error": error})
+            else:
+                report["errors_truncated"] = True
+        
+        chunk: list[tuple[int, CustomerCreate]] = []
+        async for line, fields, error in records:
+            report["received"] += 1
+            if error is None:
+                try:
+                    chunk.append((line, CustomerCreate.model_validate(fields)))
+                except ValidationError as e:
+                    error = _validation_error(e)
+            if error is not None:
+                fail(line, error, "invalid")
+            elif len(chunk) >= chunk_size:
+                report["inserted"] += await self._load_chunk(chunk, fail)
+                chunk = []
+        if chunk:
+            report["inserted"] += await self._load_chunk(chunk, fail)
+        
+        logger.info(
+            "customers.bulk.loaded",
+            received=report["received"],
+            inserted=report["inserted"],
+            failed=report["failed"],
+        )
+        return report
+    
+    async def _load_chunk(
+        self,
+        chunk: list[tuple[int, CustomerCreate]],
+        fail: Callable[[int, str, str], None],
+    ) -> int:
+        """Insert one chunk of validated customers in its own transaction.
         
+        Args:
+            chunk: Line numbers and validated customers
+            fail: Callback reporting a row error (line, error, metrics outcome)
+            
         Returns:
-            list[Customer]: List of all customers
+            int: Number of customers inserted
         """
-        result = await self.session.execute(select(Customer))
-        return result.scalars().all() 
\ No newline at end of file
+        rows = {}
+        for line, customer in chunk:
+            if customer.email in rows:
+                fail(line, "Email already registered", "duplicate")
+            else:
+                rows[customer.email] = (line, customer.name)
+        
+        try:
+            if self.session.get_bind().dialect.name == "postgresql":
+                inserted = await self._copy_rows(rows)
+            else:
+                inserted = await self._insert_rows(rows)
+            # Core statements bypass the ORM flush events, so record the write for
+            # the result cache invalidation and read-your-writes pinning on commit
+            result_cache.note_write(self.session, Customer.__table__.name)
+            note_write(self.session)
+            await self.session.commit()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error("customers.bulk.chunk_failed", error=str(e), rows=len(chunk))
+            for line, _ in rows.values():
+                fail(line, "Could not be stored", "failed")
+            return 0
+        
+        for email, (line, _) in rows.items():
+            if email not in inserted:
+                fail(line, "Email already registered", "duplicate")
+        CUSTOMERS_BULK_ROWS.labels("inserted").inc(len(inserted))
+        return len(inserted)
+    
+    async def _insert_rows(self, rows: dict) -> set:
+        """Insert rows with one multi-row INSERT, skipping registered emails.
+        
+        Returns:
+            set: Emails of the inserted rows
+        """
+        dialect = postgresql if self.session.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = (
+            dialect.insert(Customer)
+            .values([{"name": name, "email": email} for email, (_, name) in rows.items()])
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(Customer.email)
+        )
+        result = await self.session.execute(stmt)
+        return set(result.scalars())
+    
+    async def _copy_rows(self, rows: dict) -> set:
+        """COPY rows into a staging table, then insert them skipping registered emails.
+        
+        Returns:
+            set: Emails of the inserted rows
+        """
+        # Creating the table starts the transaction the COPY then joins
+        await self.session.execute(text(
+            f"CREATE TEMP TABLE {BULK_STAGING_TABLE} (name text, email text) ON COMMIT DROP"
+        ))
+        connection = await (await self.session.connection()).get_raw_connection()
+        await connection.driver_connection.copy_records_to_table(
+            BULK_STAGING_TABLE,
+            records=[(name, email) for email, (_, name) in rows.items()],
+            columns=["name", "email"],
+        )
+        result = await self.session.execute(text(
+            f"INSERT INTO {Customer.__table__.name} (name, email) SELECT name, email FROM {BULK_STAGING_TABLE} "
+            "ON CONFLICT (email) DO NOTHING RETURNING email"
+        ))
+        return set(result.scalars())
+    
+    async def get_customers(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        order_by: str = "id",
+        fields: Optional[Sequence[str]] = None,
+    ) -> tuple[list[dict], Optional[str]]:
+        """Get one page of customers using keyset pagination.
+        
+        Only the requested columns are selected, and rows are read as plain
+        mappings instead of ORM instances, so listing does not pay for the
+        identity map or for columns the client does not need.
+        
+        Args:
+            limit: Maximum number of customers to return
+            cursor: Continuation token returned with the previous page
+            order_by: Sort order, either "id" or "created_at"
+            fields: Columns to return (all columns when omitted)
+            
+        Returns:
+            tuple: The customers of the page as dicts, and the continuation token
+                for the next page (None on the last page)
+            
+        Raises:
+            HTTPException: If the sort order, fields or cursor are invalid
+        """
+        if order_by not in SORT_KEYS:
+            raise HTTPException(status_code=400, detail=f"Cannot order by '{order_by}'")
+        
+        selected = list(dict.fromkeys(fields)) if fields else list(CUSTOMER_FIELDS)
+        unknown = [name for name in selected if name not in CUSTOMER_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        
+        # Keyset columns are always read so the next cursor can be built
+        keyset = SORT_KEYS[order_by]
+        columns = Customer.__table__.c
+        query_columns = selected + [name for name in keyset if name not in selected]
+        stmt = select(*(columns[name] for name in query_columns))
+        
+        if cursor:
+            stmt = stmt.where(self._after_cursor(cursor, order_by))
+        
+        stmt = stmt.order_by(*(columns[name] for name in keyset)).limit(limit + 1)
+        result = await self.session.execute(stmt)
+        rows = result.mappings().all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            position = {"o": order_by, "id": last["id"]}
+            if order_by == "created_at":
+                position["v"] = last["created_at"].isoformat()
+            next_cursor = encode_cursor(position)
+        
+        return [{name: row[name] for name in selected} for row in rows], next_cursor
+    
+    async def search_customers(self, q: str, mode: str = "prefix", field: str = "any", limit: int = 20) -> list[dict]:
+        """Search customers by name and/or email through the search indexes.
+        
+        Args:
+            q: The searched text
+            mode: "prefix" or "fuzzy", see search_statement()
+            field: "name", "email" or "any"
+            limit: Maximum number of customers to return
+            
+        Returns:
+            list[dict]: The matching customers, best matches first
+            
+        Raises:
+            HTTPException: If the search text is blank
+        """
+        if not q.strip():
+            raise HTTPException(status_code=400, detail="Search text is empty")
+        stmt = search_statement(q, mode, field, self.session.get_bind().dialect.name, limit)
+        result = await self.session.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+    
+    @staticmethod
+    def _after_cursor(cursor: str, order_by: str):
+        """Build the WHERE clause selecting rows after a continuation token."""
+        try:
+            position = decode_cursor(cursor)
+            if position.get("o") != order_by:
+                raise InvalidCursorError("Cursor was issued for a different sort order")
+            last_id = int(position["id"])
+            if order_by == "id":
+                return Customer.id > last_id
+            last_created_at = datetime.fromisoformat(position["v"])
+        except (InvalidCursorError, KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        
+        return or_(
+            Customer.created_at > last_created_at,
+            and_(Customer.created_at == last_created_at, Customer.id > last_id),
+        )
+
+def _validation_error(error: ValidationError) -> str:
+    """Summarize the validation errors of a record in one line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'record'}: {detail['msg']}"
+        for detail in error.errors()
+    )
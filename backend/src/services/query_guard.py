@@ -0,0 +1,228 @@
+"""Admission control for generated SQL.
+
+This module checks generated queries before they run. Queries without a LIMIT get
+one, PostgreSQL's planner estimates are read with EXPLAIN (FORMAT JSON) to reject
+queries that are too expensive or cap the ones returning too many rows, and every
+execution is bounded by a statement timeout. Plan verdicts are cached per query
+and literal values, so repeated queries skip the extra EXPLAIN round trip. They
+are not shared between values of the same query shape: the estimate of a cheap
+value says nothing about an expensive one.
+"""
+
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..settings import settings
+from ..utils.logger import get_logger
+from ..utils.sql_fingerprint import normalize
+
+logger = get_logger(__name__)
+
+_QUOTED_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+_PARENTHESIZED_RE = re.compile(r"\([^()]*\)")
+_TOP_LEVEL_LIMIT_RE = re.compile(r"\b(?:limit|fetch\s+(?:first|next))\b", re.IGNORECASE)
+
+def has_top_level_limit(sql: str) -> bool:
+    """Check whether the outermost query already limits its rows.
+
+    Args:
+        sql: The SQL query
+
+    Returns:
+        bool: True if a LIMIT or FETCH FIRST clause is present outside subqueries
+    """
+    stripped = _QUOTED_RE.sub("''", sql)
+    previous = None
+    while previous != stripped:
+        previous = stripped
+        stripped = _PARENTHESIZED_RE.sub(" ", stripped)
+    return bool(_TOP_LEVEL_LIMIT_RE.search(stripped))
+
+def with_limit(sql: str, limit: int) -> str:
+    """Append a LIMIT clause to a query.
+
+    Args:
+        sql: The SQL query, without a top-level LIMIT
+        limit: Maximum number of rows
+
+    Returns:
+        str: The limited query
+    """
+    return f"{sql.rstrip()} LIMIT {int(limit)}"
+
+def wrap_limit(sql: str, limit: int) -> str:
+    """Cap the number of rows of a query that already has its own LIMIT.
+
+    Args:
+        sql: The SQL query
+        limit: Maximum number of rows
+
+    Returns:
+        str: The query wrapped in a limited subquery
+    """
+    return f"SELECT * FROM ({sql}) AS limited_query LIMIT {int(limit)}"
+
+class QueryGuard:
+    """Pre-execution guard applying row limits, cost thresholds and timeouts.
+
+    Admission verdicts (run, cap or reject, with the reason for rejecting) are
+    kept in a bounded LRU cache with TTL, keyed by the query shape and its
+    literal values.
+    """
+
+    def __init__(
+        self,
+        max_cost: float,
+        max_rows: int,
+        default_limit: int,
+        statement_timeout_ms: int,
+        cache_size: int,
+        cache_ttl: float,
+    ):
+        """Initialize the query guard.
+
+        Args:
+            max_cost: Highest planner cost accepted (0 disables the cost check)
+            max_rows: Highest estimated row count before the query is capped (0 disables)
+            default_limit: LIMIT added to queries without one (0 disables)
+            statement_timeout_ms: Statement timeout for every execution (0 disables)
+            cache_size: Maximum number of cached plan verdicts
+            cache_ttl: Seconds a plan verdict stays valid
+        """
+        self.max_cost = max_cost
+        self.max_rows = max_rows
+        self.default_limit = default_limit
+        self.statement_timeout_ms = statement_timeout_ms
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._verdicts: "OrderedDict[str, Tuple[Optional[str], Optional[str], float]]" = OrderedDict()
+        self.explains = 0
+        self.cache_hits = 0
+        self.rejected = 0
+
+    async def admit(self, session: AsyncSession, sql: str, add_limit: bool = True) -> str:
+        """Check a validated query and get the SQL that should actually run.
+
+        Args:
+            session: Session used for the EXPLAIN round trip
+            sql: The validated SQL query
+            add_limit: Whether to add the default LIMIT to unlimited queries
+
+        Returns:
+            str: The SQL to execute, possibly rewritten with a LIMIT
+
+        Raises:
+            HTTPException: If the planner estimates the query is too expensive
+        """
+        if add_limit and self.default_limit and not has_top_level_limit(sql):
+            sql = with_limit(sql, self.default_limit)
+
+        if not (self.max_cost or self.max_rows) or not _is_postgres(session):
+            return sql
+
+        key = normalize(sql).cache_key
+        verdict = self._get_verdict(key)
+        if verdict is None:
+            verdict = await self._plan_verdict(session, sql)
+            self._set_verdict(key, verdict)
+        else:
+            self.cache_hits += 1
+
+        action, reason = verdict
+        if action is None:
+            self.rejected += 1
+            raise HTTPException(status_code=400, detail=reason)
+        if action == "cap":
+            return wrap_limit(sql, self.max_rows)
+        return sql
+
+    async def apply_timeout(self, session: AsyncSession) -> None:
+        """Bound the statements of the current transaction with the statement timeout.
+
+        Args:
+            session: The session about to execute a generated query
+        """
+        if self.statement_timeout_ms and _is_postgres(session):
+            await session.execute(text(f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}"))
+
+    async def _plan_verdict(self, session: AsyncSession, sql: str) -> Tuple[Optional[str], Optional[str]]:
+        """Run EXPLAIN and decide whether to run, cap or reject a query.
+
+        Returns:
+            tuple: "run", "cap" or None (rejected), and the reason for rejecting
+        """
+        self.explains += 1
+        result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        top = plan[0]["Plan"]
+        cost = float(top.get("Total Cost", 0))
+        rows = int(top.get("Plan Rows", 0))
+
+        if self.max_cost and cost > self.max_cost:
+            logger.warning("query.guard.rejected", cost=cost, rows=rows, max_cost=self.max_cost)
+            return None, f"Query is too expensive to run (estimated cost {cost:.0f} > {self.max_cost:.0f})"
+        if self.max_rows and rows > self.max_rows:
+            logger.info("query.guard.capped", cost=cost, rows=rows, max_rows=self.max_rows)
+            return "cap", None
+        return "run", None
+
+    def _get_verdict(self, key: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """Get a cached plan verdict."""
+        entry = self._verdicts.get(key)
+        if entry is None:
+            return None
+        action, reason, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._verdicts[key]
+            return None
+        self._verdicts.move_to_end(key)
+        return action, reason
+
+    def _set_verdict(self, key: str, verdict: Tuple[Optional[str], Optional[str]]) -> None:
+        """Store a plan verdict."""
+        if self.cache_size <= 0:
+            return
+        self._verdicts[key] = (*verdict, time.monotonic() + self.cache_ttl)
+        self._verdicts.move_to_end(key)
+        while len(self._verdicts) > self.cache_size:
+            self._verdicts.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every cached plan verdict."""
+        self._verdicts.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the guard counters.
+
+        Returns:
+            dict: Number of cached verdicts, EXPLAIN round trips, cache hits and rejections
+        """
+        return {
+            "cached_verdicts": len(self._verdicts),
+            "explains": self.explains,
+            "cache_hits": self.cache_hits,
+            "rejected": self.rejected,
+        }
+
+def _is_postgres(session: AsyncSession) -> bool:
+    """Check whether a session talks to PostgreSQL (EXPLAIN JSON and SET LOCAL are PostgreSQL only)."""
+    return session.get_bind().dialect.name == "postgresql"
+
+# Global query guard instance
+query_guard = QueryGuard(
+    max_cost=settings.query_max_cost,
+    max_rows=settings.query_max_rows,
+    default_limit=settings.query_default_limit,
+    statement_timeout_ms=settings.statement_timeout_ms,
+    cache_size=settings.plan_cache_size,
+    cache_ttl=settings.plan_cache_ttl,
+)
@@ -4,16 +4,72 @@ This module provides a service that translates natural language questions into S
 and executes them against the database.
 """
 
+import asyncio
+import math
+from typing import AsyncIterator, Callable, Optional, Sequence
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+from sqlalchemy import BigInteger, Integer, TextClause, bindparam, text
 from fastapi import HTTPException
 
-from ..translator import translate
+from ..db import ReadSessionLocal
+from ..settings import settings
+from ..translator import TranslationUnavailableError, translate
+from .query_guard import query_guard
+from .result_cache import result_cache
+from .translation_cache import translation_cache
+from ..utils.single_flight import SingleFlight
+from ..utils.sql_fingerprint import normalize
 from ..utils.sql_sanitizer import is_safe_select
 from ..utils.logger import get_logger
+from ..utils.metrics import time_stage
+from ..utils.result_format import ResultRows, describe_columns
 
 logger = get_logger(__name__)
 
+# Translator markers that are returned to the client without being executed
+NON_EXECUTABLE_SQL = ("-- TODO", "-- BLOCKED")
+
+# Coalescing groups shared by every QueryService instance in this process
+translation_flight = SingleFlight()
+execution_flight = SingleFlight()
+
+def sql_log_fields(sql: str) -> dict:
+    """Get the log fields identifying a SQL query.
+
+    Args:
+        sql: The SQL query
+
+    Returns:
+        dict: The fingerprint of the query shape (literals lifted), plus the full
+            text when LOG_SQL is enabled
+    """
+    if settings.log_sql:
+        return {"sql_fingerprint": normalize(sql).fingerprint, "sql": sql}
+    return {"sql_fingerprint": normalize(sql).fingerprint}
+
+def executable(sql: str) -> TextClause:
+    """Get the statement executing a query, with its literals as bind parameters.
+
+    Queries of the same shape then send the same statement text, so PostgreSQL
+    and the asyncpg prepared statement cache reuse their parse and plan work.
+    The lifted literals are integers, bound as INTEGER, or BIGINT when they do
+    not fit.
+
+    Args:
+        sql: The validated SQL query
+
+    Returns:
+        TextClause: The statement, with its bound values
+    """
+    if not settings.parameterize_sql:
+        return text(sql)
+    query = normalize(sql)
+    return text(query.sql).bindparams(*(
+        bindparam(name, value, type_=Integer() if -2 ** 31 <= value < 2 ** 31 else BigInteger())
+        for name, value in query.params
+    ))
+
 class QueryService:
     """Service for handling natural language to SQL queries.
     
@@ -21,58 +77,292 @@ class QueryService:
     and executing them against the database.
     """
     
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+    ):
         """Initialize the query service.
         
         Args:
             session: The database session to use for executing queries
+            session_factory: Factory for the detached sessions used by coalesced
+                executions (defaults to ReadSessionLocal)
         """
         self.session = session
+        self.session_factory = session_factory or ReadSessionLocal
     
-    async def process_query(self, question: str, api_key: str) -> dict:
-        """Process a natural language query.
+    async def translate(self, question: str) -> str:
+        """Translate a question to SQL, reusing cached translations when possible.
+        
+        Args:
+            question: The natural language question to translate
+            
+        Returns:
+            str: The SQL query (or a "-- TODO" / "-- BLOCKED" marker)
+            
+        Raises:
+            HTTPException: 503 with a Retry-After header if the translator is unavailable
+        """
+        sql = translation_cache.get(question)
+        if sql is not None:
+            logger.debug("query.translation.cache_hit")
+            return sql
+        
+        if not settings.coalesce_translations:
+            return await self._translate_and_cache(question)
+        
+        # Concurrent identical questions share a single pending translation
+        return await translation_flight.do(
+            translation_cache.make_key(question),
+            lambda: self._translate_and_cache(question),
+        )
+    
+    async def _translate_and_cache(self, question: str) -> str:
+        """Call the translator and store its answer in the translation cache."""
+        try:
+            with time_stage("translate"):
+                sql = await translate(question)
+        except TranslationUnavailableError as e:
+            logger.warning("query.translation.unavailable", error=str(e), question_length=len(question))
+            raise HTTPException(
+                status_code=503,
+                detail="Translation service unavailable",
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+            )
+        translation_cache.set(question, sql)
+        return sql
+    
+    async def fetch(self, sql: str) -> tuple[list[dict], Optional[float]]:
+        """Get the rows of a query from the result cache, or execute it.
+        
+        Args:
+            sql: The validated SQL query
+            
+        Returns:
+            tuple: The result rows, and their age in seconds when served from
+                the cache (None when freshly executed)
+        """
+        cached = result_cache.get(sql)
+        if cached is not None:
+            return cached
+        
+        snapshot = result_cache.snapshot(sql)
+        rows = await self.execute(sql)
+        result_cache.put(sql, rows, snapshot)
+        return rows, None
+    
+    async def execute(self, sql: str) -> list[dict]:
+        """Execute a validated SELECT query and return its rows.
+        
+        When execution coalescing is enabled, concurrent requests for the same SQL
+        share one execution. The shared execution runs in its own session so it is
+        not tied to the lifetime of whichever request started it.
+        
+        Args:
+            sql: The SQL query to execute
+            
+        Returns:
+            list[dict]: The result rows
+        """
+        if not settings.coalesce_executions:
+            return await self._fetch_rows(self.session, sql)
+        return await execution_flight.do(normalize(sql).cache_key, lambda: self._execute_detached(sql))
+    
+    async def _execute_detached(self, sql: str) -> list[dict]:
+        """Execute a query in a session owned by the call itself."""
+        async with self.session_factory() as session:
+            return await self._fetch_rows(session, sql)
+    
+    @staticmethod
+    async def _fetch_rows(session: AsyncSession, sql: str) -> list[dict]:
+        """Execute a query on a session and materialize the rows as dicts.
+        
+        The rows keep the column names and types of the cursor description, so
+        columnar formats can describe every column, even of an empty result.
+        """
+        await query_guard.apply_timeout(session)
+        with time_stage("execute"):
+            result = await session.execute(executable(sql))
+        with time_stage("materialize"):
+            description = result.cursor.description if result.returns_rows else None
+            rows = [dict(row._mapping) for row in result]
+            return ResultRows(rows, describe_columns(description, rows))
+    
+    async def prepare_query(self, question: str, api_key: str) -> str:
+        """Translate a question and check that the resulting SQL is safe to run.
         
         Args:
             question: The natural language question to process
             api_key: The API key used for the request (for logging)
             
         Returns:
-            dict: A dictionary containing the SQL query and its result
+            str: The SQL query, or a "-- TODO" / "-- BLOCKED" marker that must not be executed
             
         Raises:
             HTTPException: If the query is not a SELECT statement or is unsafe
         """
         # Translate the question to SQL
-        sql = await translate(question)
+        sql = await self.translate(question)
         
         # If the SQL is a TODO, return it without executing
         if sql == "-- TODO":
-            logger.info("query.translation.not_found", question=question, api_key_hash=hash(api_key))
-            return {"sql": sql, "result": []}
+            logger.info("query.translation.not_found", question_length=len(question), api_key_hash=hash(api_key))
+            return sql
         
         # If the SQL is BLOCKED, return it without executing
         if sql == "-- BLOCKED":
-            logger.warning("query.translation.blocked", question=question, api_key_hash=hash(api_key))
-            return {"sql": sql, "result": []}
+            logger.warning("query.translation.blocked", question_length=len(question), api_key_hash=hash(api_key))
+            return sql
         
         # Check if the SQL is safe
-        if not is_safe_select(sql):
-            logger.warning("query.sanitizer.unsafe", sql=sql, api_key_hash=hash(api_key))
+        with time_stage("sanitize"):
+            safe = is_safe_select(sql)
+        if not safe:
+            logger.warning("query.sanitizer.unsafe", **sql_log_fields(sql), api_key_hash=hash(api_key))
             raise HTTPException(
                 status_code=400,
                 detail="Unsafe SQL query detected"
             )
         
+        return sql
+    
+    async def admit(self, sql: str, add_limit: bool = True) -> str:
+        """Run the pre-execution guard on a validated query.
+        
+        Args:
+            sql: The validated SQL query
+            add_limit: Whether to add the default LIMIT when the query has none
+            
+        Returns:
+            str: The SQL to execute, possibly rewritten with a LIMIT
+            
+        Raises:
+            HTTPException: If the query is estimated to be too expensive
+        """
+        return await query_guard.admit(self.session, sql, add_limit=add_limit)
+    
+    async def process_query(self, question: str, api_key: str) -> dict:
+        """Process a natural language query.
+        
+        Args:
+            question: The natural language question to process
+            api_key: The API key used for the request (for logging)
+            
+        Returns:
+            dict: A dictionary containing the SQL query, its result and the age
+                of the result when it was served from the cache
+            
+        Raises:
+            HTTPException: If the query is not a SELECT statement or is unsafe
+        """
+        sql = await self.prepare_query(question, api_key)
+        if sql in NON_EXECUTABLE_SQL:
+            return {"sql": sql, "result": []}
+        
         # Execute the query
         try:
-            logger.info("query.execution.start", sql=sql, api_key_hash=hash(api_key))
-            result = await self.session.execute(text(sql))
-            rows = [dict(row) for row in result]
-            logger.info("query.execution.success", row_count=len(rows), api_key_hash=hash(api_key))
-            return {"sql": sql, "result": rows}
+            logger.info("query.execution.start", **sql_log_fields(sql), api_key_hash=hash(api_key))
+            rows, cache_age = await self.fetch(await self.admit(sql))
+            logger.info("query.execution.success", row_count=len(rows), cached=cache_age is not None, api_key_hash=hash(api_key))
+            return {"sql": sql, "result": rows, "cache_age": cache_age}
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error("query.execution.error", error=str(e), api_key_hash=hash(api_key))
             raise HTTPException(
                 status_code=500,
                 detail=f"Error executing query: {str(e)}"
-            ) 
\ No newline at end of file
+            )
+    
+    async def stream_rows(self, sql: str, api_key: str) -> AsyncIterator[list[dict]]:
+        """Execute a query through a server-side cursor and yield its rows in batches.
+        
+        The query runs in a session owned by the generator, because a streaming
+        response keeps reading rows after the request handler has returned.
+        Only one batch of rows is held in memory at a time.
+        
+        Args:
+            sql: The admitted SQL query to execute
+            api_key: The API key used for the request (for logging)
+            
+        Yields:
+            list[dict]: The next batch of result rows
+        """
+        row_count = 0
+        logger.info("query.stream.start", **sql_log_fields(sql), api_key_hash=hash(api_key))
+        try:
+            async with self.session_factory() as session:
+                await query_guard.apply_timeout(session)
+                result = await session.stream(
+                    executable(sql).execution_options(yield_per=settings.stream_batch_size)
+                )
+                async for partition in result.mappings().partitions():
+                    row_count += len(partition)
+                    yield [dict(row) for row in partition]
+        except Exception as e:
+            logger.error("query.stream.error", error=str(e), row_count=row_count, api_key_hash=hash(api_key))
+            raise
+        logger.info("query.stream.success", row_count=row_count, api_key_hash=hash(api_key))
+    
+    async def process_batch(self, questions: Sequence[str], api_key: str) -> AsyncIterator[dict]:
+        """Process many natural language queries concurrently.
+        
+        Translations run concurrently up to the batch translation limit. Queries
+        run over a small pool of sessions, one query per session at a time, so a
+        batch holds at most batch_execution_concurrency connections. A failing
+        item does not affect the others: its error is reported in its result.
+        
+        Args:
+            questions: The natural language questions to process
+            api_key: The API key used for the request (for logging)
+            
+        Yields:
+            dict: One result per question, in completion order, with its "index"
+                in the batch and either "sql"/"result"/"cache_age" or "error"
+        """
+        translation_slots = asyncio.Semaphore(settings.batch_translation_concurrency)
+        workers: asyncio.Queue = asyncio.Queue()
+        sessions: list[AsyncSession] = []
+        for _ in range(min(settings.batch_execution_concurrency, len(questions))):
+            session = self.session_factory()
+            sessions.append(session)
+            workers.put_nowait(QueryService(session, self.session_factory))
+        
+        async def run(index: int, question: str) -> dict:
+            item = {"index": index, "question": question}
+            try:
+                async with translation_slots:
+                    sql = await self.prepare_query(question, api_key)
+                item["sql"] = sql
+                if sql in NON_EXECUTABLE_SQL:
+                    item.update(result=[], cache_age=None)
+                    return item
+                
+                worker = await workers.get()
+                try:
+                    rows, cache_age = await worker.fetch(await worker.admit(sql))
+                finally:
+                    # End the read-only transaction before the next item reuses the session
+                    await worker.session.rollback()
+                    workers.put_nowait(worker)
+                item.update(result=rows, cache_age=cache_age)
+            except HTTPException as e:
+                item["error"] = {"status_code": e.status_code, "detail": e.detail}
+            except Exception as e:
+                logger.error("query.batch.item_error", index=index, error=str(e), api_key_hash=hash(api_key))
+                item["error"] = {"status_code": 500, "detail": f"Error executing query: {str(e)}"}
+            return item
+        
+        logger.info("query.batch.start", size=len(questions), api_key_hash=hash(api_key))
+        tasks = [asyncio.create_task(run(index, question)) for index, question in enumerate(questions)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for session in sessions:
+                await session.close()
+        logger.info("query.batch.success", size=len(questions), api_key_hash=hash(api_key))
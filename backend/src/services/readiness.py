@@ -0,0 +1,162 @@
+"""Background readiness probe of the database engines.
+
+Orchestrators poll readiness often. Instead of opening a connection on every
+poll, a background task checks every engine each DB_PROBE_INTERVAL seconds and
+the /ready route serves the last result. The probe also feeds the replica
+rotation: a replica that answers again is put back, one that fails is left out.
+
+The probe uses one connection per engine and never touches the idle ones of
+request traffic. An engine whose pool has no free connection is reported busy,
+not down: waiting for a connection would only time the probe out under load.
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..db import ReadRouter, engines, read_router
+from ..settings import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class ReadinessProbe:
+    """Periodic check of the database engines, with the last result cached.
+
+    The service is ready when the last probe is recent and the primary answered
+    or was busy; failed replicas are reported but do not make it unready, as
+    reads fall back to the primary.
+    """
+
+    def __init__(
+        self,
+        engines: Callable[[], Dict[str, AsyncEngine]],
+        interval: float,
+        timeout: float,
+        router: Optional[ReadRouter] = None,
+        primary: str = "primary",
+    ):
+        """Initialize the probe.
+
+        Args:
+            engines: Function returning the engines to check, by name
+            interval: Seconds between probes
+            timeout: Seconds the check of one engine may take
+            router: Replica router updated with the replica checks
+            primary: Name of the engine the readiness depends on
+        """
+        self.engines = engines
+        self.interval = interval
+        self.timeout = timeout
+        self.router = router
+        self.primary = primary
+        self.checks: Dict[str, dict] = {}
+        self.checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start probing in the background (does nothing if already started)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop probing."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def check(self) -> Dict[str, dict]:
+        """Check every engine once and cache the result.
+
+        Returns:
+            dict: Per engine, {"ok", "latency_ms"}, "busy" when its pool had no
+                free connection, and the "error" of a failed check
+        """
+        named = self.engines()
+        results = await asyncio.gather(*(self._check_engine(engine) for engine in named.values()))
+        checks = {}
+        for (name, engine), (error, latency, busy) in zip(named.items(), results):
+            checks[name] = {"ok": error is None, "latency_ms": round(latency * 1000, 3)}
+            if busy:
+                checks[name]["busy"] = True
+            if error is not None:
+                checks[name]["error"] = error
+                logger.warning("db.probe.failed", engine=name, error=error)
+            if self.router is not None and engine in self.router.replicas:
+                if error is None:
+                    self.router.mark_up(engine)
+                else:
+                    self.router.mark_down(engine)
+        self.checks = checks
+        self.checked_at = time.monotonic()
+        return checks
+
+    def status(self) -> Tuple[bool, dict]:
+        """Get the readiness from the last probe.
+
+        Returns:
+            tuple: Whether the service is ready, and the body of the /ready response
+        """
+        if self.checked_at is None:
+            return False, {"ready": False, "reason": "not probed yet", "checks": {}}
+        age = time.monotonic() - self.checked_at
+        body = {"ready": True, "age": round(age, 3), "checks": self.checks}
+        if age > 3 * self.interval:
+            body.update(ready=False, reason="probe is stale")
+        elif not self.checks.get(self.primary, {}).get("ok"):
+            body.update(ready=False, reason="primary database unavailable")
+        return body["ready"], body
+
+    async def _run(self) -> None:
+        """Probe every interval until cancelled."""
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error("db.probe.error", error=str(e))
+            await asyncio.sleep(self.interval)
+
+    async def _check_engine(self, engine: AsyncEngine) -> Tuple[Optional[str], float, bool]:
+        """Check one engine.
+
+        Returns:
+            tuple: The error (None when the engine answered or was busy), the
+                check duration, and whether its pool had no free connection
+        """
+        start = time.perf_counter()
+        if _saturated(engine):
+            return None, 0.0, True
+        try:
+            await asyncio.wait_for(self._ping_engine(engine), self.timeout)
+            return None, time.perf_counter() - start, False
+        except asyncio.TimeoutError:
+            if _saturated(engine):
+                return None, time.perf_counter() - start, True
+            return f"timed out after {self.timeout}s", time.perf_counter() - start, False
+        except Exception as e:
+            return str(e) or type(e).__name__, time.perf_counter() - start, False
+
+    async def _ping_engine(self, engine: AsyncEngine) -> None:
+        """Ping an engine over one pooled connection."""
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+def _saturated(engine: AsyncEngine) -> bool:
+    """Check whether every connection an engine's pool may open is checked out."""
+    saturated = getattr(engine.sync_engine.pool, "saturated", None)
+    return saturated is not None and saturated()
+
+# Global readiness probe instance, started with the application
+readiness_probe = ReadinessProbe(
+    engines,
+    interval=settings.db_probe_interval,
+    timeout=settings.db_probe_timeout,
+    router=read_router,
+)
@@ -0,0 +1,219 @@
+"""Cache for the results of executed SQL queries.
+
+This module provides a memory-bounded cache of query results keyed by the
+fingerprint of the query shape and its literal values. Every entry records the
+tables its query read, and is dropped as soon as one of those tables is written
+through the ORM or through an explicit invalidation. Results of queries whose
+tables cannot be extracted are not cached, as no write would invalidate them.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..settings import settings
+from ..utils.json_stream import dumps
+from ..utils.sql_fingerprint import normalize, referenced_tables
+
+class _Entry:
+    """A cached query result."""
+
+    __slots__ = ("rows", "tables", "size", "created_at", "expires_at")
+
+    def __init__(self, rows: list[dict], tables: FrozenSet[str], size: int, created_at: float, ttl: float):
+        self.rows = rows
+        self.tables = tables
+        self.size = size
+        self.created_at = created_at
+        self.expires_at = created_at + ttl
+
+class ResultCache:
+    """Memory-bounded LRU cache of query results with table-level invalidation.
+
+    Entry sizes are accounted as the length of their JSON encoding. Each table
+    carries a generation counter that is bumped on invalidation, so a result read
+    while a write to one of its tables was committed is never stored.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        """Initialize the result cache.
+
+        Args:
+            max_bytes: Total size budget of the cached results (0 disables caching)
+            ttl: Number of seconds an entry stays valid
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._keys_by_table: Dict[str, set] = {}
+        self._generations: Dict[str, int] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, sql: str) -> Optional[Tuple[list[dict], float]]:
+        """Get the cached result of a query.
+
+        Args:
+            sql: The SQL query
+
+        Returns:
+            Optional[tuple]: The cached rows and their age in seconds, or None
+        """
+        key = normalize(sql).cache_key
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is None or entry.expires_at <= now:
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.rows, now - entry.created_at
+
+    def snapshot(self, sql: str) -> Dict[str, int]:
+        """Capture the generations of the tables a query reads before running it.
+
+        Args:
+            sql: The SQL query
+
+        Returns:
+            dict: Generation of each table read by the query
+        """
+        return {table: self._generations.get(table, 0) for table in referenced_tables(sql)}
+
+    def put(self, sql: str, rows: list[dict], snapshot: Dict[str, int]) -> bool:
+        """Store the result of a query.
+
+        Args:
+            sql: The SQL query
+            rows: The result rows
+            snapshot: Table generations captured with snapshot() before execution
+
+        Returns:
+            bool: True if the result was cached
+        """
+        # Without the tables it read, no write would ever invalidate the result
+        if self.max_bytes <= 0 or not snapshot:
+            return False
+        # A table was written while the query ran, the rows may be stale
+        if any(self._generations.get(table, 0) != generation for table, generation in snapshot.items()):
+            return False
+
+        size = len(dumps(rows))
+        if size > self.max_bytes:
+            return False
+
+        key = normalize(sql).cache_key
+        if key in self._entries:
+            self._remove(key)
+
+        tables = frozenset(snapshot)
+        self._entries[key] = _Entry(rows, tables, size, time.monotonic(), self.ttl)
+        self.total_bytes += size
+        for table in tables:
+            self._keys_by_table.setdefault(table, set()).add(key)
+
+        while self.total_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return True
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """Drop every cached result that read one of the given tables.
+
+        Args:
+            tables: Names of the tables that were written
+
+        Returns:
+            int: Number of entries removed
+        """
+        removed = 0
+        for table in tables:
+            table = table.lower()
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key in list(self._keys_by_table.get(table, ())):
+                self._remove(key)
+                removed += 1
+        self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        self._entries.clear()
+        self._keys_by_table.clear()
+        self.total_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        """Remove one entry and its table index references."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry.size
+        for table in entry.tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+    def stats(self) -> Dict[str, int]:
+        """Get the cache counters.
+
+        Returns:
+            dict: Current size in entries and bytes, and hit/miss/eviction/invalidation counters
+        """
+        return {
+            "size": len(self._entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def note_write(self, session: Session, table: str) -> None:
+        """Record that the transaction of a session wrote to a table.
+
+        Cached results reading the table are invalidated when the transaction
+        commits. ORM flushes are recorded automatically; Core statements must be
+        recorded with this method.
+
+        Args:
+            session: The session (sync or async) running the transaction
+            table: Name of the written table
+        """
+        session.info.setdefault("written_tables", set()).add(table)
+
+# Global result cache instance
+result_cache = ResultCache(
+    max_bytes=settings.result_cache_max_bytes,
+    ttl=settings.result_cache_ttl,
+)
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_tables(session: Session, flush_context) -> None:
+    """Remember which tables a flush wrote to until the transaction ends."""
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        for table in instance.__mapper__.tables:
+            result_cache.note_write(session, table.name)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_written_tables(session: Session) -> None:
+    """Invalidate cached results of the tables written by a committed transaction."""
+    written = session.info.pop("written_tables", None)
+    if written:
+        result_cache.invalidate_tables(written)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_written_tables(session: Session) -> None:
+    """Forget the tables written by a rolled back transaction."""
+    session.info.pop("written_tables", None)
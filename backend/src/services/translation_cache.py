@@ -0,0 +1,167 @@
+"""Cache for natural language to SQL translations.
+
+This module provides a bounded LRU cache with per-entry TTL that sits in front of
+the translator, so repeated questions skip the LLM round trip. Cache keys combine
+a normalized form of the question with the current schema version, so cached SQL
+is never reused after a migration changes the tables it was generated for.
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from ..models.customer import Base
+from ..settings import settings
+
+# Translations that must never be cached (transient failures of the translator)
+UNCACHEABLE_SQL = {"-- TODO"}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = "?!.;, "
+
+def normalize_question(question: str) -> str:
+    """Normalize a question so trivially different phrasings share a cache entry.
+
+    Letter case is kept, because the values of a question ("customers named
+    Alice") end up in the SQL as written.
+
+    Args:
+        question: The natural language question
+
+    Returns:
+        str: The question with collapsed whitespace and no trailing punctuation
+    """
+    question = _WHITESPACE_RE.sub(" ", question.strip())
+    return question.rstrip(_TRAILING_PUNCTUATION)
+
+def current_schema_version() -> str:
+    """Get the schema version used to scope cache keys.
+
+    Uses the SCHEMA_VERSION setting when provided, otherwise a digest of the
+    tables and columns declared on the SQLAlchemy models.
+
+    Returns:
+        str: The schema version tag
+    """
+    if settings.schema_version:
+        return settings.schema_version
+    return _models_digest()
+
+@lru_cache(maxsize=1)
+def _models_digest() -> str:
+    """Digest the tables and columns declared on the models (computed once)."""
+    digest = hashlib.sha1()
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        digest.update(table.name.encode())
+        for column in table.columns:
+            digest.update(f"{column.name}:{column.type}".encode())
+    return digest.hexdigest()[:12]
+
+class TranslationCache:
+    """Bounded LRU cache with TTL for question translations.
+
+    This class stores SQL translations keyed by normalized question and schema
+    version, and keeps hit/miss/eviction counters for monitoring.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """Initialize the translation cache.
+
+        Args:
+            max_size: Maximum number of entries kept (0 disables caching)
+            ttl: Number of seconds an entry stays valid
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def make_key(self, question: str, schema_version: Optional[str] = None) -> str:
+        """Build the cache key for a question.
+
+        Args:
+            question: The natural language question
+            schema_version: Schema version to scope the key to (defaults to the current one)
+
+        Returns:
+            str: The cache key
+        """
+        if schema_version is None:
+            schema_version = current_schema_version()
+        return f"{schema_version}:{normalize_question(question)}"
+
+    def get(self, question: str) -> Optional[str]:
+        """Get the cached SQL for a question.
+
+        Args:
+            question: The natural language question
+
+        Returns:
+            Optional[str]: The cached SQL, or None if missing or expired
+        """
+        key = self.make_key(question)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        sql, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return sql
+
+    def set(self, question: str, sql: str) -> None:
+        """Store the SQL translation of a question.
+
+        Args:
+            question: The natural language question
+            sql: The SQL it was translated to
+        """
+        if self.max_size <= 0 or sql in UNCACHEABLE_SQL:
+            return
+
+        key = self.make_key(question)
+        self._entries[key] = (sql, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every cached translation."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the cache counters.
+
+        Returns:
+            dict: Current size and hit/miss/eviction/expiration counters
+        """
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Global translation cache instance
+translation_cache = TranslationCache(
+    max_size=settings.translation_cache_size,
+    ttl=settings.translation_cache_ttl,
+)
@@ -1,14 +1,78 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import Literal
 import os
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables.
     
     Attributes:
-        database_url: PostgreSQL connection URL with asyncpg driver
+        database_url: PostgreSQL connection URL with asyncpg driver (primary, takes the writes)
+        database_read_urls: Comma-separated connection URLs of the read replicas
+        db_pool_size: Connections kept open to the primary
+        db_max_overflow: Extra connections to the primary opened under load
+        db_pool_timeout: Seconds to wait for a connection to the primary
+        db_read_pool_size: Connections kept open to each read engine
+        db_read_max_overflow: Extra connections to each read engine opened under load
+        db_read_pool_timeout: Seconds to wait for a connection to a read engine
+        db_replica_retry: Seconds a failed replica is left out of the rotation
+        db_read_your_writes: Seconds a client reads from the primary after a write
+        db_pool_pre_ping: Ping connections on every checkout
+        db_pool_recycle: Seconds after which a pooled connection is replaced
+        db_probe_interval: Seconds between background database readiness probes
+        db_probe_timeout: Seconds a readiness probe of one engine may take
         api_keys: Comma-separated list of API keys for external services
         openai_api_key: OpenAI API key for LLM-powered SQL generation
+        openai_model: OpenAI chat model used for SQL generation
+        translator_backends: Translator backends asked in order, comma-separated
+        translator_models: LLM tiers from the cheapest to the most capable model, comma-separated
+        translator_explain_check: Escalate answers that fail EXPLAIN to the next LLM tier
+        translator_schema_context: Add a summary of the schema to the LLM prompt
+        translator_schema_max_tables: Maximum number of tables in the schema summary
+        translator_schema_refresh: Seconds between checks of the Alembic revision of the schema
+        translation_batch_window_ms: Milliseconds concurrent questions are collected into one LLM request
+        translation_batch_max_size: Maximum number of questions in one LLM request
+        translation_deadline: Seconds a translation may take, retries and escalations included
+        translation_attempt_timeout: Seconds allowed for one LLM call
+        translation_max_attempts: Maximum attempts per LLM call
+        translation_hedging: Send a duplicate LLM request when the first one is slow
+        translation_hedge_after_ms: Milliseconds before hedging (0 uses the p95 of recent calls)
+        translation_circuit_failures: Consecutive LLM failures that open the circuit breaker
+        translation_circuit_reset: Seconds the circuit breaker stays open before a probe call
+        translation_cache_size: Maximum number of cached question translations
+        translation_cache_ttl: Seconds a cached translation stays valid
+        schema_version: Schema version tag mixed into translation cache keys
+        coalesce_translations: Share one translation between concurrent identical questions
+        coalesce_executions: Share one execution between concurrent identical SQL queries
+        parameterize_sql: Execute generated SQL with its compared integers as bind parameters
+        stream_batch_size: Rows fetched per server-side cursor round trip when streaming
+        customers_page_size: Default number of customers per page
+        customers_max_page_size: Upper bound for the customers page size
+        customers_bulk_chunk_size: Rows loaded per transaction by bulk customer uploads
+        customers_bulk_max_errors: Row errors listed in the report of a bulk upload
+        result_cache_max_bytes: Memory budget of the query result cache
+        result_cache_ttl: Seconds a cached query result stays valid
+        query_max_cost: Highest planner cost accepted for generated SQL
+        query_max_rows: Highest estimated row count before generated SQL is capped
+        query_default_limit: LIMIT added to generated SQL without one
+        statement_timeout_ms: Statement timeout for generated SQL
+        plan_cache_size: Maximum number of cached plan verdicts
+        plan_cache_ttl: Seconds a cached plan verdict stays valid
+        batch_max_questions: Maximum number of questions in one batch request
+        batch_translation_concurrency: Concurrent translations per batch request
+        batch_execution_concurrency: Database sessions used by one batch request
+        rate_limit_per_minute: Default requests per minute per API key
+        rate_limit_overrides: Per-key requests per minute as "key=limit,..."
+        rate_limit_backend: Bucket storage, "memory" (per process) or "mmap" (shared by the workers of a host)
+        rate_limit_mmap_path: File backing the shared rate limit table
+        rate_limit_max_keys: Maximum number of rate limit buckets kept
+        log_level: Lowest log level written
+        log_queue_size: Maximum number of log events waiting for the writer thread
+        log_batch_size: Maximum number of log events written at once
+        log_overflow_policy: What happens to log events when the queue fills up
+        log_overflow_sample_rate: Fraction of log events kept by the "sample" overflow policy
+        log_sample_rates: Per-event sampling rates as "event=rate,..."
+        log_sql: Include the full SQL text in query log events
     """
     database_url: str = Field(
         ...,
@@ -16,6 +80,83 @@ class Settings(BaseSettings):
         pattern="^postgresql\\+asyncpg://.*",
         alias="DATABASE_URL"
     )
+    database_read_urls: str = Field(
+        "",
+        description="Comma-separated postgresql+asyncpg:// URLs of read replicas for generated queries (a separate pool on the primary when empty)",
+        pattern="^\\s*(?:postgresql\\+asyncpg://[^,]+(?:,\\s*postgresql\\+asyncpg://[^,]+)*,?\\s*)?$",
+        alias="DATABASE_READ_URLS"
+    )
+    db_pool_size: int = Field(
+        5,
+        description="Connections kept open to the primary",
+        ge=1,
+        alias="DB_POOL_SIZE"
+    )
+    db_max_overflow: int = Field(
+        10,
+        description="Extra connections to the primary opened under load",
+        ge=0,
+        alias="DB_MAX_OVERFLOW"
+    )
+    db_pool_timeout: float = Field(
+        30.0,
+        description="Seconds to wait for a connection to the primary",
+        gt=0,
+        alias="DB_POOL_TIMEOUT"
+    )
+    db_read_pool_size: int = Field(
+        5,
+        description="Connections kept open to each read engine",
+        ge=1,
+        alias="DB_READ_POOL_SIZE"
+    )
+    db_read_max_overflow: int = Field(
+        10,
+        description="Extra connections to each read engine opened under load",
+        ge=0,
+        alias="DB_READ_MAX_OVERFLOW"
+    )
+    db_read_pool_timeout: float = Field(
+        10.0,
+        description="Seconds to wait for a connection to a read engine",
+        gt=0,
+        alias="DB_READ_POOL_TIMEOUT"
+    )
+    db_replica_retry: float = Field(
+        30.0,
+        description="Seconds a replica whose connections failed is left out of the rotation",
+        gt=0,
+        alias="DB_REPLICA_RETRY"
+    )
+    db_read_your_writes: float = Field(
+        0.0,
+        description="Seconds a client reads from the primary after a write (0 disables pinning)",
+        ge=0,
+        alias="DB_READ_YOUR_WRITES"
+    )
+    db_pool_pre_ping: bool = Field(
+        True,
+        description="Ping connections on every checkout (when off, broken connections are invalidated when a query fails on them)",
+        alias="DB_POOL_PRE_PING"
+    )
+    db_pool_recycle: float = Field(
+        1800.0,
+        description="Seconds after which a pooled connection is replaced (-1 never)",
+        ge=-1,
+        alias="DB_POOL_RECYCLE"
+    )
+    db_probe_interval: float = Field(
+        10.0,
+        description="Seconds between background database readiness probes",
+        gt=0,
+        alias="DB_PROBE_INTERVAL"
+    )
+    db_probe_timeout: float = Field(
+        2.0,
+        description="Seconds a readiness probe of one engine may take",
+        gt=0,
+        alias="DB_PROBE_TIMEOUT"
+    )
     api_keys: str = Field(
         ...,
         description="Comma-separated list of API keys for external services",
@@ -28,6 +169,291 @@ class Settings(BaseSettings):
         min_length=1,
         alias="OPENAI_API_KEY"
     )
+    openai_model: str = Field(
+        "gpt-4o",
+        description="OpenAI chat model used for SQL generation",
+        alias="OPENAI_MODEL"
+    )
+    translator_backends: str = Field(
+        "search,patterns,llm",
+        description="Translator backends asked in order: search (indexed customer lookups), patterns (local matcher), llm (OpenAI)",
+        alias="TRANSLATOR_BACKENDS"
+    )
+    translator_models: str = Field(
+        "",
+        description="LLM tiers from the cheapest to the most capable model, e.g. gpt-4o-mini,gpt-4o (OPENAI_MODEL alone when empty)",
+        alias="TRANSLATOR_MODELS"
+    )
+    translator_explain_check: bool = Field(
+        True,
+        description="Escalate answers of the cheaper LLM tiers that fail EXPLAIN (PostgreSQL only)",
+        alias="TRANSLATOR_EXPLAIN_CHECK"
+    )
+    translator_schema_context: bool = Field(
+        True,
+        description="Add a compact summary of the schema to the LLM prompt",
+        alias="TRANSLATOR_SCHEMA_CONTEXT"
+    )
+    translator_schema_max_tables: int = Field(
+        8,
+        description="Maximum number of tables in the schema summary (the most relevant to the question are kept)",
+        ge=1,
+        alias="TRANSLATOR_SCHEMA_MAX_TABLES"
+    )
+    translator_schema_refresh: float = Field(
+        60.0,
+        description="Seconds between checks of the Alembic revision (the schema is read again after a migration)",
+        gt=0,
+        alias="TRANSLATOR_SCHEMA_REFRESH"
+    )
+    translation_batch_window_ms: float = Field(
+        0.0,
+        description="Milliseconds concurrent questions are collected into one LLM request (0 disables batching)",
+        ge=0,
+        alias="TRANSLATION_BATCH_WINDOW_MS"
+    )
+    translation_batch_max_size: int = Field(
+        16,
+        description="Maximum number of questions in one batched LLM request",
+        ge=1,
+        alias="TRANSLATION_BATCH_MAX_SIZE"
+    )
+    translation_deadline: float = Field(
+        15.0,
+        description="Seconds a translation may take, retries and tier escalations included",
+        gt=0,
+        alias="TRANSLATION_DEADLINE"
+    )
+    translation_attempt_timeout: float = Field(
+        10.0,
+        description="Seconds allowed for one LLM call",
+        gt=0,
+        alias="TRANSLATION_ATTEMPT_TIMEOUT"
+    )
+    translation_max_attempts: int = Field(
+        3,
+        description="Maximum attempts per LLM call, retries included",
+        ge=1,
+        alias="TRANSLATION_MAX_ATTEMPTS"
+    )
+    translation_hedging: bool = Field(
+        True,
+        description="Send a duplicate LLM request when the first one is slower than the hedge delay",
+        alias="TRANSLATION_HEDGING"
+    )
+    translation_hedge_after_ms: float = Field(
+        0.0,
+        description="Milliseconds before a slow LLM call is hedged (0 uses the p95 of recent calls)",
+        ge=0,
+        alias="TRANSLATION_HEDGE_AFTER_MS"
+    )
+    translation_circuit_failures: int = Field(
+        5,
+        description="Consecutive LLM failures that open the circuit breaker",
+        ge=1,
+        alias="TRANSLATION_CIRCUIT_FAILURES"
+    )
+    translation_circuit_reset: float = Field(
+        30.0,
+        description="Seconds the circuit breaker stays open before a probe call is allowed",
+        gt=0,
+        alias="TRANSLATION_CIRCUIT_RESET"
+    )
+    translation_cache_size: int = Field(
+        1024,
+        description="Maximum number of cached question translations (0 disables the cache)",
+        ge=0,
+        alias="TRANSLATION_CACHE_SIZE"
+    )
+    translation_cache_ttl: float = Field(
+        3600.0,
+        description="Seconds a cached translation stays valid",
+        gt=0,
+        alias="TRANSLATION_CACHE_TTL"
+    )
+    schema_version: str = Field(
+        "",
+        description="Schema version tag for cache keys (derived from the models when empty)",
+        alias="SCHEMA_VERSION"
+    )
+    coalesce_translations: bool = Field(
+        True,
+        description="Share one in-flight translation between concurrent identical questions",
+        alias="COALESCE_TRANSLATIONS"
+    )
+    coalesce_executions: bool = Field(
+        False,
+        description="Share one in-flight execution between concurrent identical SQL queries",
+        alias="COALESCE_EXECUTIONS"
+    )
+    parameterize_sql: bool = Field(
+        True,
+        description="Lift the compared integer literals of generated SQL into bind parameters, so query shapes reuse their statements",
+        alias="PARAMETERIZE_SQL"
+    )
+    stream_batch_size: int = Field(
+        500,
+        description="Rows fetched per server-side cursor round trip when streaming /query results",
+        gt=0,
+        alias="STREAM_BATCH_SIZE"
+    )
+    customers_page_size: int = Field(
+        100,
+        description="Default number of customers returned per page by GET /customers",
+        gt=0,
+        alias="CUSTOMERS_PAGE_SIZE"
+    )
+    customers_max_page_size: int = Field(
+        1000,
+        description="Maximum number of customers a client can request per page",
+        gt=0,
+        alias="CUSTOMERS_MAX_PAGE_SIZE"
+    )
+    customers_bulk_chunk_size: int = Field(
+        1000,
+        description="Rows loaded per transaction by POST /customers/bulk",
+        gt=0,
+        le=10000,
+        alias="CUSTOMERS_BULK_CHUNK_SIZE"
+    )
+    customers_bulk_max_errors: int = Field(
+        1000,
+        description="Row errors listed in the report of POST /customers/bulk (the rest are only counted)",
+        ge=0,
+        alias="CUSTOMERS_BULK_MAX_ERRORS"
+    )
+    result_cache_max_bytes: int = Field(
+        64 * 1024 * 1024,
+        description="Memory budget in bytes of the query result cache (0 disables the cache)",
+        ge=0,
+        alias="RESULT_CACHE_MAX_BYTES"
+    )
+    result_cache_ttl: float = Field(
+        30.0,
+        description="Seconds a cached query result stays valid",
+        gt=0,
+        alias="RESULT_CACHE_TTL"
+    )
+    query_max_cost: float = Field(
+        1_000_000.0,
+        description="Highest EXPLAIN total cost accepted for generated SQL (0 disables the check)",
+        ge=0,
+        alias="QUERY_MAX_COST"
+    )
+    query_max_rows: int = Field(
+        10_000,
+        description="Highest EXPLAIN row estimate before generated SQL is capped (0 disables the cap)",
+        ge=0,
+        alias="QUERY_MAX_ROWS"
+    )
+    query_default_limit: int = Field(
+        1000,
+        description="LIMIT added to generated SQL that has none (0 disables it)",
+        ge=0,
+        alias="QUERY_DEFAULT_LIMIT"
+    )
+    statement_timeout_ms: int = Field(
+        5000,
+        description="Statement timeout in milliseconds for generated SQL (0 disables it)",
+        ge=0,
+        alias="STATEMENT_TIMEOUT_MS"
+    )
+    plan_cache_size: int = Field(
+        1024,
+        description="Maximum number of cached EXPLAIN verdicts",
+        ge=0,
+        alias="PLAN_CACHE_SIZE"
+    )
+    plan_cache_ttl: float = Field(
+        300.0,
+        description="Seconds a cached EXPLAIN verdict stays valid",
+        gt=0,
+        alias="PLAN_CACHE_TTL"
+    )
+    batch_max_questions: int = Field(
+        200,
+        description="Maximum number of questions accepted by POST /query/batch",
+        gt=0,
+        alias="BATCH_MAX_QUESTIONS"
+    )
+    batch_translation_concurrency: int = Field(
+        8,
+        description="Maximum number of concurrent translations per batch request",
+        gt=0,
+        alias="BATCH_TRANSLATION_CONCURRENCY"
+    )
+    batch_execution_concurrency: int = Field(
+        4,
+        description="Number of database sessions shared by the queries of a batch request",
+        gt=0,
+        alias="BATCH_EXECUTION_CONCURRENCY"
+    )
+    rate_limit_per_minute: int = Field(
+        30,
+        description="Default maximum number of requests per minute per API key",
+        gt=0,
+        alias="RATE_LIMIT_PER_MINUTE"
+    )
+    rate_limit_overrides: str = Field(
+        "",
+        description="Per-key requests per minute as comma-separated key=limit pairs",
+        alias="RATE_LIMIT_OVERRIDES"
+    )
+    rate_limit_backend: Literal["memory", "mmap"] = Field(
+        "memory",
+        description="Rate limit bucket storage: per-process memory, or an mmap file shared by the workers of a host",
+        alias="RATE_LIMIT_BACKEND"
+    )
+    rate_limit_mmap_path: str = Field(
+        "",
+        description="File backing the shared rate limit table (defaults to /dev/shm/cloudlinker-rate-limit)",
+        alias="RATE_LIMIT_MMAP_PATH"
+    )
+    rate_limit_max_keys: int = Field(
+        65536,
+        description="Maximum number of rate limit buckets kept",
+        gt=0,
+        alias="RATE_LIMIT_MAX_KEYS"
+    )
+    log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = Field(
+        "INFO",
+        description="Lowest log level written",
+        alias="LOG_LEVEL"
+    )
+    log_queue_size: int = Field(
+        10000,
+        description="Maximum number of log events waiting for the background writer",
+        gt=0,
+        alias="LOG_QUEUE_SIZE"
+    )
+    log_batch_size: int = Field(
+        256,
+        description="Maximum number of log events written at once",
+        gt=0,
+        alias="LOG_BATCH_SIZE"
+    )
+    log_overflow_policy: Literal["drop", "sample"] = Field(
+        "drop",
+        description="Drop new log events while the queue is full, or sample them once it is half full",
+        alias="LOG_OVERFLOW_POLICY"
+    )
+    log_overflow_sample_rate: float = Field(
+        0.1,
+        description="Fraction of log events kept by the sample overflow policy",
+        ge=0,
+        le=1,
+        alias="LOG_OVERFLOW_SAMPLE_RATE"
+    )
+    log_sample_rates: str = Field(
+        "",
+        description="Per-event sampling rates as comma-separated event=rate pairs",
+        alias="LOG_SAMPLE_RATES"
+    )
+    log_sql: bool = Field(
+        False,
+        description="Include the full SQL text in query log events (only the fingerprint is logged otherwise)",
+        alias="LOG_SQL"
+    )
 
     class Config:
         env_file = os.getenv("ENV_FILE", ".env")
@@ -0,0 +1,116 @@
+"""Natural language to SQL translator.
+
+This package converts natural language questions into SQL queries. Questions go
+through a chain of backends: customer lookups by part of a name or email get the
+indexed search query, a local pattern matcher generated from the models
+answers common question shapes in microseconds, and OpenAI chat models answer
+everything else, starting with the cheapest model of TRANSLATOR_MODELS, with a
+cached summary of the schema in their prompt. The TRANSLATOR_BACKENDS setting
+picks the backends and their order.
+"""
+
+from typing import Dict, List
+
+from ..db import ReadSessionLocal, engine
+from ..models.customer import Base
+from ..settings import settings
+from .base import TranslatorBackend, TranslatorChain
+from ..utils.metrics import TRANSLATOR_CIRCUIT_OPENED, TRANSLATOR_CIRCUIT_STATE
+from .llm import ExplainCheck, LLMBackend, client
+from .patterns import PatternBackend
+from .resilience import CircuitBreaker, TranslationUnavailableError
+from .schema import SchemaContext
+from .search import SearchBackend
+
+__all__ = [
+    "CircuitBreaker",
+    "ExplainCheck",
+    "LLMBackend",
+    "PatternBackend",
+    "SchemaContext",
+    "SearchBackend",
+    "TranslatorBackend",
+    "TranslationUnavailableError",
+    "TranslatorChain",
+    "create_translator_chain",
+    "llm_backend",
+    "translate",
+    "translator_chain",
+]
+
+def translator_models() -> List[str]:
+    """Get the LLM tiers, from the first model asked to the last.
+
+    Returns:
+        list: The TRANSLATOR_MODELS setting, or OPENAI_MODEL alone when it is empty
+    """
+    models = [model.strip() for model in settings.translator_models.split(",") if model.strip()]
+    return models or [settings.openai_model]
+
+# Global LLM backend instance (its client can be swapped, e.g. for a local fake)
+llm_backend = LLMBackend(
+    client,
+    models=translator_models(),
+    check=ExplainCheck(ReadSessionLocal) if settings.translator_explain_check else None,
+    batch_window=settings.translation_batch_window_ms / 1000,
+    batch_max_size=settings.translation_batch_max_size,
+    timeout=settings.translation_attempt_timeout,
+    deadline=settings.translation_deadline,
+    max_attempts=settings.translation_max_attempts,
+    hedge=settings.translation_hedging,
+    hedge_after=settings.translation_hedge_after_ms / 1000,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.translation_circuit_failures,
+        reset_timeout=settings.translation_circuit_reset,
+        on_open=TRANSLATOR_CIRCUIT_OPENED.inc,
+    ),
+    schema=SchemaContext(
+        Base.metadata,
+        ReadSessionLocal,
+        max_tables=settings.translator_schema_max_tables,
+        refresh_interval=settings.translator_schema_refresh,
+    ) if settings.translator_schema_context else None,
+)
+TRANSLATOR_CIRCUIT_STATE.set_function(lambda: llm_backend.breaker.state_value)
+
+def create_translator_chain(names: str) -> TranslatorChain:
+    """Create the translator chain described by a comma-separated list of backends.
+
+    Args:
+        names: Backend names in the order they are asked ("search", "patterns", "llm")
+
+    Returns:
+        TranslatorChain: The chain of the named backends
+
+    Raises:
+        ValueError: If a backend name is unknown
+    """
+    available: Dict[str, TranslatorBackend] = {
+        "search": SearchBackend(engine.dialect.name),
+        "patterns": PatternBackend(Base.metadata),
+        "llm": llm_backend,
+    }
+    backends: List[TranslatorBackend] = []
+    for name in names.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in available:
+            raise ValueError(f"Unknown translator backend: {name!r}")
+        backends.append(available[name])
+    return TranslatorChain(backends)
+
+# Global translator chain instance
+translator_chain = create_translator_chain(settings.translator_backends)
+
+async def translate(question: str) -> str:
+    """Translate a natural language question into SQL.
+
+    Args:
+        question: The natural language question to translate
+
+    Returns:
+        str: The corresponding SQL query, "-- TODO" if translation not available,
+             or "-- BLOCKED" if the query is not a SELECT statement
+    """
+    return await translator_chain.translate(question)
@@ -0,0 +1,123 @@
+"""Translator backend interface and chain.
+
+A backend either answers a question with SQL (or a "-- TODO" / "-- BLOCKED"
+marker) or declines it by returning None. The chain asks its backends in order
+and returns the first answer, so cheap local backends can answer common
+questions before the LLM is involved. It also provides the question helpers
+shared by the local backends matching questions with regexes.
+"""
+
+import re
+import time
+from typing import Dict, Optional, Sequence
+
+# Optional request phrasing before the table name ("show me all the customers")
+REQUEST_VERB = r"(?:(?:show|list|get|find|give|display|return|fetch)(?:\s+me)?\s+)?(?:all\s+|every\s+)?(?:the\s+)?"
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = "?!.;, "
+
+def clean_question(question: str) -> str:
+    """Collapse the whitespace of a question and strip its trailing punctuation.
+
+    Args:
+        question: The natural language question
+
+    Returns:
+        str: The question as the local backends match it
+    """
+    return _WHITESPACE_RE.sub(" ", question.strip()).rstrip(_TRAILING_PUNCTUATION)
+
+def unquote(value: str) -> str:
+    """Strip matching quotes around a value.
+
+    Args:
+        value: A value as written in a question
+
+    Returns:
+        str: The value without its quotes
+    """
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value
+
+class TranslatorBackend:
+    """Backend translating natural language questions into SQL.
+
+    Attributes:
+        name: Name of the backend in settings, counters and logs
+    """
+
+    name = "backend"
+
+    async def translate(self, question: str) -> Optional[str]:
+        """Translate a question.
+
+        Args:
+            question: The natural language question to translate
+
+        Returns:
+            Optional[str]: The SQL query or a marker, or None if this backend
+                cannot answer the question
+        """
+        raise NotImplementedError
+
+class TranslatorChain:
+    """Ordered list of backends, each answering the questions the previous ones declined.
+
+    Attributes:
+        backends: The backends in the order they are asked
+        hits: Questions answered, by backend name
+        misses: Questions declined, by backend name
+        seconds: Total time spent, by backend name
+    """
+
+    def __init__(self, backends: Sequence[TranslatorBackend]):
+        """Initialize the chain.
+
+        Args:
+            backends: The backends in the order they are asked
+        """
+        self.backends = list(backends)
+        self.hits: Dict[str, int] = {backend.name: 0 for backend in self.backends}
+        self.misses: Dict[str, int] = {backend.name: 0 for backend in self.backends}
+        self.seconds: Dict[str, float] = {backend.name: 0.0 for backend in self.backends}
+
+    async def translate(self, question: str) -> str:
+        """Translate a question with the first backend that answers it.
+
+        Args:
+            question: The natural language question to translate
+
+        Returns:
+            str: The SQL query, or "-- TODO" if no backend answered
+        """
+        for backend in self.backends:
+            start = time.perf_counter()
+            sql = await backend.translate(question)
+            self.seconds[backend.name] += time.perf_counter() - start
+            if sql is not None:
+                self.hits[backend.name] += 1
+                return sql
+            self.misses[backend.name] += 1
+        return "-- TODO"
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Get the per-backend counters.
+
+        Returns:
+            dict: Hits, misses and total seconds, by backend name
+        """
+        return {
+            backend.name: {
+                "hits": self.hits[backend.name],
+                "misses": self.misses[backend.name],
+                "seconds": self.seconds[backend.name],
+            }
+            for backend in self.backends
+        }
+
+    def reset_stats(self) -> None:
+        """Reset the per-backend counters."""
+        for name in self.hits:
+            self.hits[name] = self.misses[name] = 0
+            self.seconds[name] = 0.0
@@ -0,0 +1,117 @@
+"""Micro-batching of concurrent translations.
+
+Questions arriving within a short window are collected and sent to the model as
+one request carrying a JSON array, so the system prompt and the request overhead
+are paid once per batch instead of once per question. Each caller gets the
+answer at its own position; if the batched request fails or its answer does not
+line up with the questions, every question is sent on its own instead. When the
+model is unavailable the error is passed to every caller without a fallback.
+
+Callers may give the deadline of their translation: a batch is sent with the
+earliest deadline of its questions, and each fallback with its own question's.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from ..utils.logger import get_logger
+from ..utils.metrics import TRANSLATION_BATCHES, TRANSLATION_BATCHED_QUESTIONS
+from .resilience import TranslationUnavailableError
+
+logger = get_logger(__name__)
+
+# Sends the questions of a batch to a model by a deadline, returning one answer per question
+BatchSender = Callable[[List[str], str, Optional[float]], Awaitable[List[str]]]
+# Sends a single question to a model by a deadline, never raising
+SingleSender = Callable[[str, str, Optional[float]], Awaitable[str]]
+# A pending question: its text, the future of its answer and its deadline
+Pending = Tuple[str, asyncio.Future, Optional[float]]
+
+class TranslationBatcher:
+    """Collects concurrent questions per model and answers them with one request.
+
+    A batch is sent when it reaches max_size questions or when the window has
+    elapsed since its first question, whichever comes first.
+    """
+
+    def __init__(self, send_batch: BatchSender, send_one: SingleSender, window: float, max_size: int):
+        """Initialize the batcher.
+
+        Args:
+            send_batch: Sends a batch of questions to a model
+            send_one: Sends one question to a model (used for single questions and fallbacks)
+            window: Seconds to wait for more questions after the first one of a batch
+            max_size: Maximum number of questions in one batch
+        """
+        self.send_batch = send_batch
+        self.send_one = send_one
+        self.window = window
+        self.max_size = max_size
+        self._pending: Dict[str, List[Pending]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, question: str, model: str, deadline: Optional[float] = None) -> str:
+        """Add a question to the next batch of a model and wait for its answer.
+
+        Args:
+            question: The natural language question
+            model: The chat model to ask
+            deadline: Monotonic time by which the answer is needed (the senders'
+                default budget when omitted)
+
+        Returns:
+            str: The answer of the model for this question
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(model, [])
+        pending.append((question, future, deadline))
+        if len(pending) >= self.max_size:
+            self._flush(model)
+        elif len(pending) == 1:
+            self._timers[model] = loop.call_later(self.window, self._flush, model)
+        return await future
+
+    def _flush(self, model: str) -> None:
+        """Send the pending batch of a model."""
+        timer = self._timers.pop(model, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._pending.pop(model, None)
+        if items:
+            task = asyncio.create_task(self._send(items, model))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, items: List[Pending], model: str) -> None:
+        """Answer the questions of a batch, falling back to one request per question."""
+        questions = [question for question, _, _ in items]
+        deadlines = [deadline for _, _, deadline in items if deadline is not None]
+        try:
+            if len(questions) == 1:
+                answers = [await self.send_one(questions[0], model, items[0][2])]
+            else:
+                answers = await self.send_batch(questions, model, min(deadlines, default=None))
+                if len(answers) != len(questions):
+                    raise ValueError(f"Expected {len(questions)} answers, got {len(answers)}")
+                TRANSLATION_BATCHES.labels("batched").inc()
+                TRANSLATION_BATCHED_QUESTIONS.inc(len(questions))
+        except TranslationUnavailableError as e:
+            # Sending each question on its own would only spend more of the budget
+            answers = [e] * len(questions)
+        except Exception as e:
+            TRANSLATION_BATCHES.labels("fallback").inc()
+            logger.warning("translator.batch.fallback", size=len(questions), model=model, error=str(e))
+            answers = await asyncio.gather(
+                *(self.send_one(question, model, deadline) for question, _, deadline in items),
+                return_exceptions=True,
+            )
+
+        for (_, future, _), answer in zip(items, answers):
+            if future.done():
+                continue
+            if isinstance(answer, BaseException):
+                future.set_exception(answer)
+            else:
+                future.set_result(answer)
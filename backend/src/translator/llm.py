@@ -0,0 +1,405 @@
+"""LLM translator backend.
+
+This module provides a backend that converts natural language questions into SQL
+queries with OpenAI chat models. Models are tried from the cheapest to the most
+capable: a question only reaches the next tier when the answer of the previous
+one is "-- TODO", fails the SQL sanitizer or fails the EXPLAIN check. Concurrent
+questions can be micro-batched into one request per model. A compact summary of
+the relevant tables is appended to the system prompt.
+
+Every translation has a time budget that retries and escalations must fit in.
+Calls slower than the recent p95 are hedged with a duplicate request, and a
+circuit breaker fails fast while the upstream keeps failing, so a degraded
+upstream surfaces as TranslationUnavailableError instead of a stalled request.
+"""
+
+import asyncio
+import json
+import random
+import time
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+import openai
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from ..settings import settings
+from ..utils.logger import get_logger
+from ..utils.metrics import (
+    TRANSLATION_HEDGES,
+    TRANSLATION_RETRIES,
+    TRANSLATOR_ROUTING,
+    TRANSLATOR_TIER_SECONDS,
+)
+from ..utils.sql_sanitizer import is_safe_select
+from .base import TranslatorBackend
+from .batching import TranslationBatcher
+from .resilience import CircuitBreaker, LatencyTracker, TranslationUnavailableError
+from .schema import SchemaContext
+
+logger = get_logger(__name__)
+
+# Configure OpenAI client
+client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+
+# System prompt for the LLM
+SYSTEM_PROMPT = """You are a secure SQL generator that converts natural language questions into SQL queries.
+Your task is to generate ONLY SELECT statements that are safe and efficient.
+
+Rules:
+1. ONLY generate SELECT statements - never UPDATE, DELETE, INSERT, DROP, etc.
+2. Use proper SQL syntax and best practices
+3. Return ONLY the SQL query without any explanation
+4. If the question cannot be translated to a SELECT statement, return "-- BLOCKED"
+5. If you're unsure about the translation, return "-- TODO"
+
+Format your response as a JSON object with a single "sql" field containing the SQL query.
+Example: {"sql": "SELECT * FROM customers WHERE name LIKE '%John%'"}
+"""
+
+# Instructions added to the system prompt when several questions are sent at once
+BATCH_PROMPT = SYSTEM_PROMPT + """
+You will receive a JSON array of questions instead of a single question. Apply the rules
+to each question independently and respond with a JSON object with a single "answers"
+field: an array holding, for each question in the same order, its SQL query as a string.
+Example: {"answers": ["SELECT COUNT(*) FROM customers", "-- TODO"]}
+"""
+
+# Heading of the schema summary appended to the system prompt
+SCHEMA_HEADING = "\nDatabase schema, one table per line as table(column type flags):\n"
+
+# Backoff between attempts: exponential from the base, capped, with jitter
+RETRY_BASE_WAIT = 0.25
+RETRY_MAX_WAIT = 2.0
+
+# Async check of generated SQL returning None when it is fine, or a short reason
+SQLCheck = Callable[[str], Awaitable[Optional[str]]]
+
+class ExplainCheck:
+    """Check that generated SQL plans against the database without running it.
+
+    EXPLAIN catches syntax errors and unknown tables or columns. The check only
+    runs on PostgreSQL; on other databases every query passes.
+    """
+
+    def __init__(self, session_factory: Callable):
+        """Initialize the check.
+
+        Args:
+            session_factory: Factory creating the sessions used for EXPLAIN
+        """
+        self.session_factory = session_factory
+
+    async def __call__(self, sql: str) -> Optional[str]:
+        async with self.session_factory() as session:
+            if session.get_bind().dialect.name != "postgresql":
+                return None
+            try:
+                await session.execute(text(f"EXPLAIN {sql}"))
+            except DBAPIError:
+                return "explain"
+        return None
+
+class LLMBackend(TranslatorBackend):
+    """Backend asking OpenAI chat models for the SQL, escalating from small to large models.
+
+    It answers every question, so it belongs at the end of a chain. Every tier
+    records its latency and routing decisions (answered, or escalated with the
+    reason) in the metrics registry.
+
+    Attributes:
+        breaker: Circuit breaker shared by every call to the upstream
+        latencies: Recent latencies of successful calls, used for hedging
+    """
+
+    name = "llm"
+
+    def __init__(
+        self,
+        client: openai.AsyncOpenAI,
+        models: Sequence[str],
+        timeout: float = 10.0,
+        check: Optional[SQLCheck] = None,
+        batch_window: float = 0.0,
+        batch_max_size: int = 16,
+        deadline: float = 15.0,
+        max_attempts: int = 3,
+        hedge: bool = True,
+        hedge_after: float = 0.0,
+        breaker: Optional[CircuitBreaker] = None,
+        schema: Optional[SchemaContext] = None,
+    ):
+        """Initialize the LLM backend.
+
+        Args:
+            client: The OpenAI client (or an object with the same chat.completions API)
+            models: The chat models to use, from the first tier to the last
+            timeout: Seconds allowed for one completion
+            check: Extra check of the answers of every tier but the last
+            batch_window: Seconds concurrent questions are collected into one
+                request (0 sends every question on its own)
+            batch_max_size: Maximum number of questions in one request
+            deadline: Seconds a whole translation may take, retries and escalations included
+            max_attempts: Maximum attempts per call, first one included
+            hedge: Whether slow calls are hedged with a duplicate request
+            hedge_after: Seconds before hedging (0 uses the p95 of recent calls)
+            breaker: Circuit breaker for the upstream (a default one when omitted)
+            schema: Schema context added to the prompt (no schema when omitted)
+        """
+        if not models:
+            raise ValueError("At least one model is required")
+        self.client = client
+        self.models = list(models)
+        self.timeout = timeout
+        self.check = check
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker(failure_threshold=5, reset_timeout=30.0)
+        self.latencies = LatencyTracker()
+        self.schema = schema
+        self.batcher: Optional[TranslationBatcher] = None
+        if batch_window > 0 and batch_max_size > 1:
+            self.batcher = TranslationBatcher(self.complete_batch, self.complete, batch_window, batch_max_size)
+
+    async def translate(self, question: str) -> Optional[str]:
+        """Translate a natural language question into SQL with the chat models.
+
+        Args:
+            question: The natural language question to translate
+
+        Returns:
+            str: The corresponding SQL query, "-- TODO" if translation not available,
+                 or "-- BLOCKED" if the query is not a SELECT statement
+
+        Raises:
+            TranslationUnavailableError: If no model answered within the time budget
+                or the circuit breaker is open
+        """
+        deadline = time.monotonic() + self.deadline
+        last_tier = len(self.models) - 1
+        for tier, model in enumerate(self.models):
+            start = time.perf_counter()
+            try:
+                if self.batcher is not None:
+                    sql = await self.batcher.submit(question, model, deadline)
+                else:
+                    sql = await self.complete(question, model, deadline)
+            except TranslationUnavailableError:
+                # The answer of the previous tier was rejected, so there is none to fall back to
+                if tier > 0:
+                    TRANSLATOR_ROUTING.labels(model, "unavailable").inc()
+                raise
+            TRANSLATOR_TIER_SECONDS.labels(model).observe(time.perf_counter() - start)
+
+            reason = None
+            if tier < last_tier and time.monotonic() < deadline:
+                reason = await self.escalation_reason(sql)
+            if reason is None:
+                TRANSLATOR_ROUTING.labels(model, "answered").inc()
+                return sql
+            TRANSLATOR_ROUTING.labels(model, f"escalated_{reason}").inc()
+            logger.info("translator.llm.escalated", model=model, next_model=self.models[tier + 1], reason=reason)
+        return sql
+
+    async def escalation_reason(self, sql: str) -> Optional[str]:
+        """Decide whether an answer must be escalated to the next tier.
+
+        Args:
+            sql: The answer of a tier
+
+        Returns:
+            Optional[str]: None to accept the answer, otherwise the reason
+                ("todo", "unsafe", or the reason given by the check)
+        """
+        if sql == "-- TODO":
+            return "todo"
+        if sql == "-- BLOCKED":
+            return None
+        if not is_safe_select(sql):
+            return "unsafe"
+        if self.check is not None:
+            try:
+                return await self.check(sql)
+            except Exception as e:
+                logger.warning("translator.llm.check_error", error=str(e))
+        return None
+
+    async def complete(self, question: str, model: str, deadline: Optional[float] = None) -> str:
+        """Ask one chat model for the SQL of a question.
+
+        Args:
+            question: The natural language question to translate
+            model: The chat model to use
+            deadline: Monotonic time by which the answer is needed (the backend
+                time budget from now when omitted)
+
+        Returns:
+            str: The SQL query or marker answered by the model, "-- TODO" if the
+                answer cannot be parsed
+
+        Raises:
+            TranslationUnavailableError: If the model did not answer in time
+        """
+        response = await self.request(
+            model,
+            [
+                {"role": "system", "content": await self.system_prompt(SYSTEM_PROMPT, [question])},
+                {"role": "user", "content": question}
+            ],
+            deadline,
+        )
+        try:
+            # Parse the response
+            result = json.loads(response.choices[0].message.content)
+            # Return the SQL query
+            return result.get("sql", "-- TODO")
+        except Exception as e:
+            logger.error("translator.llm.invalid_answer", error=str(e), model=model)
+            return "-- TODO"
+
+    async def complete_batch(self, questions: List[str], model: str, deadline: Optional[float] = None) -> List[str]:
+        """Ask one chat model for the SQL of several questions in one request.
+
+        Args:
+            questions: The natural language questions to translate
+            model: The chat model to use
+            deadline: Monotonic time by which the answers are needed (the backend
+                time budget from now when omitted)
+
+        Returns:
+            list: One SQL query or marker per question, in order
+
+        Raises:
+            ValueError: If the answer is not one string per question
+            TranslationUnavailableError: If the model did not answer in time
+        """
+        response = await self.request(
+            model,
+            [
+                {"role": "system", "content": await self.system_prompt(BATCH_PROMPT, questions)},
+                {"role": "user", "content": json.dumps(questions)}
+            ],
+            deadline,
+        )
+        answers = json.loads(response.choices[0].message.content).get("answers")
+        if not isinstance(answers, list) or not all(isinstance(answer, str) for answer in answers):
+            raise ValueError("Batched answer is not a list of SQL strings")
+        return answers
+
+    async def system_prompt(self, prompt: str, questions: List[str]) -> str:
+        """Append the schema of the tables relevant to the questions to a system prompt.
+
+        Args:
+            prompt: The instructions of the system prompt
+            questions: The questions of the request
+
+        Returns:
+            str: The system prompt
+        """
+        if self.schema is None:
+            return prompt
+        return prompt + SCHEMA_HEADING + await self.schema.render(questions)
+
+    async def request(self, model: str, messages: list, deadline: Optional[float] = None):
+        """Call the chat completions API with retries, hedging and the circuit breaker.
+
+        Attempts are retried with jittered exponential backoff as long as the
+        next attempt can start before the deadline.
+
+        Args:
+            model: The chat model to use
+            messages: The chat messages
+            deadline: Monotonic time by which the answer is needed (the backend
+                time budget from now when omitted)
+
+        Returns:
+            The chat completion
+
+        Raises:
+            TranslationUnavailableError: If the circuit is open, the attempts are
+                exhausted or the deadline has passed
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            if not self.breaker.allow_request():
+                raise TranslationUnavailableError("Translation service unavailable", self.breaker.retry_after() or 1.0)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TranslationUnavailableError("Translation deadline exceeded")
+
+            start = time.monotonic()
+            try:
+                response = await self._hedged(model, messages, min(self.timeout, remaining))
+            except asyncio.CancelledError:
+                # A cancelled call has no outcome, but must not keep the probe claimed
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                self.breaker.record_failure()
+                attempt += 1
+                logger.warning("translator.llm.error", error=str(e) or type(e).__name__, model=model, attempt=attempt)
+                wait = min(RETRY_MAX_WAIT, RETRY_BASE_WAIT * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                if attempt >= self.max_attempts or time.monotonic() + wait >= deadline:
+                    raise TranslationUnavailableError(
+                        "Translation service unavailable", self.breaker.retry_after() or 1.0
+                    ) from e
+                TRANSLATION_RETRIES.inc()
+                await asyncio.sleep(wait)
+                continue
+
+            self.breaker.record_success()
+            self.latencies.record(time.monotonic() - start)
+            return response
+
+    async def _hedged(self, model: str, messages: list, timeout: float):
+        """Send a request, and a duplicate if the first one is slower than the hedge delay.
+
+        The first successful response wins and the other request is cancelled.
+        """
+        delay = self.hedge_delay() if self.hedge else None
+        tasks = {asyncio.create_task(self._create(model, messages, timeout))}
+        try:
+            if delay is not None and delay < timeout:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    TRANSLATION_HEDGES.inc()
+                    tasks.add(asyncio.create_task(self._create(model, messages, timeout - delay)))
+
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _create(self, model: str, messages: list, timeout: float):
+        """Make one chat completion call bounded by a timeout."""
+        return await asyncio.wait_for(
+            self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                timeout=timeout,
+            ),
+            timeout,
+        )
+
+    def hedge_delay(self) -> Optional[float]:
+        """Get the seconds after which a call is hedged.
+
+        Returns:
+            Optional[float]: The configured delay, else the p95 of recent calls
+                (None until enough calls have been seen)
+        """
+        if self.hedge_after > 0:
+            return self.hedge_after
+        return self.latencies.percentile(0.95)
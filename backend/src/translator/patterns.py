@@ -0,0 +1,159 @@
+"""Local pattern-based translator backend.
+
+This backend answers common question shapes ("how many customers are there",
+"list customers named X", "latest 5 customers") without calling the LLM. Its
+patterns are generated from the tables and columns of the SQLAlchemy models, so
+they follow the schema as it changes. Questions that match no pattern, or whose
+values do not fit the column type, are declined and left to the next backend.
+"""
+
+import re
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import MetaData, Table
+from sqlalchemy.sql.sqltypes import DateTime, Integer, String
+
+from ..utils.sql_sanitizer import is_safe_select
+from .base import REQUEST_VERB, TranslatorBackend, clean_question, unquote
+
+# A compared value: one quoted string or one word, so conditions are not read as values
+_VALUE = r"(?P<value>'[^']*'|\"[^\"]*\"|\S+)"
+# Unquoted words that make a condition something other than equality with a value
+_OPERATOR_WORDS = frozenset({
+    "not", "and", "or", "null", "like", "than", "contains", "starts", "ends", "ending",
+})
+
+# Rows returned by "latest customers" when the question gives no number
+DEFAULT_RECENT_LIMIT = 10
+
+Pattern = Tuple["re.Pattern[str]", Callable[["re.Match[str]"], Optional[str]]]
+
+def _singular(name: str) -> str:
+    """Get the naive singular of a plural table name."""
+    if name.endswith("ies"):
+        return name[:-3] + "y"
+    if name.endswith("s"):
+        return name[:-1]
+    return name
+
+def _words(name: str) -> List[str]:
+    """Get the spellings of an identifier in a question ("created_at", "created at")."""
+    spellings = {name, name.replace("_", " ")}
+    return sorted(spellings, key=len, reverse=True)
+
+def sql_literal(value: str, column_type) -> Optional[str]:
+    """Render a value from a question as a SQL literal for a column.
+
+    Args:
+        value: The value as written in the question
+        column_type: SQLAlchemy type of the column
+
+    Returns:
+        Optional[str]: The literal, or None if the value does not fit the column
+    """
+    if isinstance(column_type, Integer):
+        # isdigit() alone accepts characters such as "²" that int() rejects
+        return str(int(value)) if value.isascii() and value.isdigit() else None
+    if isinstance(column_type, String):
+        return "'" + value.replace("'", "''") + "'"
+    return None
+
+class PatternBackend(TranslatorBackend):
+    """Backend matching questions against patterns generated from the schema."""
+
+    name = "patterns"
+
+    def __init__(self, metadata: MetaData):
+        """Build the patterns of every table.
+
+        Args:
+            metadata: Metadata holding the tables the questions refer to
+        """
+        self.tables: List[Tuple[Tuple[str, ...], List[Pattern]]] = []
+        for table in sorted(metadata.tables.values(), key=lambda table: table.name):
+            names = tuple({table.name.lower(), _singular(table.name.lower())})
+            self.tables.append((names, self._table_patterns(table, names)))
+
+    async def translate(self, question: str) -> Optional[str]:
+        return self.match(question)
+
+    def match(self, question: str) -> Optional[str]:
+        """Translate a question if it matches one of the patterns.
+
+        Args:
+            question: The natural language question
+
+        Returns:
+            Optional[str]: The SQL query, or None if no pattern matches
+        """
+        question = clean_question(question)
+        lowered = question.lower()
+        for names, patterns in self.tables:
+            # Cheap check before trying the patterns of a table
+            if not any(name in lowered for name in names):
+                continue
+            for pattern, build in patterns:
+                match = pattern.fullmatch(question)
+                if match is None:
+                    continue
+                sql = build(match)
+                if sql is not None and is_safe_select(sql):
+                    return sql
+        return None
+
+    @staticmethod
+    def _table_patterns(table: Table, names: Tuple[str, ...]) -> List[Pattern]:
+        """Generate the patterns answering questions about one table."""
+        table_re = "(?:" + "|".join(sorted(names, key=len, reverse=True)) + ")"
+        columns = {column.name: column for column in table.columns}
+        patterns: List[Pattern] = []
+
+        def add(regex: str, build: Callable[["re.Match[str]"], Optional[str]]) -> None:
+            patterns.append((re.compile(regex, re.IGNORECASE), build))
+
+        add(
+            rf"(?:how many|count(?: the)?|(?:what is the )?(?:total )?number of) (?:all )?{table_re}"
+            r"(?: are there| do we have| exist| there are)?",
+            lambda match: f"SELECT COUNT(*) AS count FROM {table.name}",
+        )
+        add(rf"{REQUEST_VERB}{table_re}", lambda match: f"SELECT * FROM {table.name}")
+
+        def where(column) -> Callable[["re.Match[str]"], Optional[str]]:
+            def build(match: "re.Match[str]") -> Optional[str]:
+                value = match.group("value")
+                if value.lower() in _OPERATOR_WORDS:
+                    return None
+                literal = sql_literal(unquote(value), column.type)
+                if literal is None:
+                    return None
+                return f"SELECT * FROM {table.name} WHERE {column.name} = {literal}"
+            return build
+
+        if "name" in columns:
+            add(rf"{REQUEST_VERB}{table_re} (?:named|called) {_VALUE}", where(columns["name"]))
+
+        primary_keys = [column for column in table.primary_key.columns if isinstance(column.type, Integer)]
+        if len(primary_keys) == 1:
+            add(rf"{REQUEST_VERB}{table_re} (?:#|number |no\. ?)?(?P<value>[0-9]+)", where(primary_keys[0]))
+
+        for column in table.columns:
+            if not isinstance(column.type, (Integer, String)):
+                continue
+            column_re = "(?:" + "|".join(re.escape(word) for word in _words(column.name)) + ")"
+            add(
+                rf"{REQUEST_VERB}{table_re} (?:where|whose|with)(?: an?| the)? {column_re}"
+                rf"(?: is| =| equals| of)? {_VALUE}",
+                where(column),
+            )
+
+        if "created_at" in columns and isinstance(columns["created_at"].type, DateTime):
+            def recent(direction: str) -> Callable[["re.Match[str]"], Optional[str]]:
+                def build(match: "re.Match[str]") -> str:
+                    limit = int(match.group("limit") or DEFAULT_RECENT_LIMIT)
+                    return f"SELECT * FROM {table.name} ORDER BY created_at {direction} LIMIT {limit}"
+                return build
+
+            add(rf"{REQUEST_VERB}(?:latest|newest|most recent|last) (?:(?P<limit>[0-9]+) )?{table_re}", recent("DESC"))
+            add(rf"{REQUEST_VERB}(?:oldest|first) (?:(?P<limit>[0-9]+) )?{table_re}", recent("ASC"))
+
+        return patterns
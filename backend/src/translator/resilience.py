@@ -0,0 +1,164 @@
+"""Resilience helpers for calls to the LLM.
+
+This module provides the pieces that keep a degraded upstream from holding
+requests: a circuit breaker that fails fast while the upstream is unhealthy, and
+a latency tracker whose recent p95 decides when a hedged duplicate request is
+worth sending.
+"""
+
+import math
+import time
+from collections import deque
+from typing import Callable, Optional
+
+# Circuit breaker states, with the values exported as a gauge
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class TranslationUnavailableError(Exception):
+    """The LLM could not answer within the time budget, or the circuit is open.
+
+    Attributes:
+        retry_after: Seconds after which the caller may try again
+    """
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Circuit breaker counting consecutive failures of an upstream.
+
+    After failure_threshold consecutive failures the circuit opens and every call
+    is refused for reset_timeout seconds. Then a single probe call is let through
+    (half-open): its success closes the circuit, its failure opens it again.
+
+    Attributes:
+        state: "closed", "half_open" or "open"
+        failures: Consecutive failures while closed
+        opened: Number of times the circuit opened
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        on_open: Optional[Callable[[], None]] = None,
+    ):
+        """Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe is allowed
+            on_open: Called every time the circuit opens (e.g. to count it in a metric)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_open = on_open
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Check whether a call may be made now (claims the probe when half-open).
+
+        Returns:
+            bool: True if the call may proceed
+        """
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit."""
+        self.state = CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit when the threshold is reached."""
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self._open()
+
+    def release_probe(self) -> None:
+        """Give up a claimed probe without an outcome, e.g. when the call was cancelled."""
+        self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        """Get the seconds until the circuit lets a probe through.
+
+        Returns:
+            float: Seconds until the next call may be made (0 when closed)
+        """
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def reset(self) -> None:
+        """Close the circuit and forget the failures."""
+        self.record_success()
+
+    @property
+    def state_value(self) -> int:
+        """The state as a number (0 closed, 1 half-open, 2 open)."""
+        return STATE_VALUES[self.state]
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.failures = 0
+        self.opened += 1
+        self._opened_at = time.monotonic()
+        if self.on_open is not None:
+            self.on_open()
+
+class LatencyTracker:
+    """Rolling window of call latencies.
+
+    Attributes:
+        min_samples: Samples needed before percentiles are reported
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """Initialize the tracker.
+
+        Args:
+            window: Number of most recent latencies kept
+            min_samples: Samples needed before percentiles are reported
+        """
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of a successful call."""
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Get a nearest-rank percentile of the recent latencies.
+
+        Args:
+            fraction: Percentile as a fraction between 0 and 1
+
+        Returns:
+            Optional[float]: The percentile, or None with too few samples
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
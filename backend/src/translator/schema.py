@@ -0,0 +1,268 @@
+"""Schema context for the LLM prompt.
+
+Without the schema the model has to guess table and column names. This module
+renders a compact summary of the tables, one line per table:
+
+    customers(id int pk, name text, email text uniq, created_at timestamp)
+
+The summary is read from the database (SQLAlchemy reflection, which reads
+information_schema and the catalog) and falls back to the model metadata when
+the database cannot be read. It is cached per Alembic revision, so it is only
+rebuilt after a migration. For large schemas only the tables the question
+refers to are included.
+"""
+
+import asyncio
+import re
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import MetaData, Table, UniqueConstraint, text
+from sqlalchemy.sql import sqltypes
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Table holding the Alembic revision, left out of the summary
+ALEMBIC_VERSION_TABLE = "alembic_version"
+
+_WORD_RE = re.compile(r"[a-z0-9_]+")
+
+# Compact type names, checked in order (subclasses before their bases)
+_TYPE_NAMES = (
+    (sqltypes.Boolean, "bool"),
+    (sqltypes.BigInteger, "bigint"),
+    (sqltypes.Integer, "int"),
+    (sqltypes.Numeric, "num"),
+    (sqltypes.DateTime, "timestamp"),
+    (sqltypes.Date, "date"),
+    (sqltypes.Time, "time"),
+    (sqltypes.JSON, "json"),
+    (sqltypes.String, "text"),
+)
+
+def type_name(column_type) -> str:
+    """Get the compact name of a column type.
+
+    Args:
+        column_type: SQLAlchemy type of the column
+
+    Returns:
+        str: A short name such as "int", "text" or "timestamp"
+    """
+    for cls, name in _TYPE_NAMES:
+        if isinstance(column_type, cls):
+            return name
+    return str(column_type).lower()
+
+def render_table(table: Table) -> str:
+    """Render one table as a single summary line.
+
+    Columns are flagged pk, uniq, idx (indexed) and ->table.column (foreign key);
+    indexes over several columns are listed after the columns.
+
+    Args:
+        table: The table to render
+
+    Returns:
+        str: The summary line of the table
+    """
+    unique: Set[str] = set()
+    indexed: Set[str] = set()
+    composite: List[str] = []
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint) and len(constraint.columns) == 1:
+            unique.add(next(iter(constraint.columns)).name)
+    for index in sorted(table.indexes, key=lambda index: index.name or ""):
+        columns = [column.name for column in index.columns]
+        if len(columns) == 1:
+            (unique if index.unique else indexed).add(columns[0])
+        elif columns:
+            composite.append(f"{'uniq' if index.unique else 'idx'}({','.join(columns)})")
+
+    parts = []
+    for column in table.columns:
+        words = [column.name, type_name(column.type)]
+        if column.primary_key:
+            words.append("pk")
+        elif column.unique or column.name in unique:
+            words.append("uniq")
+        elif column.name in indexed:
+            words.append("idx")
+        for foreign_key in column.foreign_keys:
+            words.append(f"->{foreign_key.target_fullname}")
+        parts.append(" ".join(words))
+    return f"{table.name}({', '.join(parts + composite)})"
+
+def _question_words(question: str) -> Set[str]:
+    """Get the lowercase words of a question, with naive singulars."""
+    words = set(_WORD_RE.findall(question.lower()))
+    return words | {word[:-1] for word in words if word.endswith("s")}
+
+def _identifier_words(name: str) -> Set[str]:
+    """Get the words a question may use for an identifier ("order_items" -> order, item)."""
+    name = name.lower()
+    words = {name} | {part for part in name.split("_") if len(part) > 2}
+    return words | {word[:-1] for word in words if word.endswith("s")}
+
+class SchemaSummary:
+    """Rendered summary of a schema, able to select the tables relevant to a question."""
+
+    def __init__(self, metadata: MetaData, revision: Optional[str] = None):
+        """Render every table of a schema.
+
+        Args:
+            metadata: Metadata holding the tables
+            revision: Alembic revision the tables were read at
+        """
+        self.revision = revision
+        self.tables = {
+            table.name: table
+            for table in sorted(metadata.tables.values(), key=lambda table: table.name)
+            if table.name != ALEMBIC_VERSION_TABLE
+        }
+        self.lines = {name: render_table(table) for name, table in self.tables.items()}
+
+    def render(self, questions: Iterable[str], max_tables: int) -> str:
+        """Render the tables relevant to some questions.
+
+        Every table is included when there are at most max_tables of them.
+        Otherwise tables are ranked by how many of their names and column names
+        appear in the questions, and the tables their foreign keys point to are
+        added while there is room. When no table matches, the first max_tables
+        tables are included.
+
+        Args:
+            questions: The questions the summary is for
+            max_tables: Maximum number of tables in the summary
+
+        Returns:
+            str: One line per table
+        """
+        if len(self.tables) <= max_tables:
+            return "\n".join(self.lines.values())
+
+        words: Set[str] = set()
+        for question in questions:
+            words |= _question_words(question)
+        scores: Dict[str, int] = {}
+        for name, table in self.tables.items():
+            score = 3 * len(_identifier_words(name) & words)
+            score += sum(1 for column in table.columns if _identifier_words(column.name) & words)
+            if score:
+                scores[name] = score
+
+        selected = sorted(scores, key=lambda name: (-scores[name], name))[:max_tables]
+        for name in list(selected):
+            for foreign_key in self.tables[name].foreign_keys:
+                target = foreign_key.column.table.name
+                if len(selected) < max_tables and target in self.tables and target not in selected:
+                    selected.append(target)
+        if not selected:
+            selected = list(self.tables)[:max_tables]
+        return "\n".join(self.lines[name] for name in sorted(selected))
+
+def _reflect(connection) -> MetaData:
+    """Read the tables of a database with a synchronous connection."""
+    metadata = MetaData()
+    metadata.reflect(bind=connection)
+    return metadata
+
+class SchemaContext:
+    """Cache of the schema summary, keyed by the Alembic revision of the database.
+
+    The revision is checked at most every refresh_interval seconds; the schema is
+    only read again when it has changed.
+    """
+
+    def __init__(
+        self,
+        metadata: MetaData,
+        session_factory: Optional[Callable] = None,
+        max_tables: int = 8,
+        refresh_interval: float = 60.0,
+    ):
+        """Initialize the schema context.
+
+        Args:
+            metadata: Model metadata, used when the database cannot be read
+            session_factory: Factory creating the sessions used to read the
+                schema (None always uses the model metadata)
+            max_tables: Maximum number of tables in a summary
+            refresh_interval: Seconds between checks of the Alembic revision
+        """
+        self.metadata = metadata
+        self.session_factory = session_factory
+        self.max_tables = max_tables
+        self.refresh_interval = refresh_interval
+        self._summaries: Dict[Optional[str], SchemaSummary] = {}
+        self._revision: Optional[str] = None
+        self._checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def render(self, questions: Iterable[str]) -> str:
+        """Render the schema context for some questions.
+
+        Args:
+            questions: The questions the summary is for
+
+        Returns:
+            str: The summary of the relevant tables
+        """
+        summary = await self.summary()
+        return summary.render(questions, self.max_tables)
+
+    async def summary(self) -> SchemaSummary:
+        """Get the summary of the schema at the current revision.
+
+        Returns:
+            SchemaSummary: The cached summary, read again after a migration
+        """
+        if self._stale():
+            async with self._lock:
+                if self._stale():
+                    await self._refresh()
+                    self._checked_at = time.monotonic()
+        return self._summaries[self._revision]
+
+    def _stale(self) -> bool:
+        """Check whether the revision is due to be checked again."""
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.refresh_interval
+
+    def clear(self) -> None:
+        """Forget the cached summaries."""
+        self._summaries.clear()
+        self._revision = None
+        self._checked_at = None
+
+    async def _refresh(self) -> None:
+        """Read the revision, and the schema when the revision is new."""
+        if self.session_factory is None:
+            self._revision = None
+            self._summaries.setdefault(None, SchemaSummary(self.metadata))
+            return
+        try:
+            async with self.session_factory() as session:
+                revision = await self._read_revision(session)
+                if revision is None or revision not in self._summaries:
+                    connection = await session.connection()
+                    metadata = await connection.run_sync(_reflect)
+                    if not metadata.tables:
+                        metadata = self.metadata
+                    self._summaries = {revision: SchemaSummary(metadata, revision)}
+                    logger.info("translator.schema.loaded", revision=revision, tables=len(metadata.tables))
+            self._revision = revision
+        except Exception as e:
+            logger.warning("translator.schema.reflect_error", error=str(e))
+            self._revision = None
+            self._summaries = {None: SchemaSummary(self.metadata)}
+
+    async def _read_revision(self, session) -> Optional[str]:
+        """Read the Alembic revision of the database (None when not migrated)."""
+        try:
+            result = await session.execute(text(f"SELECT version_num FROM {ALEMBIC_VERSION_TABLE}"))
+            return result.scalar()
+        except Exception:
+            await session.rollback()
+            return None
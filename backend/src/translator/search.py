@@ -0,0 +1,74 @@
+"""Customer search translator backend.
+
+Questions looking customers up by part of their name or email ("find customers
+whose name starts with Jo", "customers with an email containing acme") are
+answered with the query of GET /customers/search, which the search indexes
+serve, instead of asking the LLM and running a LIKE '%...%' scan.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..services.customer_service import search_statement
+from ..utils.sql_sanitizer import is_safe_select
+from .base import REQUEST_VERB, TranslatorBackend, clean_question, unquote
+
+# Request phrasing specific to searches, before the table name
+_SEARCH_VERB = rf"(?:(?:search|look ?up)(?: for)? (?:all |the )?|{REQUEST_VERB})"
+_TABLE = r"(?:customers?|clients?)"
+_FIELD = r"(?P<field>name|e-?mail)(?: address)?"
+_PREFIX = r"(?:starts|begins|starting|beginning) with"
+_FUZZY = r"(?:contains|containing|includes|including|is like|like|similar to|resembling|matching|matches)"
+
+# Question shapes: regex, search mode, and field when the regex does not capture one
+_QUESTION_SHAPES = [
+    (rf"{_SEARCH_VERB}{_TABLE} (?:whose |with (?:an? |the )?){_FIELD} {_PREFIX} (?P<term>.+)", "prefix", None),
+    (rf"{_SEARCH_VERB}{_TABLE} (?:whose |with (?:an? |the )?){_FIELD} {_FUZZY} (?P<term>.+)", "fuzzy", None),
+    (rf"{_SEARCH_VERB}{_TABLE} (?:named|called) (?:something )?like (?P<term>.+)", "fuzzy", "name"),
+    (rf"{_SEARCH_VERB}{_TABLE} (?:matching|like|similar to) (?P<term>.+)", "fuzzy", "any"),
+]
+QUESTIONS: List[Tuple["re.Pattern[str]", str, Optional[str]]] = [
+    (re.compile(regex, re.IGNORECASE), mode, field) for regex, mode, field in _QUESTION_SHAPES
+]
+
+class SearchBackend(TranslatorBackend):
+    """Backend answering customer lookups with the indexed search query."""
+
+    name = "search"
+
+    def __init__(self, dialect_name: str):
+        """Initialize the backend.
+
+        Args:
+            dialect_name: Name of the database dialect the queries run on
+        """
+        self.dialect = postgresql.asyncpg.dialect() if dialect_name == "postgresql" else sqlite.dialect()
+
+    async def translate(self, question: str) -> Optional[str]:
+        return self.match(question)
+
+    def match(self, question: str) -> Optional[str]:
+        """Translate a question if it is a customer lookup by name or email.
+
+        Args:
+            question: The natural language question
+
+        Returns:
+            Optional[str]: The search query, or None if the question is not a lookup
+        """
+        question = clean_question(question)
+        for pattern, mode, field in QUESTIONS:
+            match = pattern.fullmatch(question)
+            if match is None:
+                continue
+            term = unquote(match.group("term")).strip()
+            if not term:
+                return None
+            if field is None:
+                field = "name" if match.group("field").lower() == "name" else "email"
+            stmt = search_statement(term, mode, field, self.dialect.name)
+            sql = str(stmt.compile(dialect=self.dialect, compile_kwargs={"literal_binds": True}))
+            return sql if is_safe_select(sql) else None
+        return None
@@ -0,0 +1,163 @@
+"""Incremental parsers for bulk uploads.
+
+This module reads NDJSON or CSV records from a streamed request body as the
+chunks arrive, so an upload is never held in memory as a whole. Every record
+is yielded with its line number, and records that cannot be parsed carry an
+error instead of failing the upload.
+"""
+
+import csv
+import json
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+from .json_stream import NDJSON_MEDIA_TYPE
+
+CSV_MEDIA_TYPE = "text/csv"
+
+# Accepted upload media types, by the format they are parsed as
+BULK_MEDIA_TYPES = {
+    NDJSON_MEDIA_TYPE: "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+    CSV_MEDIA_TYPE: "csv",
+}
+
+# A parsed record: line number, fields (None when unparsable) and error
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+def bulk_format(content_type: Optional[str]) -> str:
+    """Get the upload format from the Content-Type of a request.
+
+    Args:
+        content_type: The Content-Type header
+
+    Returns:
+        str: "ndjson" or "csv"
+
+    Raises:
+        HTTPException: If the media type is not supported
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in BULK_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported media type, use one of: {', '.join(BULK_MEDIA_TYPES)}",
+        )
+    return BULK_MEDIA_TYPES[media_type]
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Split a byte stream into numbered lines, whatever the chunk boundaries.
+
+    Args:
+        chunks: The body chunks
+
+    Yields:
+        tuple: The line number (from 1) and the line without its line ending
+    """
+    pending = b""
+    number = 0
+    async for chunk in chunks:
+        if number == 0 and not pending and chunk.startswith(b"\xef\xbb\xbf"):
+            chunk = chunk[3:]
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            number += 1
+            yield number, line.rstrip(b"\r")
+    if pending:
+        yield number + 1, pending.rstrip(b"\r")
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Parse NDJSON records, one JSON object per line (blank lines are skipped).
+
+    Args:
+        chunks: The body chunks
+
+    Yields:
+        Record: Each line with its object, or the reason it could not be parsed
+    """
+    async for number, line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError:
+            yield number, None, "Invalid JSON"
+            continue
+        if isinstance(value, dict):
+            yield number, value, None
+        else:
+            yield number, None, "Expected a JSON object"
+
+async def iter_csv(chunks: AsyncIterator[bytes], required: Sequence[str] = ()) -> AsyncIterator[Record]:
+    """Parse CSV records, the first record naming the columns.
+
+    Quoted fields may span several lines: lines are gathered until their quotes
+    are balanced, and the record is numbered by its first line.
+
+    Args:
+        chunks: The body chunks
+        required: Column names the header must include
+
+    Yields:
+        Record: Each record as a dict by column name, or the reason it could not be parsed
+
+    Raises:
+        HTTPException: If the upload has no header record, or it lacks a required column
+    """
+    header: Optional[List[str]] = None
+    gathered: List[str] = []
+    start = 0
+    async for number, line in iter_lines(chunks):
+        try:
+            text = line.decode("utf-8")
+        except UnicodeDecodeError:
+            if not gathered:
+                yield number, None, "Invalid UTF-8"
+                continue
+            text = line.decode("utf-8", errors="replace")
+        if not gathered:
+            start = number
+        gathered.append(text)
+        record = "\n".join(gathered)
+        if record.count('"') % 2:
+            continue
+        gathered = []
+        if not record.strip():
+            continue
+
+        try:
+            fields = next(csv.reader([record]))
+        except csv.Error as e:
+            yield start, None, f"Invalid CSV: {e}"
+            continue
+        if header is None:
+            header = [name.strip().lower() for name in fields]
+            missing = [name for name in required if name not in header]
+            if missing:
+                raise HTTPException(status_code=400, detail=f"CSV header lacks columns: {', '.join(missing)}")
+            continue
+        if len(fields) != len(header):
+            yield start, None, f"Expected {len(header)} fields, got {len(fields)}"
+            continue
+        yield start, dict(zip(header, fields)), None
+
+    if gathered:
+        yield start, None, "Unterminated quoted field"
+    if header is None:
+        raise HTTPException(status_code=400, detail="CSV upload has no header record")
+
+def iter_records(chunks: AsyncIterator[bytes], format: str, required: Sequence[str] = ()) -> AsyncIterator[Record]:
+    """Parse the records of an upload.
+
+    Args:
+        chunks: The body chunks
+        format: "ndjson" or "csv", see bulk_format()
+        required: Column names a CSV header must include
+
+    Returns:
+        AsyncIterator[Record]: The records, in upload order
+    """
+    return iter_csv(chunks, required) if format == "csv" else iter_ndjson(chunks)
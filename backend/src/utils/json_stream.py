@@ -0,0 +1,111 @@
+"""Incremental JSON encoders for streamed query results.
+
+This module turns batches of result rows into NDJSON or chunked JSON so rows can
+be sent to the client as soon as they are fetched.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, AsyncIterator
+from uuid import UUID
+
+import orjson
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+JSON_MEDIA_TYPE = "application/json"
+
+def json_default(value: Any) -> Any:
+    """Encode values the standard JSON encoder does not handle.
+
+    Args:
+        value: The value to encode
+
+    Returns:
+        A JSON serializable representation of the value
+    """
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value: Any) -> str:
+    """Serialize a value to compact JSON.
+
+    Args:
+        value: The value to serialize
+
+    Returns:
+        str: The JSON document
+    """
+    return json.dumps(value, default=json_default, separators=(",", ":"))
+
+def dumps_bytes(value: Any) -> bytes:
+    """Serialize a value to compact JSON with the fast encoder.
+
+    orjson encodes dates and UUIDs natively; values it rejects (such as integers
+    beyond 64 bits) go through the standard encoder instead.
+
+    Args:
+        value: The value to serialize
+
+    Returns:
+        bytes: The UTF-8 JSON document
+    """
+    try:
+        return orjson.dumps(value, default=json_default)
+    except orjson.JSONEncodeError:
+        return dumps(value).encode()
+
+async def ndjson_stream(sql: str, batches: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    """Encode a streamed result as newline-delimited JSON.
+
+    The first line holds the SQL query, every following line holds one row. If
+    the query fails midway, a final line with an "error" field is emitted.
+
+    Args:
+        sql: The SQL query that produced the rows
+        batches: Batches of result rows
+
+    Yields:
+        bytes: One chunk per batch of rows
+    """
+    yield (dumps({"sql": sql}) + "\n").encode()
+    try:
+        async for batch in batches:
+            if batch:
+                yield "".join(dumps(row) + "\n" for row in batch).encode()
+    except Exception as e:
+        yield (dumps({"error": f"Error executing query: {str(e)}"}) + "\n").encode()
+
+async def json_array_stream(sql: str, batches: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    """Encode a streamed result as one chunked JSON document.
+
+    The document has the same shape as a regular query response:
+    {"sql": ..., "result": [...]}. If the query fails midway, the document is
+    closed with an "error" field after the rows sent so far.
+
+    Args:
+        sql: The SQL query that produced the rows
+        batches: Batches of result rows
+
+    Yields:
+        bytes: One chunk per batch of rows
+    """
+    yield ('{"sql":' + dumps(sql) + ',"result":[').encode()
+    separator = ""
+    error = None
+    try:
+        async for batch in batches:
+            if batch:
+                yield (separator + ",".join(dumps(row) for row in batch)).encode()
+                separator = ","
+    except Exception as e:
+        error = f"Error executing query: {str(e)}"
+    if error is None:
+        yield b"]}"
+    else:
+        yield ('],"error":' + dumps(error) + "}").encode()
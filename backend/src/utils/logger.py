@@ -1,29 +1,262 @@
-"""Logging configuration for the application."""
+"""Logging configuration for the application.
 
+Logging is configured once. Events are not written from the event loop: the
+processor chain only adds the level and the time of the event, then the event
+dict is put on an in-memory queue that a background thread renders to JSON, with
+the ISO-8601 timestamp, and writes to stdout in batches. A stalled stdout or log collector therefore only slows the writer
+thread; when the queue fills up, events are dropped or sampled instead of adding
+latency to requests.
+"""
+
+import atexit
+import json
+import logging
+import random
 import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, TextIO
+
 import structlog
 
-def get_logger(name: str) -> structlog.BoundLogger:
-    """Get a logger instance.
-    
+from ..settings import settings
+
+class LogQueue:
+    """Bounded queue of log events drained by a background writer thread.
+
+    Attributes:
+        dropped: Number of events discarded because of the overflow policy
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        overflow_policy: str = "drop",
+        overflow_sample_rate: float = 0.1,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        stream: Optional[TextIO] = None,
+    ):
+        """Initialize the log queue.
+
+        Args:
+            max_size: Maximum number of queued events
+            overflow_policy: "drop" discards new events while the queue is full,
+                "sample" also keeps only a fraction of events once it is half full
+            overflow_sample_rate: Fraction of events kept by the "sample" policy
+            batch_size: Maximum number of events written per batch
+            flush_interval: Seconds the writer waits for events before flushing
+            stream: Output stream (sys.stdout at the time of writing when omitted)
+        """
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+        self.overflow_sample_rate = overflow_sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stream = stream
+        self.dropped = 0
+        self._events: deque = deque()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def put(self, event: Dict[str, Any]) -> None:
+        """Queue an event without blocking.
+
+        Args:
+            event: The structured event to write
+        """
+        size = len(self._events)
+        if size >= self.max_size or (
+            self.overflow_policy == "sample"
+            and size >= self.max_size // 2
+            and random.random() >= self.overflow_sample_rate
+        ):
+            self.dropped += 1
+            return
+        self._events.append(event)
+        if size + 1 >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Start the background writer thread if it is not running."""
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._stopped = False
+                self._writer = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._writer.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the writer thread after it has written the queued events.
+
+        Args:
+            timeout: Seconds to wait for the writer to finish
+        """
+        self._stopped = True
+        self._wakeup.set()
+        writer = self._writer
+        if writer is not None and writer is not threading.current_thread():
+            writer.join(timeout)
+        self.flush()
+
+    def flush(self) -> None:
+        """Write every queued event from the calling thread."""
+        while self._write_batch():
+            pass
+
+    def _run(self) -> None:
+        """Drain the queue in batches until stopped."""
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            while self._write_batch():
+                pass
+
+    def _write_batch(self) -> bool:
+        """Render and write up to batch_size events, returning False when the queue was empty."""
+        events = self._events
+        lines = []
+        try:
+            while len(lines) < self.batch_size:
+                event = events.popleft()
+                if isinstance(event.get("timestamp"), float):
+                    event["timestamp"] = iso_timestamp(event["timestamp"])
+                lines.append(json.dumps(event, default=str))
+        except IndexError:
+            pass
+        if not lines:
+            return False
+
+        stream = self.stream or sys.stdout
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except (OSError, ValueError):
+            self.dropped += len(lines)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+class QueueLogger:
+    """structlog logger putting event dicts on a LogQueue."""
+
+    def __init__(self, queue: LogQueue):
+        self._queue = queue
+
+    def msg(self, **event: Any) -> None:
+        self._queue.put(event)
+
+    log = debug = info = warn = warning = error = critical = exception = fatal = msg
+
+class QueueLoggerFactory:
+    """structlog logger factory sharing one LogQueue between all loggers."""
+
+    def __init__(self, queue: LogQueue):
+        self._logger = QueueLogger(queue)
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return self._logger
+
+class EventSampler:
+    """structlog processor keeping only a fraction of selected events.
+
+    Attributes:
+        rates: Fraction of events kept, by event name
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        self.rates = rates
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        rate = self.rates.get(event_dict.get("event"))
+        if rate is not None and random.random() >= rate:
+            raise structlog.DropEvent
+        return event_dict
+
+def parse_sample_rates(raw_rates: str) -> Dict[str, float]:
+    """Parse per-event sampling rates from an "event=rate,..." setting.
+
     Args:
-        name: The name of the logger (usually __name__)
-        
+        raw_rates: Comma-separated event=rate pairs, rates between 0 and 1
+
     Returns:
-        A configured structlog logger
+        dict: Fraction of events kept, by event name
+
+    Raises:
+        ValueError: If an entry is malformed
     """
+    rates = {}
+    for entry in raw_rates.split(","):
+        if not entry.strip():
+            continue
+        event, separator, rate = entry.rpartition("=")
+        if not separator or not event.strip():
+            raise ValueError(f"Invalid log sample rate entry: {entry!r}")
+        rates[event.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+def iso_timestamp(seconds: float) -> str:
+    """Format a Unix timestamp as structlog's TimeStamper(fmt="iso") does.
+
+    Args:
+        seconds: Seconds since the epoch
+
+    Returns:
+        str: The UTC time in ISO-8601, e.g. "2024-01-01T12:00:00.123456Z"
+    """
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+def _add_timestamp(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the event time as a Unix timestamp, formatted by the writer thread instead of the event loop."""
+    event_dict["timestamp"] = time.time()
+    return event_dict
+
+# Global log queue instance
+log_queue = LogQueue(
+    max_size=settings.log_queue_size,
+    overflow_policy=settings.log_overflow_policy,
+    overflow_sample_rate=settings.log_overflow_sample_rate,
+    batch_size=settings.log_batch_size,
+)
+
+_configured = False
+
+def configure_logging() -> None:
+    """Configure structlog once and make sure the background writer is running."""
+    global _configured
+    if _configured:
+        log_queue.start()
+        return
+    _configured = True
+
     structlog.configure(
         processors=[
             structlog.processors.add_log_level,
-            structlog.processors.TimeStamper(fmt="iso"),
+            EventSampler(parse_sample_rates(settings.log_sample_rates)),
+            _add_timestamp,
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.JSONRenderer()
         ],
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
-        wrapper_class=structlog.BoundLogger,
+        logger_factory=QueueLoggerFactory(log_queue),
+        wrapper_class=structlog.make_filtering_bound_logger(logging.getLevelName(settings.log_level)),
         cache_logger_on_first_use=True,
     )
-    
-    return structlog.get_logger(name) 
\ No newline at end of file
+    log_queue.start()
+    atexit.register(log_queue.stop)
+
+def get_logger(name: str) -> structlog.BoundLogger:
+    """Get a logger instance.
+
+    Args:
+        name: The name of the logger (usually __name__)
+
+    Returns:
+        A configured structlog logger
+    """
+    configure_logging()
+    return structlog.get_logger(name)
@@ -0,0 +1,199 @@
+"""Prometheus metrics for the application.
+
+Metrics live in a registry of their own, exposed in Prometheus text format by the
+/metrics route. Hot paths only observe pre-bound histogram children and counters;
+counters the services already keep (cache hits, rate limited requests) are read
+when the registry is scraped instead of being incremented twice.
+"""
+
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client.context_managers import Timer
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Stages of a query that are timed
+STAGES = ("translate", "sanitize", "execute", "materialize", "encode")
+
+# Fixed histogram buckets in seconds, from sub-millisecond sanitizer checks to LLM calls
+STAGE_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# Registry exposed by the /metrics route
+registry = CollectorRegistry(auto_describe=True)
+
+STAGE_SECONDS = Histogram(
+    "cloudlinker_query_stage_seconds",
+    "Time spent in each stage of a query",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+    registry=registry,
+)
+TRANSLATION_RETRIES = Counter(
+    "cloudlinker_translation_retries",
+    "Translator calls retried after a failure",
+    registry=registry,
+)
+TRANSLATION_HEDGES = Counter(
+    "cloudlinker_translation_hedges",
+    "Duplicate LLM requests sent because the first one was slower than the hedge delay",
+    registry=registry,
+)
+TRANSLATOR_CIRCUIT_STATE = Gauge(
+    "cloudlinker_translator_circuit_state",
+    "State of the LLM circuit breaker (0 closed, 1 half-open, 2 open)",
+    registry=registry,
+)
+TRANSLATOR_CIRCUIT_OPENED = Counter(
+    "cloudlinker_translator_circuit_opened",
+    "Times the LLM circuit breaker opened",
+    registry=registry,
+)
+TRANSLATOR_TIER_SECONDS = Histogram(
+    "cloudlinker_translator_tier_seconds",
+    "Time taken by each LLM tier to answer a question",
+    ["model"],
+    buckets=STAGE_BUCKETS,
+    registry=registry,
+)
+TRANSLATOR_ROUTING = Counter(
+    "cloudlinker_translator_routing",
+    "Answers of each LLM tier, accepted or escalated to the next tier with the reason",
+    ["model", "decision"],
+    registry=registry,
+)
+TRANSLATION_BATCHES = Counter(
+    "cloudlinker_translation_batches",
+    "Batched translation requests, answered as a batch or by per-question fallback",
+    ["outcome"],
+    registry=registry,
+)
+TRANSLATION_BATCHED_QUESTIONS = Counter(
+    "cloudlinker_translation_batched_questions",
+    "Questions answered by batched translation requests",
+    registry=registry,
+)
+REPLICA_FAILOVERS = Counter(
+    "cloudlinker_replica_failovers",
+    "Read replicas taken out of the rotation after a connection failure",
+    registry=registry,
+)
+POOL_CHECKOUTS = Counter(
+    "cloudlinker_db_pool_checkouts",
+    "Connections checked out of the database pool",
+    ["engine"],
+    registry=registry,
+)
+POOL_WAIT_SECONDS = Histogram(
+    "cloudlinker_db_pool_wait_seconds",
+    "Time a checkout waited for a pooled connection (opening one included)",
+    ["engine"],
+    buckets=STAGE_BUCKETS,
+    registry=registry,
+)
+POOL_INVALIDATIONS = Counter(
+    "cloudlinker_db_pool_invalidations",
+    "Pooled connections invalidated after an error or a failed validation",
+    ["engine"],
+    registry=registry,
+)
+
+CUSTOMERS_BULK_ROWS = Counter(
+    "cloudlinker_customers_bulk_rows",
+    "Rows of bulk customer uploads, by outcome (inserted, duplicate, invalid or failed)",
+    ["outcome"],
+    registry=registry,
+)
+
+_stage_histograms = {stage: STAGE_SECONDS.labels(stage) for stage in STAGES}
+
+def time_stage(stage: str) -> Timer:
+    """Time a block of code into the histogram of a stage.
+
+    Args:
+        stage: One of STAGES
+
+    Returns:
+        Timer: Context manager observing the elapsed time on exit
+    """
+    return _stage_histograms[stage].time()
+
+class StatsCollector:
+    """Collector exposing counters kept by the services at scrape time.
+
+    Attributes:
+        cache_stats: Functions returning (hits, misses), by cache name
+        rate_limited: Function returning the number of rate limited requests
+        translator_hits: Function returning the questions answered, by translator backend
+    """
+
+    def __init__(
+        self,
+        cache_stats: Dict[str, Callable[[], Tuple[int, int]]],
+        rate_limited: Callable[[], int],
+        translator_hits: Callable[[], Dict[str, int]] = dict,
+    ):
+        """Initialize the collector.
+
+        Args:
+            cache_stats: Functions returning (hits, misses), by cache name
+            rate_limited: Function returning the number of rate limited requests
+            translator_hits: Function returning the questions answered, by translator backend
+        """
+        self.cache_stats = cache_stats
+        self.rate_limited = rate_limited
+        self.translator_hits = translator_hits
+
+    def collect(self) -> Iterator[CounterMetricFamily]:
+        """Read the service counters."""
+        hits = CounterMetricFamily("cloudlinker_cache_hits", "Cache lookups that found an entry", labels=["cache"])
+        misses = CounterMetricFamily("cloudlinker_cache_misses", "Cache lookups that found no entry", labels=["cache"])
+        for cache, stats in self.cache_stats.items():
+            cache_hits, cache_misses = stats()
+            hits.add_metric([cache], cache_hits)
+            misses.add_metric([cache], cache_misses)
+        yield hits
+        yield misses
+        yield CounterMetricFamily(
+            "cloudlinker_rate_limited_requests",
+            "Requests rejected with 429 by the rate limiter",
+            value=self.rate_limited(),
+        )
+        translator_hits = CounterMetricFamily(
+            "cloudlinker_translator_hits",
+            "Questions answered, by translator backend",
+            labels=["backend"],
+        )
+        for backend, count in self.translator_hits().items():
+            translator_hits.add_metric([backend], count)
+        yield translator_hits
+
+class PoolCollector:
+    """Collector exposing the connection counts of the database pools at scrape time.
+
+    Attributes:
+        pools: Function returning the pools, by engine name
+    """
+
+    def __init__(self, pools: Callable[[], Dict[str, Any]]):
+        """Initialize the collector.
+
+        Args:
+            pools: Function returning the SQLAlchemy pools, by engine name
+        """
+        self.pools = pools
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        """Read the pool counters."""
+        connections = GaugeMetricFamily(
+            "cloudlinker_db_pool_connections",
+            "Pooled connections by state (in_use, idle, overflow)",
+            labels=["engine", "state"],
+        )
+        for engine, pool in self.pools().items():
+            connections.add_metric([engine, "in_use"], pool.checkedout())
+            connections.add_metric([engine, "idle"], pool.checkedin())
+            connections.add_metric([engine, "overflow"], max(0, pool.overflow()))
+        yield connections
@@ -0,0 +1,45 @@
+"""Opaque continuation tokens for keyset pagination.
+
+This module encodes the position of the last row of a page into a URL-safe token
+and decodes it back when the client asks for the next page.
+"""
+
+import base64
+import json
+from typing import Any, Dict
+
+class InvalidCursorError(ValueError):
+    """Raised when a continuation token cannot be decoded."""
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Encode a keyset position into an opaque token.
+
+    Args:
+        position: JSON serializable values identifying the last row of a page
+
+    Returns:
+        str: URL-safe continuation token
+    """
+    raw = json.dumps(position, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """Decode a continuation token back into a keyset position.
+
+    Args:
+        token: Token previously returned by encode_cursor
+
+    Returns:
+        dict: The keyset position
+
+    Raises:
+        InvalidCursorError: If the token is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        position = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+    if not isinstance(position, dict):
+        raise InvalidCursorError("Invalid cursor")
+    return position
@@ -0,0 +1,267 @@
+"""Negotiated encodings of query results.
+
+A query result can be sent in one of these formats, picked from the Accept header:
+
+- application/json: {"sql", "result": [row objects], "cache_age"}, the default
+- application/vnd.cloudlinker.columnar+json: {"sql", "columns", "rows", "cache_age"}
+  where columns lists the name and type of every column once and rows holds one
+  array of values per row
+- application/msgpack: the columnar document encoded as MessagePack (needs msgpack)
+- application/vnd.apache.arrow.stream: an Arrow IPC stream with one record batch,
+  the SQL and cache age being stored in the schema metadata (needs pyarrow)
+
+Column types come from the cursor description when the driver reports them
+(PostgreSQL type OIDs), and are otherwise inferred from the values.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Iterable, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from .json_stream import JSON_MEDIA_TYPE, dumps_bytes, json_default
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - depends on the environment
+    pyarrow = None
+
+COLUMNAR_JSON_MEDIA_TYPE = "application/vnd.cloudlinker.columnar+json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Other names clients use for the same formats
+_MEDIA_TYPE_ALIASES = {
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+    "application/vnd.msgpack": MSGPACK_MEDIA_TYPE,
+}
+
+# PostgreSQL type OIDs reported in the cursor description
+_PG_TYPES = {
+    16: "bool",
+    17: "bytes",
+    20: "int",
+    21: "int",
+    23: "int",
+    25: "text",
+    114: "json",
+    700: "float",
+    701: "float",
+    1042: "text",
+    1043: "text",
+    1082: "date",
+    1083: "time",
+    1114: "timestamp",
+    1184: "timestamp",
+    1700: "decimal",
+    2950: "uuid",
+    3802: "json",
+}
+
+# Type names inferred from Python values, checked in order (bool before int)
+_VALUE_TYPES = (
+    (bool, "bool"),
+    (int, "int"),
+    (float, "float"),
+    (Decimal, "decimal"),
+    (str, "text"),
+    (datetime, "timestamp"),
+    (date, "date"),
+    (time, "time"),
+    (UUID, "uuid"),
+    (bytes, "bytes"),
+    ((dict, list), "json"),
+)
+
+class ResultRows(list):
+    """Result rows (one dict per row) with the columns of the cursor that produced them.
+
+    Attributes:
+        columns: One {"name", "type"} dict per column, in cursor order
+    """
+
+    def __init__(self, rows: Iterable[dict] = (), columns: Sequence[dict] = ()):
+        super().__init__(rows)
+        self.columns = list(columns)
+
+def value_type(value: Any) -> Optional[str]:
+    """Get the type name of a value.
+
+    Args:
+        value: A value of a result row
+
+    Returns:
+        Optional[str]: The type name, or None for NULL and unknown values
+    """
+    for cls, name in _VALUE_TYPES:
+        if isinstance(value, cls):
+            return name
+    return None
+
+def describe_columns(description: Optional[Sequence], rows: Sequence[dict]) -> List[dict]:
+    """Describe the columns of a result.
+
+    Args:
+        description: The DB-API cursor description (name and type code per column)
+        rows: The result rows, used when the type code is unknown
+
+    Returns:
+        list: One {"name", "type"} dict per column; the type is None when it is
+            neither reported by the driver nor inferable from a non-NULL value
+    """
+    columns = []
+    seen = set()
+    for entry in description or ():
+        name, type_code = entry[0], entry[1]
+        # Rows are dicts, so a repeated column name only holds one value
+        if name in seen:
+            continue
+        seen.add(name)
+        type_name = _PG_TYPES.get(type_code) if isinstance(type_code, int) else None
+        if type_name is None:
+            type_name = next(
+                (value_type(row[name]) for row in rows if row.get(name) is not None),
+                None,
+            )
+        columns.append({"name": name, "type": type_name})
+    return columns
+
+def result_columns(rows: list) -> List[dict]:
+    """Get the columns of result rows, from the cursor when they were recorded.
+
+    Args:
+        rows: The result rows
+
+    Returns:
+        list: One {"name", "type"} dict per column
+    """
+    columns = getattr(rows, "columns", None)
+    if columns or not rows:
+        return list(columns or [])
+    return [{"name": name, "type": None} for name in rows[0]]
+
+def available_media_types() -> List[str]:
+    """Get the result formats this process can encode, the default first.
+
+    Returns:
+        list: The supported media types
+    """
+    media_types = [JSON_MEDIA_TYPE, COLUMNAR_JSON_MEDIA_TYPE]
+    if msgpack is not None:
+        media_types.append(MSGPACK_MEDIA_TYPE)
+    if pyarrow is not None:
+        media_types.append(ARROW_MEDIA_TYPE)
+    return media_types
+
+def negotiate(accept: Optional[str]) -> str:
+    """Pick the result format for an Accept header.
+
+    Media ranges are tried by decreasing quality; wildcards select JSON.
+
+    Args:
+        accept: The Accept header of the request
+
+    Returns:
+        str: The media type of the response
+
+    Raises:
+        HTTPException: 406 if none of the accepted formats is supported
+    """
+    if not accept:
+        return JSON_MEDIA_TYPE
+    supported = available_media_types()
+    ranges = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if media_type and quality > 0:
+            ranges.append((-quality, position, media_type.lower()))
+    for _, _, media_type in sorted(ranges):
+        media_type = _MEDIA_TYPE_ALIASES.get(media_type, media_type)
+        if media_type in ("*/*", "application/*"):
+            return JSON_MEDIA_TYPE
+        if media_type in supported:
+            return media_type
+    raise HTTPException(
+        status_code=406,
+        detail=f"Supported result formats: {', '.join(supported)}",
+    )
+
+def columnar(sql: str, rows: list, cache_age: Optional[float]) -> dict:
+    """Build the columnar document of a result.
+
+    Args:
+        sql: The SQL query
+        rows: The result rows
+        cache_age: Seconds since the result was computed, when cached
+
+    Returns:
+        dict: {"sql", "columns", "rows", "cache_age"}
+    """
+    return {
+        "sql": sql,
+        "columns": result_columns(rows),
+        "rows": [list(row.values()) for row in rows],
+        "cache_age": cache_age,
+    }
+
+def _arrow_column(values: list, type_name: Optional[str]):
+    """Build an Arrow array, falling back to strings for values Arrow cannot infer."""
+    if type_name in ("json", "uuid", None):
+        values = [
+            value if value is None or isinstance(value, str) else dumps_bytes(value).decode()
+            for value in values
+        ]
+    try:
+        return pyarrow.array(values)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        return pyarrow.array([None if value is None else str(value) for value in values], pyarrow.string())
+
+def _encode_arrow(sql: str, rows: list, cache_age: Optional[float]) -> bytes:
+    """Encode a result as an Arrow IPC stream."""
+    columns = result_columns(rows)
+    arrays = [
+        _arrow_column([row[column["name"]] for row in rows], column["type"])
+        for column in columns
+    ]
+    metadata = {"sql": sql, "cache_age": json.dumps(cache_age)}
+    table = pyarrow.Table.from_arrays(arrays, names=[column["name"] for column in columns], metadata=metadata)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def encode_result(media_type: str, sql: str, rows: list, cache_age: Optional[float]) -> bytes:
+    """Encode a query result in a negotiated format.
+
+    Args:
+        media_type: A media type returned by negotiate
+        sql: The SQL query
+        rows: The result rows
+        cache_age: Seconds since the result was computed, when cached
+
+    Returns:
+        bytes: The response body
+    """
+    if media_type == COLUMNAR_JSON_MEDIA_TYPE:
+        return dumps_bytes(columnar(sql, rows, cache_age))
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(columnar(sql, rows, cache_age), default=json_default, use_bin_type=True)
+    if media_type == ARROW_MEDIA_TYPE:
+        return _encode_arrow(sql, rows, cache_age)
+    return dumps_bytes({"sql": sql, "result": rows, "cache_age": cache_age})
@@ -0,0 +1,96 @@
+"""Single-flight coalescing of concurrent identical calls.
+
+This module provides a helper that lets concurrent callers asking for the same key
+share one in-flight coroutine instead of each starting their own.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+class _Call:
+    """An in-flight call shared by one or more waiters."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key starts the work in its own task; later callers for
+    the same key wait on that task while it is running. The result, or the raised
+    exception, is delivered to every waiter. A cancelled waiter only stops waiting:
+    the shared task keeps running for the others and is cancelled only once
+    nobody is waiting on it anymore.
+    """
+
+    def __init__(self):
+        """Initialize the single-flight group."""
+        self._calls: Dict[Hashable, _Call] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn for key, or join the call already in flight for it.
+
+        Args:
+            key: Key identifying identical calls
+            fn: Zero-argument coroutine function performing the work
+
+        Returns:
+            The result of the shared call
+
+        Raises:
+            Exception: Whatever the shared call raised
+            asyncio.CancelledError: If this waiter was cancelled
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        """Drop a finished call so the next caller starts a fresh one."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def in_flight(self) -> int:
+        """Get the number of calls currently running.
+
+        Returns:
+            int: Number of distinct keys with a running call
+        """
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the coalescing counters.
+
+        Returns:
+            dict: Number of started, coalesced and in-flight calls
+        """
+        return {
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
@@ -0,0 +1,200 @@
+"""Canonical forms and fingerprints of SQL queries.
+
+This module normalizes generated SQL so that queries differing only in letter case
+or whitespace share one fingerprint, and extracts the tables a query reads from.
+
+It also lifts the integer literals a question supplies (the values compared in
+WHERE clauses, IN lists, BETWEEN bounds, LIMIT and OFFSET) into bind parameters,
+so structurally identical queries run the same statement text: PostgreSQL and
+the asyncpg prepared statement cache can reuse it, and the fingerprint of that
+text identifies the query shape in caches and stats. String and decimal
+literals stay inline: asyncpg sends a str parameter as VARCHAR (or encodes it
+with the type PostgreSQL infers, which rejects strings for dates and numbers),
+so '2024-01-01' compared with a timestamp would no longer run. Integers in
+other positions (select lists, function arguments, casts) stay inline too.
+"""
+
+import hashlib
+import re
+from functools import lru_cache
+from typing import Any, FrozenSet, Tuple
+
+# String literals and quoted identifiers, which must be kept verbatim
+_QUOTED_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+_WHITESPACE_RE = re.compile(r"\s+")
+_PUNCTUATION_SPACE_RE = re.compile(r"\s*([,()])\s*")
+
+# Keywords that can follow a table reference, so they are not read as its alias
+_NOT_ALIAS = (
+    r"(?!(?:join|inner|left|right|full|cross|natural|on|using|where|group|order|having"
+    r"|limit|offset|fetch|union|intersect|except|window|for)\b)"
+)
+_ALIAS = rf"(?:\s*(?:as\s+)?{_NOT_ALIAS}[a-z_][\w$]*)?"
+
+# Table references following FROM / JOIN, including comma-separated lists
+_TABLE_REF_RE = re.compile(
+    rf"\b(?:from|join)\s+((?:[a-z_][\w$]*\.)?[a-z_][\w$]*{_ALIAS}"
+    rf"(?:\s*,\s*(?:[a-z_][\w$]*\.)?[a-z_][\w$]*{_ALIAS})*)"
+)
+
+def _normalize_unquoted(fragment: str) -> str:
+    """Lowercase a fragment outside quotes and collapse its whitespace."""
+    fragment = _WHITESPACE_RE.sub(" ", fragment.lower())
+    return _PUNCTUATION_SPACE_RE.sub(r"\1", fragment)
+
+def canonicalize(sql: str) -> str:
+    """Get the canonical form of a SQL query.
+
+    Keywords and unquoted identifiers are lowercased and whitespace is collapsed,
+    while string literals and quoted identifiers are kept as written.
+
+    Args:
+        sql: The SQL query
+
+    Returns:
+        str: The canonical SQL text
+    """
+    parts = []
+    position = 0
+    for match in _QUOTED_RE.finditer(sql):
+        parts.append(_normalize_unquoted(sql[position:match.start()]))
+        parts.append(match.group())
+        position = match.end()
+    parts.append(_normalize_unquoted(sql[position:]))
+    return "".join(parts).strip().rstrip(";").strip()
+
+def fingerprint(sql: str) -> str:
+    """Get a stable fingerprint of a SQL query.
+
+    Args:
+        sql: The SQL query
+
+    Returns:
+        str: Hex digest of the canonical SQL text
+    """
+    return hashlib.sha1(canonicalize(sql).encode()).hexdigest()[:16]
+
+# Tokens that matter for finding liftable literals
+_TOKEN_RE = re.compile(
+    r"(?P<string>'(?:[^']|'')*')"
+    r"|(?P<quoted>\"(?:[^\"]|\"\")*\")"
+    r"|(?P<number>(?<![\w$.])\d+(?:\.\d+)?(?![\w.]))"
+    r"|(?P<word>[a-z_][\w$]*)"
+    r"|(?P<op><>|!=|<=|>=|::|[=<>(),])",
+    re.IGNORECASE,
+)
+
+# Tokens after which a literal is a compared value
+_LIFT_AFTER = frozenset({"=", "<>", "!=", "<", ">", "<=", ">=", "limit", "offset"})
+
+# Integers are only lifted when they fit a BIGINT parameter
+_MAX_BIGINT = 2 ** 63 - 1
+
+class NormalizedQuery:
+    """A SQL query with its compared integer literals lifted into bind parameters.
+
+    Attributes:
+        sql: The statement text, with :p0, :p1, ... in place of the lifted literals
+        params: The lifted values as (name, value) pairs, in order
+        fingerprint: Fingerprint of the statement text, shared by the queries
+            differing only in their lifted values
+        cache_key: Fingerprint and values, identifying the query result
+    """
+
+    __slots__ = ("sql", "params", "fingerprint", "cache_key")
+
+    def __init__(self, sql: str, params: Tuple[Tuple[str, Any], ...]):
+        self.sql = sql
+        self.params = params
+        self.fingerprint = fingerprint(sql)
+        if params:
+            values = hashlib.sha1(repr([value for _, value in params]).encode()).hexdigest()[:16]
+            self.cache_key = f"{self.fingerprint}:{values}"
+        else:
+            self.cache_key = self.fingerprint
+
+def _literal_value(kind: str, text: str) -> Any:
+    """Get the value of a liftable literal (None if it must stay inline, see the module docstring)."""
+    if kind != "number" or "." in text:
+        return None
+    value = int(text)
+    return value if value <= _MAX_BIGINT else None
+
+@lru_cache(maxsize=4096)
+def normalize(sql: str) -> NormalizedQuery:
+    """Lift the compared integer literals of a query into bind parameters.
+
+    An integer is lifted when it follows a comparison operator, LIMIT or
+    OFFSET, is an item of an IN list or a BETWEEN bound, and is not followed by
+    a :: cast.
+
+    Args:
+        sql: A validated SELECT query
+
+    Returns:
+        NormalizedQuery: The statement text, its parameters and fingerprints
+    """
+    parts = []
+    params = []
+    position = 0
+    previous = None
+    depth = 0
+    in_lists = []
+    between = False
+    for match in _TOKEN_RE.finditer(sql):
+        kind = match.lastgroup
+        token = match.group().lower()
+        if kind in ("string", "number"):
+            liftable = (
+                previous in _LIFT_AFTER
+                or previous == "between"
+                or (previous == "and" and between)
+                or (previous in ("(", ",") and in_lists and in_lists[-1] == depth)
+            )
+            value = _literal_value(kind, match.group()) if liftable else None
+            if value is not None and not sql[match.end():].lstrip().startswith("::"):
+                name = f"p{len(params)}"
+                parts.append(sql[position:match.start()])
+                parts.append(f":{name}")
+                params.append((name, value))
+                position = match.end()
+            between = previous == "between"
+        elif token == "(":
+            depth += 1
+            if previous == "in":
+                in_lists.append(depth)
+        elif token == ")":
+            if in_lists and in_lists[-1] == depth:
+                in_lists.pop()
+            depth -= 1
+        previous = token
+    parts.append(sql[position:])
+    return NormalizedQuery("".join(parts), tuple(params))
+
+def _unquote_identifier(match: "re.Match[str]") -> str:
+    """Replace a quoted identifier by its name, and a string literal by an empty one."""
+    quoted = match.group()
+    if quoted.startswith('"'):
+        return quoted[1:-1].replace('""', '"')
+    return "''"
+
+def referenced_tables(sql: str) -> FrozenSet[str]:
+    """Get the names of the tables a query reads from.
+
+    Schema prefixes are dropped, so "public.customers" is reported as "customers".
+    Quoted identifiers are read as lowercased names, like unquoted ones.
+
+    Args:
+        sql: The SQL query
+
+    Returns:
+        frozenset: Lowercased table names found after FROM and JOIN
+    """
+    unquoted = _QUOTED_RE.sub(_unquote_identifier, sql)
+    canonical = _normalize_unquoted(unquoted)
+    tables = set()
+    for match in _TABLE_REF_RE.finditer(canonical):
+        for reference in match.group(1).split(","):
+            name = reference.strip().split(" ")[0]
+            tables.add(name.rsplit(".", 1)[-1])
+    return frozenset(tables)
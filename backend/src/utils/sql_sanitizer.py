@@ -1,10 +1,15 @@
 """SQL sanitizer utility.
 
 This module provides functions to check if a SQL query is safe to execute.
+
+The check is a single scan driven by one precompiled pattern. String literals and
+quoted identifiers are consumed as whole tokens, so their content never triggers
+the keyword, comment or semicolon checks. Anything the scanner cannot delimit with
+certainty (unterminated quotes, backslash escapes, dollar quoting) is rejected.
 """
 
 import re
-from typing import List
+from functools import lru_cache
 
 # Keywords that are not allowed in queries
 BLOCKED_KEYWORDS = [
@@ -13,42 +18,60 @@ BLOCKED_KEYWORDS = [
     "UNLOCK", "COMMIT", "ROLLBACK", "SAVEPOINT", "SET", "SHOW", "USE", "DESCRIBE",
     "EXPLAIN", "HELP", "SHUTDOWN", "KILL", "FLUSH", "RESET", "PURGE", "OPTIMIZE",
     "REPAIR", "ANALYZE", "CHECK", "CHECKSUM", "BACKUP", "RESTORE", "IMPORT",
-    "EXPORT", "DUMP", "LOAD", "BULK", "INSERT", "BULK", "INSERT", "BULK", "INSERT"
+    "EXPORT", "DUMP", "BULK", "UNION",
 ]
 
+# Maximum number of distinct queries whose verdict is remembered
+VERDICT_CACHE_SIZE = 4096
+
+_KEYWORDS = sorted(set(BLOCKED_KEYWORDS), key=len, reverse=True)
+
+# Runs on the uppercased query; the lookahead on first letters lets the engine
+# skip most words without trying every keyword alternative
+_SCANNER_RE = re.compile(
+    r"""
+    (?P<literal>'(?:[^'\\]|'')*'|"(?:[^"\\]|"")*")
+    |(?P<blocked>
+        ;|--|/\*|\*/|['"$\\]
+        |\b(?=[""" + "".join(sorted({keyword[0] for keyword in _KEYWORDS})) + r"""])
+         (?:""" + "|".join(_KEYWORDS) + r""")\b
+    )
+    """,
+    re.VERBOSE,
+)
+_SELECT_RE = re.compile(r"\s*SELECT\b")
+
 def is_safe_select(sql: str) -> bool:
     """Check if a SQL query is safe to execute.
-    
+
     Args:
         sql: The SQL query to check
-        
+
     Returns:
         bool: True if the query is safe, False otherwise
     """
-    # Normalize the SQL query
-    sql = sql.upper().strip()
-    
-    # Check if the query starts with SELECT
-    if not sql.startswith("SELECT"):
-        return False
-    
-    # Check for semicolons (SQL injection attempt)
-    if ";" in sql:
+    return _verdict(sql)
+
+@lru_cache(maxsize=VERDICT_CACHE_SIZE)
+def _verdict(sql: str) -> bool:
+    """Scan a query once and decide whether it is safe (memoized per query text)."""
+    sql = sql.upper()
+
+    # The query must start with SELECT
+    if not _SELECT_RE.match(sql):
         return False
-    
-    # Check for blocked keywords
-    for keyword in BLOCKED_KEYWORDS:
-        # Use word boundary to avoid false positives
-        pattern = r'\b' + re.escape(keyword) + r'\b'
-        if re.search(pattern, sql):
+
+    # Literals are skipped, any other match is a blocked keyword, a comment,
+    # a semicolon or a quote the scanner could not pair up
+    for match in _SCANNER_RE.finditer(sql):
+        if match.lastgroup == "blocked":
             return False
-    
-    # Check for UNION (SQL injection attempt)
-    if "UNION" in sql:
-        return False
-    
-    # Check for comments (SQL injection attempt)
-    if "--" in sql or "/*" in sql or "*/" in sql:
-        return False
-    
-    return True 
\ No newline at end of file
+    return True
+
+def verdict_cache_info():
+    """Get the hit/miss statistics of the verdict cache.
+
+    Returns:
+        CacheInfo: functools cache statistics (hits, misses, maxsize, currsize)
+    """
+    return _verdict.cache_info()
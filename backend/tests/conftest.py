@@ -1,5 +1,8 @@
+import json
 import os
 import sys
+from types import SimpleNamespace
+
 import pytest
 
 # Add the backend directory to the Python path
@@ -9,8 +12,39 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 os.environ["ENV_FILE"] = os.path.join(os.path.dirname(__file__), ".env.test")
 
 from src.settings import settings
+from src.middleware.rate_limit import rate_limiter
+from src.services.result_cache import result_cache
+from src.services.translation_cache import translation_cache
+from src.translator import llm_backend
 
 @pytest.fixture(autouse=True)
 def _patch_api_keys(monkeypatch):
     """Force tests to have a known key."""
-    monkeypatch.setattr(settings, "api_keys", "test_key")
\ No newline at end of file
+    monkeypatch.setattr(settings, "api_keys", "test_key")
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    """Keep cached translations and results from leaking between tests."""
+    translation_cache.clear()
+    result_cache.clear()
+    yield
+    translation_cache.clear()
+    result_cache.clear()
+
+@pytest.fixture(autouse=True)
+def _reset_rate_limits():
+    """Give every test a fresh rate limit budget."""
+    rate_limiter.reset()
+
+class OfflineCompletions:
+    """Chat completions stand-in that never knows the answer."""
+
+    async def create(self, **kwargs):
+        message = SimpleNamespace(content=json.dumps({"sql": "-- TODO"}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+@pytest.fixture(autouse=True)
+def _offline_llm(monkeypatch):
+    """Keep the LLM backend off the network and its circuit closed."""
+    monkeypatch.setattr(llm_backend, "client", SimpleNamespace(chat=SimpleNamespace(completions=OfflineCompletions())))
+    llm_backend.breaker.reset()
@@ -0,0 +1,104 @@
+"""Tests for the customer search endpoint and the search translator backend."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.db import get_read_db
+from src.main import app
+from src.models.customer import Base, Customer
+from src.translator import SearchBackend
+
+engine = create_async_engine(
+    "sqlite+aiosqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+HEADERS = {"X-API-Key": "test_key"}
+
+@pytest.fixture
+async def db_session():
+    """Create a database with a few customers."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with TestingSessionLocal() as session:
+        session.add_all([
+            Customer(name="Johanna Smith", email="jo@acme.com"),
+            Customer(name="John Doe", email="john_doe@example.com"),
+            Customer(name="Mary Johnson", email="mary@acme.com"),
+            Customer(name="Peter Pan", email="johnxdoe@example.com"),
+        ])
+        await session.commit()
+        yield session
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+@pytest.fixture
+async def client(db_session):
+    """Create a test client reading from the test database."""
+    async def override_get_read_db():
+        yield db_session
+
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+async def search(client, **params):
+    """Search customers and return the matching names."""
+    response = await client.get("/customers/search", params=params, headers=HEADERS)
+    assert response.status_code == 200
+    return [row["name"] for row in response.json()]
+
+@pytest.mark.asyncio
+async def test_prefix_search(client):
+    """Test that prefix searches match the start of the name or email, case-insensitively."""
+    assert await search(client, q="JOH") == ["Johanna Smith", "John Doe", "Peter Pan"]
+    assert await search(client, q="joh", field="email") == ["John Doe", "Peter Pan"]
+    assert await search(client, q="joh", limit=1) == ["Johanna Smith"]
+
+@pytest.mark.asyncio
+async def test_search_terms_are_not_patterns(client):
+    """Test that LIKE wildcards in the search text match literally."""
+    assert await search(client, q="john_", field="email") == ["John Doe"]
+    assert await search(client, q="%", mode="fuzzy") == []
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_falls_back_to_substrings(client):
+    """Test that fuzzy searches match substrings on databases without pg_trgm."""
+    assert await search(client, q="acme", mode="fuzzy") == ["Johanna Smith", "Mary Johnson"]
+    assert await search(client, q="john", mode="fuzzy", field="name") == ["John Doe", "Mary Johnson"]
+
+@pytest.mark.asyncio
+async def test_search_validates_parameters(client):
+    """Test that blank text and unknown modes are rejected."""
+    response = await client.get("/customers/search", params={"q": " "}, headers=HEADERS)
+    assert response.status_code == 400
+    response = await client.get("/customers/search", params={"q": "jo", "mode": "regex"}, headers=HEADERS)
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("question, names", [
+    ("Find customers whose name starts with 'Joh'", ["Johanna Smith", "John Doe"]),
+    ("customers with an email address containing acme?", ["Johanna Smith", "Mary Johnson"]),
+    ("search for customers named something like john", ["John Doe", "Mary Johnson"]),
+])
+async def test_search_backend_answers_lookups(db_session, question, names):
+    """Test that lookup questions are translated to the search query."""
+    sql = SearchBackend("sqlite").match(question)
+
+    rows = (await db_session.execute(text(sql))).mappings().all()
+    assert [row["name"] for row in rows] == names
+
+def test_search_backend_uses_trigram_matching_on_postgresql():
+    """Test that fuzzy lookups use the pg_trgm operator and ranking on PostgreSQL."""
+    sql = SearchBackend("postgresql").match("look up customers matching jon")
+
+    assert "customers.name % 'jon'" in sql
+    assert "similarity(customers.email, 'jon')" in sql
+    assert SearchBackend("postgresql").match("how many customers are there") is None
@@ -1,11 +1,12 @@
 import pytest
+from datetime import datetime, timezone
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from src.main import app
-from src.models.customer import Base
+from src.models.customer import Base, Customer
 from src.db import get_db
 from src.settings import settings
 
@@ -84,4 +85,69 @@ async def test_get_customers(client):
     data = response.json()
     assert len(data) == 1
     assert data[0]["name"] == "Test User"
-    assert data[0]["email"] == "test@example.com" 
\ No newline at end of file
+    assert data[0]["email"] == "test@example.com" 
+
+@pytest.mark.asyncio
+async def test_get_customers_paginated(client):
+    """Test walking through customers with continuation tokens."""
+    for i in range(5):
+        await client.post(
+            "/customers",
+            json={"name": f"User {i}", "email": f"user{i}@example.com"},
+            headers={"X-API-Key": "test_key"}
+        )
+    
+    names = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/customers", params=params, headers={"X-API-Key": "test_key"})
+        assert response.status_code == 200
+        names.extend(customer["name"] for customer in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    
+    assert pages == 3
+    assert names == [f"User {i}" for i in range(5)]
+
+@pytest.mark.asyncio
+async def test_get_customers_by_created_at_with_projection(client, db_session):
+    """Test ordering by creation time and returning only some fields."""
+    # Explicit timestamps, with a tie between the last two customers
+    created = [datetime(2024, 1, 2, tzinfo=timezone.utc), datetime(2024, 1, 1, tzinfo=timezone.utc),
+               datetime(2024, 1, 2, tzinfo=timezone.utc)]
+    for i, created_at in enumerate(created):
+        db_session.add(Customer(name=f"User {i}", email=f"user{i}@example.com",
+                                created_at=created_at, updated_at=created_at))
+    await db_session.commit()
+    
+    first = await client.get(
+        "/customers",
+        params={"limit": 2, "order_by": "created_at", "fields": "email"},
+        headers={"X-API-Key": "test_key"}
+    )
+    second = await client.get(
+        "/customers",
+        params={"limit": 2, "order_by": "created_at", "fields": "email",
+                "cursor": first.headers["X-Next-Cursor"]},
+        headers={"X-API-Key": "test_key"}
+    )
+    
+    assert first.json() == [{"email": "user1@example.com"}, {"email": "user0@example.com"}]
+    assert second.json() == [{"email": "user2@example.com"}]
+    assert "X-Next-Cursor" not in second.headers
+
+@pytest.mark.asyncio
+async def test_get_customers_invalid_cursor(client):
+    """Test that a malformed continuation token is rejected."""
+    response = await client.get(
+        "/customers",
+        params={"cursor": "not-a-cursor"},
+        headers={"X-API-Key": "test_key"}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,136 @@
+"""Tests for bulk customer uploads."""
+
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.db import get_db
+from src.main import app
+from src.models.customer import Base, Customer
+from src.services.customer_service import CustomerService
+from src.services.result_cache import result_cache
+from src.utils.bulk_input import iter_records
+
+engine = create_async_engine(
+    "sqlite+aiosqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+HEADERS = {"X-API-Key": "test_key"}
+
+@pytest.fixture
+async def db_session():
+    """Create a fresh database session for each test."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with TestingSessionLocal() as session:
+        yield session
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+@pytest.fixture
+async def client(db_session):
+    """Create a test client with a fresh database session."""
+    async def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+async def chunked(data: bytes, size: int):
+    """Yield a body in chunks of a fixed size."""
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+async def collect(data: bytes, format: str, size: int = 7):
+    """Parse a body split at arbitrary chunk boundaries."""
+    return [record async for record in iter_records(chunked(data, size), format, ("name", "email"))]
+
+@pytest.mark.asyncio
+async def test_ndjson_records_keep_line_numbers():
+    """Test that NDJSON lines are parsed across chunk boundaries, with errors per line."""
+    body = b'{"name": "A", "email": "a@example.com"}\n\nnot json\n[1]\r\n{"name": "B", "email": "b@example.com"}'
+
+    records = await collect(body, "ndjson")
+
+    assert records == [
+        (1, {"name": "A", "email": "a@example.com"}, None),
+        (3, None, "Invalid JSON"),
+        (4, None, "Expected a JSON object"),
+        (5, {"name": "B", "email": "b@example.com"}, None),
+    ]
+
+@pytest.mark.asyncio
+async def test_csv_records_span_quoted_lines():
+    """Test that CSV records map to the header and may contain quoted line breaks."""
+    body = b'\xef\xbb\xbfEmail,Name\na@example.com,"Smith, ""Al""\nJr"\nb@example.com\n'
+
+    records = await collect(body, "csv")
+
+    assert records == [
+        (2, {"email": "a@example.com", "name": 'Smith, "Al"\nJr'}, None),
+        (4, None, "Expected 2 fields, got 1"),
+    ]
+
+@pytest.mark.asyncio
+async def test_bulk_load_reports_row_errors(db_session):
+    """Test that invalid and duplicate rows are reported while the others are loaded in chunks."""
+    db_session.add(Customer(name="Existing", email="taken@example.com"))
+    await db_session.commit()
+    lines = [
+        {"name": "One", "email": "one@example.com"},
+        {"name": "", "email": "bad"},
+        {"name": "Taken", "email": "taken@example.com"},
+        {"name": "Two", "email": "two@example.com"},
+        {"name": "Again", "email": "one@example.com"},
+        {"name": "Three", "email": "three@example.com"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines).encode()
+
+    records = iter_records(chunked(body, 16), "ndjson")
+    report = await CustomerService(db_session).bulk_create_customers(records, chunk_size=2, max_errors=2)
+
+    assert report["received"] == 6
+    assert report["inserted"] == 3
+    assert report["failed"] == 3
+    assert report["errors"][0]["line"] == 2
+    assert "name" in report["errors"][0]["error"] and "email" in report["errors"][0]["error"]
+    assert report["errors"][1] == {"line": 3, "error": "Email already registered"}
+    assert report["errors_truncated"] is True
+    count = await db_session.scalar(select(func.count()).select_from(Customer))
+    assert count == 4
+
+@pytest.mark.asyncio
+async def test_bulk_route_accepts_csv(client, db_session):
+    """Test that a CSV upload is loaded and invalidates cached customer results."""
+    sql = "SELECT * FROM customers"
+    result_cache.put(sql, [], result_cache.snapshot(sql))
+
+    response = await client.post(
+        "/customers/bulk",
+        content=b"name,email\nAda,ada@example.com\nBob,bob@example.com\n",
+        headers={**HEADERS, "Content-Type": "text/csv; charset=utf-8"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"received": 2, "inserted": 2, "failed": 0, "errors": [], "errors_truncated": False}
+    assert result_cache.get(sql) is None
+
+@pytest.mark.asyncio
+async def test_bulk_route_rejects_bad_uploads(client):
+    """Test that unsupported media types and CSV headers without the required columns are refused."""
+    response = await client.post("/customers/bulk", content=b"{}", headers={**HEADERS, "Content-Type": "application/json"})
+    assert response.status_code == 415
+
+    response = await client.post("/customers/bulk", content=b"name\nAda\n", headers={**HEADERS, "Content-Type": "text/csv"})
+    assert response.status_code == 400
+    assert "email" in response.json()["detail"]
@@ -0,0 +1,161 @@
+"""Tests for the deadline, retries, hedging and circuit breaker of the LLM backend."""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.translator import CircuitBreaker, LLMBackend, TranslationUnavailableError, llm_backend
+from src.translator import llm as llm_module
+from src.utils.metrics import registry
+
+@pytest.fixture(autouse=True)
+def _fast_backoff(monkeypatch):
+    """Shorten the retry backoff."""
+    monkeypatch.setattr(llm_module, "RETRY_BASE_WAIT", 0.001)
+    monkeypatch.setattr(llm_module, "RETRY_MAX_WAIT", 0.002)
+
+class ScriptedCompletions:
+    """Chat completions stand-in following a script of delays and failures.
+
+    Each call takes the next step: a number of seconds to wait before answering,
+    or an exception to raise. The last step repeats.
+    """
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        step = self.steps[min(self.calls, len(self.steps) - 1)]
+        self.calls += 1
+        if isinstance(step, Exception):
+            raise step
+        await asyncio.sleep(step)
+        message = SimpleNamespace(content=json.dumps({"sql": f"SELECT {self.calls}"}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+def scripted_backend(*steps, **kwargs):
+    """Create a single-tier LLM backend over a script."""
+    completions = ScriptedCompletions(*steps)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return LLMBackend(client, models=["model"], **kwargs), completions
+
+@pytest.mark.asyncio
+async def test_failed_attempt_is_retried():
+    """Test that a failed call is retried and its success returned."""
+    backend, completions = scripted_backend(RuntimeError("boom"), 0)
+    assert await backend.translate("question") == "SELECT 2"
+    assert completions.calls == 2
+    assert backend.breaker.failures == 0
+
+@pytest.mark.asyncio
+async def test_attempts_are_limited():
+    """Test that the error is raised once the attempts are exhausted."""
+    backend, completions = scripted_backend(RuntimeError("boom"), max_attempts=3)
+    with pytest.raises(TranslationUnavailableError):
+        await backend.translate("question")
+    assert completions.calls == 3
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_the_translation():
+    """Test that slow calls are abandoned when the time budget is spent."""
+    backend, completions = scripted_backend(1.0, deadline=0.05, timeout=10.0, hedge=False, max_attempts=10)
+    start = time.monotonic()
+    with pytest.raises(TranslationUnavailableError):
+        await backend.translate("question")
+    assert time.monotonic() - start < 0.5
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged():
+    """Test that a duplicate request answers when the first one is slow."""
+    before = registry.get_sample_value("cloudlinker_translation_hedges_total") or 0.0
+    backend, completions = scripted_backend(1.0, 0, hedge_after=0.01)
+    start = time.monotonic()
+    assert await backend.translate("question") == "SELECT 2"
+    assert time.monotonic() - start < 0.5
+    assert registry.get_sample_value("cloudlinker_translation_hedges_total") == before + 1
+
+@pytest.mark.asyncio
+async def test_hedge_delay_follows_recent_latencies():
+    """Test that without a fixed delay calls are hedged after the recent p95."""
+    backend, _ = scripted_backend(0)
+    assert backend.hedge_delay() is None
+    for ms in range(1, 21):
+        backend.latencies.record(ms / 1000)
+    assert backend.hedge_delay() == 0.019
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_then_probes():
+    """Test that the circuit opens after repeated failures and a probe closes it."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    backend, completions = scripted_backend(
+        RuntimeError("boom"), RuntimeError("boom"), 0, breaker=breaker, max_attempts=2
+    )
+    with pytest.raises(TranslationUnavailableError):
+        await backend.translate("question")
+    assert breaker.state == "open"
+
+    with pytest.raises(TranslationUnavailableError) as exc_info:
+        await backend.translate("question")
+    assert completions.calls == 2
+    assert 0 < exc_info.value.retry_after <= 0.05
+
+    await asyncio.sleep(0.06)
+    assert await backend.translate("question") == "SELECT 3"
+    assert breaker.state == "closed"
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_is_released():
+    """Test that a probe cancelled by its caller lets the next call through."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    backend, completions = scripted_backend(1.0, 0, breaker=breaker, hedge=False)
+    task = asyncio.create_task(backend.translate("question"))
+    await asyncio.sleep(0.01)
+    assert breaker.state == "half_open"
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert await backend.translate("question") == "SELECT 2"
+    assert breaker.state == "closed"
+
+def test_half_open_allows_a_single_probe():
+    """Test that only one call is let through while half-open, and its failure reopens."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    assert breaker.state == "half_open"
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.opened == 2
+
+def test_opening_the_circuit_is_counted():
+    """Test that the opened counter is incremented when the global breaker opens."""
+    before = registry.get_sample_value("cloudlinker_translator_circuit_opened_total") or 0.0
+    for _ in range(llm_backend.breaker.failure_threshold):
+        llm_backend.breaker.record_failure()
+    assert llm_backend.breaker.state == "open"
+    assert registry.get_sample_value("cloudlinker_translator_circuit_opened_total") == before + 1
+
+@pytest.mark.asyncio
+async def test_unavailable_translator_returns_503(monkeypatch):
+    """Test that an unavailable translator is reported as 503 with Retry-After."""
+    from httpx import ASGITransport, AsyncClient
+
+    from src.main import app
+    from src.services import query_service
+
+    async def unavailable(question):
+        raise TranslationUnavailableError("down", retry_after=2.5)
+
+    monkeypatch.setattr(query_service, "translate", unavailable)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/query", json={"question": "anything"}, headers={"X-API-Key": "test_key"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
@@ -0,0 +1,80 @@
+import io
+import json
+
+import pytest
+import structlog
+
+from src.services.query_service import sql_log_fields
+from src.settings import settings
+from src.utils.logger import EventSampler, LogQueue, iso_timestamp, parse_sample_rates
+
+def test_log_queue_writes_json_lines_in_batches():
+    """Test that queued events are rendered as one JSON object per line."""
+    stream = io.StringIO()
+    queue = LogQueue(max_size=100, batch_size=2, stream=stream)
+    for index in range(3):
+        queue.put({"event": "test.event", "index": index})
+    assert len(queue) == 3
+
+    queue.flush()
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line)["index"] for line in lines] == [0, 1, 2]
+    assert len(queue) == 0
+
+def test_log_queue_writes_iso_timestamps():
+    """Test that event times are written in the ISO-8601 format of structlog's TimeStamper."""
+    stream = io.StringIO()
+    queue = LogQueue(max_size=100, stream=stream)
+    queue.put({"event": "test.event", "timestamp": 1704110400.25})
+    queue.flush()
+    assert json.loads(stream.getvalue())["timestamp"] == "2024-01-01T12:00:00.250000Z"
+    assert iso_timestamp(1704110400.0) == "2024-01-01T12:00:00Z"
+
+def test_log_queue_drops_events_when_full():
+    """Test that the drop policy discards events instead of growing the queue."""
+    queue = LogQueue(max_size=2, overflow_policy="drop", stream=io.StringIO())
+    for index in range(5):
+        queue.put({"event": "test.event", "index": index})
+    assert len(queue) == 2
+    assert queue.dropped == 3
+
+def test_log_queue_samples_events_when_half_full():
+    """Test that the sample policy keeps a fraction of events once the queue is half full."""
+    queue = LogQueue(max_size=10, overflow_policy="sample", overflow_sample_rate=0.0, stream=io.StringIO())
+    for index in range(8):
+        queue.put({"event": "test.event", "index": index})
+    assert len(queue) == 5
+    assert queue.dropped == 3
+
+def test_log_queue_writer_thread_drains_queue():
+    """Test that the background writer writes queued events and stops cleanly."""
+    stream = io.StringIO()
+    queue = LogQueue(max_size=100, batch_size=1, flush_interval=0.01, stream=stream)
+    queue.start()
+    queue.put({"event": "test.event"})
+    queue.stop()
+    assert json.loads(stream.getvalue())["event"] == "test.event"
+
+def test_event_sampler():
+    """Test that sampled events are dropped and other events pass through."""
+    sampler = EventSampler({"noisy.event": 0.0, "kept.event": 1.0})
+    with pytest.raises(structlog.DropEvent):
+        sampler(None, "info", {"event": "noisy.event"})
+    assert sampler(None, "info", {"event": "kept.event"}) == {"event": "kept.event"}
+    assert sampler(None, "info", {"event": "other.event"}) == {"event": "other.event"}
+
+def test_parse_sample_rates():
+    """Test parsing of per-event sampling rates."""
+    assert parse_sample_rates("") == {}
+    assert parse_sample_rates("a.b=0.5, c.d=2") == {"a.b": 0.5, "c.d": 1.0}
+    with pytest.raises(ValueError):
+        parse_sample_rates("missing-rate")
+
+def test_sql_log_fields_only_include_fingerprint(monkeypatch):
+    """Test that query log events carry the fingerprint unless LOG_SQL is enabled."""
+    sql = "SELECT * FROM customers WHERE email = 'secret@example.com'"
+    fields = sql_log_fields(sql)
+    assert set(fields) == {"sql_fingerprint"}
+
+    monkeypatch.setattr(settings, "log_sql", True)
+    assert sql_log_fields(sql)["sql"] == sql
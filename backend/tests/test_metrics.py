@@ -0,0 +1,46 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.middleware.rate_limit import rate_limiter
+from src.utils.metrics import registry, time_stage
+
+@pytest.fixture
+def client():
+    """Create a test client."""
+    return TestClient(app)
+
+def test_metrics_is_exempt_from_api_key(client):
+    """Test that /metrics is served without an API key."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "cloudlinker_query_stage_seconds_bucket" in response.text
+    assert 'cloudlinker_cache_hits_total{cache="translation"}' in response.text
+
+def test_metrics_is_exempt_from_rate_limit(client, monkeypatch):
+    """Test that scraping /metrics never consumes rate limit tokens."""
+    monkeypatch.setattr(rate_limiter, "requests_per_minute", 1)
+    for _ in range(3):
+        assert client.get("/metrics").status_code == 200
+
+def test_rate_limited_requests_are_counted(client, monkeypatch):
+    """Test that 429 responses show up in the metrics."""
+    monkeypatch.setattr(rate_limiter, "requests_per_minute", 1)
+    before = rate_limiter.limited
+    client.get("/not-found", headers={"X-API-Key": "test_key"})
+    response = client.get("/not-found", headers={"X-API-Key": "test_key"})
+    assert response.status_code == 429
+
+    metrics = client.get("/metrics").text
+    assert f"cloudlinker_rate_limited_requests_total {float(before + 1)}" in metrics
+
+def test_time_stage_observes_histogram():
+    """Test that timed blocks are recorded in the stage histogram."""
+    def count():
+        return registry.get_sample_value("cloudlinker_query_stage_seconds_count", {"stage": "encode"})
+
+    before = count()
+    with time_stage("encode"):
+        pass
+    assert count() == before + 1
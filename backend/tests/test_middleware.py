@@ -0,0 +1,54 @@
+"""Tests for the API key and rate limit middleware."""
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from src.middleware.api_key import APIKeyMiddleware
+from src.middleware.rate_limit import RateLimiter
+
+async def ok(request):
+    return PlainTextResponse("ok")
+
+def make_app(rate_limiter):
+    app = Starlette(routes=[Route("/health", ok), Route("/data", ok)])
+    app.add_middleware(APIKeyMiddleware, rate_limiter=rate_limiter)
+    return app
+
+@pytest.fixture
+async def client():
+    async with AsyncClient(app=make_app(RateLimiter(requests_per_minute=2)), base_url="http://test") as client:
+        yield client
+
+@pytest.mark.asyncio
+async def test_health_needs_no_key(client):
+    """Test that exempt paths skip validation."""
+    response = await client.get("/health")
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_valid_key_is_accepted(client):
+    """Test that a configured key reaches the application."""
+    response = await client.get("/data", headers={"X-API-Key": "test_key"})
+    assert response.status_code == 200
+    assert response.text == "ok"
+
+@pytest.mark.asyncio
+async def test_rate_limit_exceeded(client):
+    """Test that requests over the budget get a 429 with Retry-After."""
+    for _ in range(2):
+        assert (await client.get("/data", headers={"X-API-Key": "test_key"})).status_code == 200
+
+    response = await client.get("/data", headers={"X-API-Key": "test_key"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert response.json()["retry_after"] == int(response.headers["Retry-After"])
+
+@pytest.mark.asyncio
+async def test_invalid_keys_do_not_consume_budget(client):
+    """Test that rejected keys are not rate limited."""
+    for _ in range(3):
+        assert (await client.get("/data", headers={"X-API-Key": "wrong"})).status_code == 401
+    assert (await client.get("/data", headers={"X-API-Key": "test_key"})).status_code == 200
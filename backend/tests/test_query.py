@@ -8,7 +8,7 @@ from sqlalchemy.pool import StaticPool
 
 from src.main import app
 from src.models.customer import Base
-from src.db import get_db
+from src.db import get_db, get_read_db
 from src.settings import settings
 
 # Test database URL
@@ -47,6 +47,8 @@ async def client(db_session):
         yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
+    
+    app.dependency_overrides[get_read_db] = override_get_db
     async with AsyncClient(app=app, base_url="http://test") as client:
         yield client
     app.dependency_overrides.clear()
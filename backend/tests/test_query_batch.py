@@ -0,0 +1,116 @@
+"""Tests for the batch query endpoint."""
+
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.main import app
+from src.models.customer import Base
+from src.db import get_db, get_read_db, get_session_factory
+from src.services import query_service
+
+# Test database URL
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+# Create test engine
+engine = create_async_engine(
+    TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+# Create test session
+TestingSessionLocal = sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+# Canned translations used instead of the LLM
+TRANSLATIONS = {
+    "count customers": "SELECT COUNT(*) AS total FROM customers",
+    "list names": "SELECT name FROM customers ORDER BY id",
+    "drop everything": "DROP TABLE customers",
+    "missing table": "SELECT * FROM missing_table",
+}
+
+@pytest.fixture
+async def db_session():
+    """Create a fresh database session for each test."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with TestingSessionLocal() as session:
+        yield session
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+@pytest.fixture
+async def client(db_session, monkeypatch):
+    """Create a test client with canned translations and two customers."""
+    async def override_get_db():
+        yield db_session
+
+    async def fake_translate(question):
+        return TRANSLATIONS.get(question, "-- TODO")
+
+    monkeypatch.setattr(query_service, "translate", fake_translate)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        for i in range(2):
+            await client.post(
+                "/customers",
+                json={"name": f"User {i}", "email": f"user{i}@example.com"},
+                headers={"X-API-Key": "test_key"}
+            )
+        yield client
+    app.dependency_overrides.clear()
+
+@pytest.mark.asyncio
+async def test_batch_returns_results_in_order(client):
+    """Test that every question gets its own result or error, in request order."""
+    questions = ["count customers", "drop everything", "list names", "unknown", "missing table"]
+    response = await client.post(
+        "/query/batch",
+        json={"questions": questions},
+        headers={"X-API-Key": "test_key"}
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["question"] for item in results] == questions
+    assert results[0]["result"] == [{"total": 2}]
+    assert results[1]["error"]["status_code"] == 400
+    assert [row["name"] for row in results[2]["result"]] == ["User 0", "User 1"]
+    assert results[3]["sql"] == "-- TODO"
+    assert results[4]["error"]["status_code"] == 500
+
+@pytest.mark.asyncio
+async def test_batch_stream(client):
+    """Test streaming batch results as NDJSON."""
+    response = await client.post(
+        "/query/batch?stream=true",
+        json={"questions": ["count customers", "list names"]},
+        headers={"X-API-Key": "test_key"}
+    )
+
+    assert response.status_code == 200
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(item["index"] for item in items) == [0, 1]
+
+@pytest.mark.asyncio
+async def test_batch_rejects_empty_request(client):
+    """Test that an empty batch is rejected."""
+    response = await client.post(
+        "/query/batch",
+        json={"questions": []},
+        headers={"X-API-Key": "test_key"}
+    )
+    assert response.status_code == 422
@@ -0,0 +1,96 @@
+"""Tests for the pre-execution query guard."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.services.query_guard import QueryGuard, has_top_level_limit
+
+class FakePostgresSession:
+    """Session stub answering EXPLAIN with a fixed plan estimate."""
+
+    def __init__(self, cost, rows):
+        self.plan = json.dumps([{"Plan": {"Total Cost": cost, "Plan Rows": rows}}])
+        self.statements = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    async def execute(self, statement):
+        self.statements.append(str(statement))
+        return SimpleNamespace(scalar=lambda: self.plan)
+
+def make_guard(**overrides):
+    options = dict(max_cost=1000, max_rows=100, default_limit=50, statement_timeout_ms=2000,
+                   cache_size=10, cache_ttl=60)
+    options.update(overrides)
+    return QueryGuard(**options)
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM customers", False),
+    ("SELECT * FROM customers LIMIT 10", True),
+    ("SELECT * FROM customers FETCH FIRST 5 ROWS ONLY", True),
+    ("SELECT * FROM (SELECT * FROM customers LIMIT 10) c", False),
+    ("SELECT * FROM customers WHERE name = 'no limit'", False),
+])
+def test_has_top_level_limit(sql, expected):
+    """Test that only LIMIT clauses of the outermost query count."""
+    assert has_top_level_limit(sql) is expected
+
+@pytest.mark.asyncio
+async def test_adds_limit_and_caches_verdict():
+    """Test that unlimited queries get a LIMIT and repeated queries skip EXPLAIN."""
+    guard = make_guard()
+    session = FakePostgresSession(cost=10, rows=5)
+
+    first = await guard.admit(session, "SELECT * FROM customers")
+    second = await guard.admit(session, "select *  from customers")
+
+    assert first == "SELECT * FROM customers LIMIT 50"
+    assert second == "select *  from customers LIMIT 50"
+    assert guard.stats()["explains"] == 1
+    assert guard.stats()["cache_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_verdicts_are_not_shared_between_values():
+    """Test that another value of the same query shape is planned again."""
+    guard = make_guard()
+
+    await guard.admit(FakePostgresSession(cost=10, rows=5), "SELECT * FROM orders WHERE customer_id = 1 LIMIT 5")
+    with pytest.raises(HTTPException):
+        await guard.admit(FakePostgresSession(cost=5000, rows=5), "SELECT * FROM orders WHERE customer_id = 2 LIMIT 5")
+
+    assert guard.stats()["explains"] == 2
+    assert guard.stats()["rejected"] == 1
+
+@pytest.mark.asyncio
+async def test_rejects_expensive_query():
+    """Test that queries over the cost threshold are rejected."""
+    guard = make_guard()
+    session = FakePostgresSession(cost=5000, rows=5)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await guard.admit(session, "SELECT * FROM a, b, c")
+    assert exc_info.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_caps_large_results():
+    """Test that queries estimated to return too many rows are capped."""
+    guard = make_guard()
+    session = FakePostgresSession(cost=10, rows=10_000)
+
+    sql = await guard.admit(session, "SELECT * FROM customers LIMIT 100000")
+
+    assert sql == "SELECT * FROM (SELECT * FROM customers LIMIT 100000) AS limited_query LIMIT 100"
+
+@pytest.mark.asyncio
+async def test_statement_timeout():
+    """Test that the statement timeout is set for the transaction."""
+    guard = make_guard()
+    session = FakePostgresSession(cost=10, rows=5)
+
+    await guard.apply_timeout(session)
+
+    assert session.statements == ["SET LOCAL statement_timeout = 2000"]
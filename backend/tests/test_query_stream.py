@@ -0,0 +1,99 @@
+"""Tests for the streaming query endpoint."""
+
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.main import app
+from src.models.customer import Base
+from src.db import get_db, get_read_db, get_session_factory
+from src.services import query_service
+
+# Test database URL
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+# Create test engine
+engine = create_async_engine(
+    TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+# Create test session
+TestingSessionLocal = sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+@pytest.fixture
+async def db_session():
+    """Create a fresh database session for each test."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with TestingSessionLocal() as session:
+        yield session
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+@pytest.fixture
+async def client(db_session, monkeypatch):
+    """Create a test client whose translator always lists the customers."""
+    async def override_get_db():
+        yield db_session
+
+    async def fake_translate(question):
+        return "SELECT name, email FROM customers ORDER BY id"
+
+    monkeypatch.setattr(query_service, "translate", fake_translate)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        for i in range(3):
+            await client.post(
+                "/customers",
+                json={"name": f"User {i}", "email": f"user{i}@example.com"},
+                headers={"X-API-Key": "test_key"}
+            )
+        yield client
+    app.dependency_overrides.clear()
+
+@pytest.mark.asyncio
+async def test_stream_ndjson(client):
+    """Test streaming a result as newline-delimited JSON."""
+    response = await client.post(
+        "/query/stream",
+        json={"question": "list customers"},
+        headers={"X-API-Key": "test_key"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"sql": "SELECT name, email FROM customers ORDER BY id"}
+    assert [line["name"] for line in lines[1:]] == ["User 0", "User 1", "User 2"]
+
+@pytest.mark.asyncio
+async def test_stream_json_matches_regular_response(client):
+    """Test that the chunked JSON document matches the buffered endpoint."""
+    streamed = await client.post(
+        "/query/stream?format=json",
+        json={"question": "list customers"},
+        headers={"X-API-Key": "test_key"}
+    )
+    buffered = await client.post(
+        "/query",
+        json={"question": "list customers"},
+        headers={"X-API-Key": "test_key"}
+    )
+
+    assert streamed.status_code == 200
+    assert buffered.status_code == 200
+    assert streamed.json() == {"sql": buffered.json()["sql"], "result": buffered.json()["result"]}
@@ -0,0 +1,102 @@
+"""Tests for the rate limiter and its backends."""
+
+import multiprocessing
+
+import pytest
+
+from src.middleware import rate_limit
+from src.middleware.rate_limit import (
+    MemoryBackend,
+    RateLimiter,
+    SharedMemoryBackend,
+    parse_rate_limits,
+    retry_after_seconds,
+)
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Control the time seen by the backends."""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+    return now
+
+def test_retry_after_is_computed(clock):
+    """Test that a limited request learns when its next token arrives."""
+    limiter = RateLimiter(requests_per_minute=2, backend=MemoryBackend(max_keys=10))
+    assert limiter.check("key") == 0
+    assert limiter.check("key") == 0
+
+    wait = limiter.check("key")
+    assert wait == pytest.approx(30.0)
+    assert retry_after_seconds(wait) == 30
+
+    clock[0] += 30
+    assert limiter.check("key") == 0
+
+def test_per_key_limits(clock):
+    """Test that configured keys get their own budget."""
+    limiter = RateLimiter(requests_per_minute=1, backend=MemoryBackend(max_keys=10), limits={"vip": 3})
+    assert [limiter.check("vip") == 0 for _ in range(4)] == [True, True, True, False]
+    assert [limiter.check("other") == 0 for _ in range(2)] == [True, False]
+
+def test_memory_backend_evicts_idle_buckets(clock):
+    """Test that refilled buckets are dropped and the key count is bounded."""
+    backend = MemoryBackend(max_keys=3)
+    for i in range(5):
+        backend.take(f"key{i}", 10, 1)
+    assert len(backend.token_buckets) == 3
+
+    clock[0] += 10
+    backend.take("fresh", 10, 1)
+    assert list(backend.token_buckets) == ["fresh"]
+
+def test_parse_rate_limits():
+    """Test parsing per-key limits from the settings."""
+    assert parse_rate_limits("a=10, b=20,") == {"a": 10, "b": 20}
+    with pytest.raises(ValueError):
+        parse_rate_limits("missing-limit")
+
+def _take_all(path, count, results):
+    backend = SharedMemoryBackend(path, slots=64)
+    results.put(sum(backend.take("shared", 10, 10 / 60) == 0 for _ in range(count)))
+    backend.close()
+
+def test_shared_memory_backend_enforces_one_limit_across_processes(tmp_path):
+    """Test that workers sharing the table share one budget."""
+    path = str(tmp_path / "rate-limit")
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_take_all, args=(path, 10, results)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=10)
+
+    assert sum(results.get(timeout=1) for _ in workers) == 10
+
+def test_shared_memory_backend_reuses_idle_slots(tmp_path, clock):
+    """Test that the table stays usable when more keys than slots are seen."""
+    backend = SharedMemoryBackend(str(tmp_path / "rate-limit"), slots=4)
+    for i in range(4):
+        assert backend.take(f"key{i}", 1, 1) == 0
+
+    clock[0] += 5
+    assert backend.take("new", 1, 1) == 0
+    assert backend.take("new", 1, 1) > 0
+    backend.close()
+
+def test_shared_memory_backend_keeps_busy_slots_of_other_limits(tmp_path, clock):
+    """Test that a key with a low limit cannot reclaim the busy slot of a key with a high limit."""
+    backend = SharedMemoryBackend(str(tmp_path / "rate-limit"), slots=2)
+    # A key probing the same slot first as "vip"
+    low = next(
+        key for key in (f"low{i}" for i in range(100))
+        if backend._digest(key) % 2 == backend._digest("vip") % 2
+    )
+    assert backend.take("vip", 3, 3 / 60) == 0
+    assert backend.take("vip", 3, 3 / 60) == 0
+
+    clock[0] += 1
+    assert backend.take(low, 1, 1 / 60) == 0
+    assert [backend.take("vip", 3, 3 / 60) == 0 for _ in range(2)] == [True, False]
+    backend.close()
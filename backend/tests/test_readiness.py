@@ -0,0 +1,107 @@
+"""Tests for the pool instrumentation and the readiness probe."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from src.db import ReadRouter, create_engine
+from src.main import app
+from src.services import readiness
+from src.services.readiness import ReadinessProbe
+from src.utils.metrics import PoolCollector, registry
+
+def sqlite_engine(path, label):
+    """Create an instrumented engine on a SQLite file."""
+    return create_engine(f"sqlite+aiosqlite:///{path}", label=label, pool_size=2, max_overflow=1, pool_timeout=1)
+
+@pytest.fixture
+async def engines(tmp_path):
+    """Create a working primary, a working replica and an unreachable replica."""
+    created = {
+        "primary": sqlite_engine(tmp_path / "primary.db", "test_primary"),
+        "replica1": sqlite_engine(tmp_path / "replica.db", "test_replica1"),
+        "replica2": sqlite_engine(tmp_path / "missing" / "replica.db", "test_replica2"),
+    }
+    yield created
+    for engine in created.values():
+        await engine.dispose()
+
+def sample(name, labels):
+    """Read a metric sample from the registry."""
+    return registry.get_sample_value(name, labels) or 0.0
+
+@pytest.mark.asyncio
+async def test_pool_metrics(engines):
+    """Test that checkouts are timed, connections counted and invalidations recorded."""
+    engine = engines["primary"]
+    waits = sample("cloudlinker_db_pool_wait_seconds_count", {"engine": "test_primary"})
+    checkouts = sample("cloudlinker_db_pool_checkouts_total", {"engine": "test_primary"})
+    invalidations = sample("cloudlinker_db_pool_invalidations_total", {"engine": "test_primary"})
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        collected = list(PoolCollector(lambda: {"test_primary": engine.sync_engine.pool}).collect())
+        await conn.invalidate()
+
+    states = {metric.labels["state"]: metric.value for metric in collected[0].samples}
+    assert states == {"in_use": 1, "idle": 0, "overflow": 0}
+    assert sample("cloudlinker_db_pool_wait_seconds_count", {"engine": "test_primary"}) == waits + 1
+    assert sample("cloudlinker_db_pool_checkouts_total", {"engine": "test_primary"}) == checkouts + 1
+    assert sample("cloudlinker_db_pool_invalidations_total", {"engine": "test_primary"}) == invalidations + 1
+
+@pytest.mark.asyncio
+async def test_probe_reports_failed_replica_and_updates_rotation(engines):
+    """Test that a failed replica is reported and left out, without making the service unready."""
+    router = ReadRouter([engines["replica1"], engines["replica2"]], engines["primary"], retry_interval=60)
+    router.mark_down(engines["replica1"])
+    probe = ReadinessProbe(lambda: engines, interval=10, timeout=1, router=router)
+
+    checks = await probe.check()
+
+    assert checks["primary"]["ok"] and checks["replica1"]["ok"]
+    assert not checks["replica2"]["ok"]
+    assert router.healthy() == [engines["replica1"]]
+    is_ready, body = probe.status()
+    assert is_ready
+    assert body["checks"] == checks
+
+@pytest.mark.asyncio
+async def test_probe_without_primary_is_not_ready(engines):
+    """Test that the service is unready before the first probe and when the primary fails."""
+    probe = ReadinessProbe(lambda: {"primary": engines["replica2"]}, interval=10, timeout=1)
+    assert probe.status()[0] is False
+
+    await probe.check()
+    is_ready, body = probe.status()
+    assert not is_ready
+    assert body["reason"] == "primary database unavailable"
+
+@pytest.mark.asyncio
+async def test_exhausted_pool_is_busy_not_down(engines):
+    """Test that an engine whose connections are all in use is reported busy and stays ready."""
+    engine = engines["primary"]
+    held = [await engine.connect() for _ in range(3)]
+    try:
+        probe = ReadinessProbe(lambda: {"primary": engine}, interval=10, timeout=0.1)
+        checks = await probe.check()
+        assert checks["primary"]["ok"] and checks["primary"]["busy"]
+        assert probe.status()[0]
+    finally:
+        for conn in held:
+            await conn.close()
+    assert "busy" not in (await probe.check())["primary"]
+
+@pytest.mark.asyncio
+async def test_ready_route_serves_last_probe(engines, monkeypatch):
+    """Test that /ready answers from the probe without an API key."""
+    probe = ReadinessProbe(lambda: {"primary": engines["primary"]}, interval=10, timeout=1)
+    monkeypatch.setattr(readiness, "readiness_probe", probe)
+    monkeypatch.setattr("src.main.readiness_probe", probe)
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        assert (await client.get("/ready")).status_code == 503
+        await probe.check()
+        response = await client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.json()["checks"]["primary"]["ok"] is True
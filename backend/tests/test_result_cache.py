@@ -0,0 +1,105 @@
+"""Tests for the query result cache."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.customer import Base
+from src.schemas.customer import CustomerCreate
+from src.services import query_service
+from src.services.customer_service import CustomerService
+from src.services.query_service import QueryService
+from src.services.result_cache import ResultCache, result_cache
+from src.utils.sql_fingerprint import fingerprint, referenced_tables
+
+# Test database URL
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+# Create test engine
+engine = create_async_engine(
+    TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+# Create test session
+TestingSessionLocal = sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+@pytest.fixture
+async def db_session():
+    """Create a fresh database session for each test."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with TestingSessionLocal() as session:
+        yield session
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+def test_fingerprint_ignores_case_and_whitespace():
+    """Test that formatting differences share a fingerprint but literals do not."""
+    assert fingerprint("SELECT *\n  FROM customers") == fingerprint("select * from customers")
+    assert fingerprint("SELECT * FROM customers WHERE name = 'A'") != fingerprint(
+        "SELECT * FROM customers WHERE name = 'a'"
+    )
+
+def test_referenced_tables():
+    """Test extracting the tables read by a query."""
+    sql = "SELECT * FROM public.customers c JOIN orders o ON c.id = o.customer_id WHERE c.name = 'from x'"
+    assert referenced_tables(sql) == {"customers", "orders"}
+    assert referenced_tables('SELECT * FROM "public"."Customers" JOIN "orders" o ON true') == {"customers", "orders"}
+
+def test_query_without_known_tables_is_not_cached():
+    """Test that a result no write could invalidate is not cached."""
+    cache = ResultCache(max_bytes=1000, ttl=60)
+    assert not cache.put("SELECT 1", [{"1": 1}], cache.snapshot("SELECT 1"))
+    assert cache.get("SELECT 1") is None
+
+def test_memory_cap_evicts_oldest():
+    """Test that the byte budget evicts least recently used results."""
+    cache = ResultCache(max_bytes=60, ttl=60)
+    rows = [{"name": "x" * 10}]
+    cache.put("SELECT 1 FROM a", rows, cache.snapshot("SELECT 1 FROM a"))
+    cache.put("SELECT 2 FROM b", rows, cache.snapshot("SELECT 2 FROM b"))
+    cache.put("SELECT 3 FROM c", rows, cache.snapshot("SELECT 3 FROM c"))
+
+    assert cache.get("SELECT 1 FROM a") is None
+    assert cache.stats()["bytes"] <= 60
+    assert cache.stats()["evictions"] == 1
+
+def test_write_during_execution_is_not_cached():
+    """Test that a result read across a concurrent write is discarded."""
+    cache = ResultCache(max_bytes=1024, ttl=60)
+    snapshot = cache.snapshot("SELECT * FROM customers")
+    cache.invalidate_tables(["customers"])
+
+    assert not cache.put("SELECT * FROM customers", [], snapshot)
+
+@pytest.mark.asyncio
+async def test_create_customer_invalidates_results(db_session, monkeypatch):
+    """Test that committing a new customer evicts cached customer results."""
+    async def fake_translate(question):
+        return "SELECT name FROM customers"
+
+    monkeypatch.setattr(query_service, "translate", fake_translate)
+    service = QueryService(db_session)
+    customers = CustomerService(db_session)
+    await customers.create_customer(CustomerCreate(name="First", email="first@example.com"))
+
+    first = await service.process_query("list names", "test_key")
+    second = await service.process_query("list names", "test_key")
+    assert first["cache_age"] is None
+    assert second["cache_age"] is not None
+
+    await customers.create_customer(CustomerCreate(name="Second", email="second@example.com"))
+    third = await service.process_query("list names", "test_key")
+
+    assert third["cache_age"] is None
+    assert [row["name"] for row in third["result"]] == ["First", "Second"]
+    assert result_cache.stats()["invalidations"] >= 1
@@ -0,0 +1,155 @@
+"""Tests for the negotiated result formats of the query endpoint."""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.db import get_db, get_read_db
+from src.main import app
+from src.models.customer import Base
+from src.utils import result_format
+from src.utils.result_format import (
+    COLUMNAR_JSON_MEDIA_TYPE,
+    ResultRows,
+    describe_columns,
+    encode_result,
+    negotiate,
+)
+
+# Test database URL
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+# Create test engine
+engine = create_async_engine(
+    TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+# Create test session
+TestingSessionLocal = sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+@pytest.fixture
+async def db_session():
+    """Create a fresh database session for each test."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with TestingSessionLocal() as session:
+        yield session
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+@pytest.fixture
+async def client(db_session):
+    """Create a test client with a fresh database session."""
+    async def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    app.dependency_overrides[get_read_db] = override_get_db
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+@pytest.mark.parametrize("accept, media_type", [
+    (None, "application/json"),
+    ("*/*", "application/json"),
+    ("text/html, application/*;q=0.5", "application/json"),
+    (f"application/json;q=0.5, {COLUMNAR_JSON_MEDIA_TYPE}", COLUMNAR_JSON_MEDIA_TYPE),
+])
+def test_negotiate(accept, media_type):
+    """Test picking the result format from the Accept header."""
+    assert negotiate(accept) == media_type
+
+def test_negotiate_rejects_unsupported_formats(monkeypatch):
+    """Test that formats whose library is missing are not acceptable."""
+    monkeypatch.setattr(result_format, "msgpack", None)
+    with pytest.raises(HTTPException) as exc_info:
+        negotiate("application/msgpack, text/csv")
+    assert exc_info.value.status_code == 406
+
+def test_column_types_from_description_and_values():
+    """Test that driver type codes win and unknown types are inferred from values."""
+    rows = [{"id": 1, "amount": None, "seen": None}, {"id": 2, "amount": Decimal("1.5"), "seen": None}]
+    description = [("id", 23), ("amount", None), ("seen", None)]
+    assert describe_columns(description, rows) == [
+        {"name": "id", "type": "int"},
+        {"name": "amount", "type": "decimal"},
+        {"name": "seen", "type": None},
+    ]
+
+def test_columnar_json_lists_columns_once():
+    """Test the columnar document and that it is smaller than row objects."""
+    rows = ResultRows(
+        [{"id": n, "created_at": datetime(2024, 1, 1)} for n in range(3)],
+        [{"name": "id", "type": "int"}, {"name": "created_at", "type": "timestamp"}],
+    )
+    body = encode_result(COLUMNAR_JSON_MEDIA_TYPE, "SELECT 1", rows, None)
+
+    assert json.loads(body) == {
+        "sql": "SELECT 1",
+        "columns": [{"name": "id", "type": "int"}, {"name": "created_at", "type": "timestamp"}],
+        "rows": [[n, "2024-01-01T00:00:00"] for n in range(3)],
+        "cache_age": None,
+    }
+
+    many = ResultRows(rows * 100, rows.columns)
+    columnar_size = len(encode_result(COLUMNAR_JSON_MEDIA_TYPE, "SELECT 1", many, None))
+    assert columnar_size < len(encode_result("application/json", "SELECT 1", many, None))
+
+def test_msgpack_result():
+    """Test the MessagePack encoding of a result."""
+    msgpack = pytest.importorskip("msgpack")
+    rows = ResultRows([{"id": 1}], [{"name": "id", "type": "int"}])
+    body = encode_result("application/msgpack", "SELECT 1", rows, 2.0)
+    assert msgpack.unpackb(body)["rows"] == [[1]]
+
+def test_arrow_result():
+    """Test the Arrow IPC encoding of a result."""
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+
+    rows = ResultRows([{"id": 1, "name": "a"}], [{"name": "id", "type": "int"}, {"name": "name", "type": "text"}])
+    body = encode_result("application/vnd.apache.arrow.stream", "SELECT 1", rows, None)
+    table = pyarrow.ipc.open_stream(body).read_all()
+    assert table.to_pylist() == [{"id": 1, "name": "a"}]
+    assert table.schema.metadata[b"sql"] == b"SELECT 1"
+
+@pytest.mark.asyncio
+async def test_query_returns_columnar_json(client):
+    """Test that /query answers in columnar JSON when asked to, even for empty results."""
+    response = await client.post(
+        "/query",
+        json={"question": "show all customers"},
+        headers={"X-API-Key": "test_key", "Accept": COLUMNAR_JSON_MEDIA_TYPE},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == COLUMNAR_JSON_MEDIA_TYPE
+    data = response.json()
+    assert [column["name"] for column in data["columns"]] == ["id", "name", "email", "created_at", "updated_at"]
+    assert data["rows"] == []
+
+@pytest.mark.asyncio
+async def test_query_rejects_unsupported_accept(client):
+    """Test that an unsupported Accept header is refused before translating."""
+    response = await client.post(
+        "/query",
+        json={"question": "show all customers"},
+        headers={"X-API-Key": "test_key", "Accept": "text/csv"},
+    )
+    assert response.status_code == 406
@@ -0,0 +1,106 @@
+"""Tests for the schema context of the LLM prompt."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, Table, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.customer import Base
+from src.translator import LLMBackend, SchemaContext
+from src.translator.schema import SchemaSummary, render_table
+
+def wide_metadata():
+    """Create metadata with more tables than fit in a summary."""
+    metadata = MetaData()
+    Table("customers", metadata, Column("id", Integer, primary_key=True), Column("name", String))
+    Table(
+        "orders", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("customer_id", Integer, ForeignKey("customers.id"), index=True),
+        Column("total", Integer),
+    )
+    for n in range(10):
+        Table(f"audit_{n}", metadata, Column("id", Integer, primary_key=True))
+    return metadata
+
+@pytest_asyncio.fixture
+async def session_factory():
+    """Create a SQLite database holding the customers table at a known revision."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        await conn.execute(text("INSERT INTO alembic_version VALUES ('rev1')"))
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+def test_render_table_is_compact():
+    """Test the summary line of the customers model."""
+    assert render_table(Base.metadata.tables["customers"]) == (
+        "customers(id int pk, name text idx, email text uniq, "
+        "created_at timestamp, updated_at timestamp)"
+    )
+
+def test_large_schema_keeps_relevant_tables():
+    """Test that only the tables a question refers to, and their references, are kept."""
+    summary = SchemaSummary(wide_metadata())
+
+    rendered = summary.render(["total of the orders"], max_tables=4)
+    assert rendered.splitlines() == [
+        "customers(id int pk, name text)",
+        "orders(id int pk, customer_id int idx ->customers.id, total int)",
+    ]
+    assert len(summary.render(["something else"], max_tables=4).splitlines()) == 4
+
+@pytest.mark.asyncio
+async def test_schema_is_cached_per_revision(session_factory):
+    """Test that the schema is read from the database again only after a migration."""
+    context = SchemaContext(MetaData(), session_factory, refresh_interval=0)
+
+    first = await context.summary()
+    assert first.revision == "rev1"
+    assert list(first.tables) == ["customers"]
+    assert await context.summary() is first
+
+    async with session_factory() as session:
+        await session.execute(text("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)"))
+        await session.execute(text("UPDATE alembic_version SET version_num = 'rev2'"))
+        await session.commit()
+
+    second = await context.summary()
+    assert second.revision == "rev2"
+    assert list(second.tables) == ["customers", "notes"]
+
+@pytest.mark.asyncio
+async def test_unreadable_database_falls_back_to_models():
+    """Test that the model metadata is used when the database cannot be read."""
+    def broken_factory():
+        raise RuntimeError("no database")
+
+    context = SchemaContext(Base.metadata, broken_factory)
+    assert "customers(" in await context.render(["anything"])
+
+@pytest.mark.asyncio
+async def test_schema_is_added_to_the_prompt():
+    """Test that the LLM receives the schema summary in its system prompt."""
+    requests = []
+
+    async def create(messages, **kwargs):
+        requests.append(messages)
+        message = SimpleNamespace(content=json.dumps({"sql": "SELECT 1"}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    backend = LLMBackend(client, models=["model"], schema=SchemaContext(Base.metadata))
+    await backend.translate("question")
+
+    assert "customers(id int pk" in requests[0][0]["content"]
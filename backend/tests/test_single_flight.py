@@ -0,0 +1,102 @@
+"""Tests for single-flight coalescing."""
+
+import asyncio
+
+import pytest
+
+from src.services import query_service
+from src.services.query_service import QueryService
+from src.services.translation_cache import translation_cache
+from src.utils.single_flight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    """Test that identical concurrent calls run the work once."""
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "SELECT 1"
+
+    results = await asyncio.gather(*(flight.do("key", work) for _ in range(10)))
+
+    assert results == ["SELECT 1"] * 10
+    assert calls == 1
+    assert flight.stats() == {"started": 1, "coalesced": 9, "in_flight": 0}
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    """Test that an exception is raised in every waiter."""
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *(flight.do("key", work) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_others():
+    """Test that one cancelled waiter leaves the shared call running."""
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return 42
+
+    first = asyncio.create_task(flight.do("key", work))
+    second = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == 42
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+@pytest.mark.asyncio
+async def test_last_waiter_cancels_shared_call():
+    """Test that the shared call is cancelled once nobody waits on it."""
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    assert flight.in_flight() == 0
+
+@pytest.mark.asyncio
+async def test_query_service_coalesces_translations(monkeypatch):
+    """Test that concurrent identical questions trigger one translation."""
+    translation_cache.clear()
+    calls = 0
+
+    async def fake_translate(question):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "-- BLOCKED"
+
+    monkeypatch.setattr(query_service, "translate", fake_translate)
+    monkeypatch.setattr(translation_cache, "max_size", 0)
+    service = QueryService(session=None)
+    await asyncio.gather(*(service.translate("how many customers") for _ in range(5)))
+
+    assert calls == 1
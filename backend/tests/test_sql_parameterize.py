@@ -0,0 +1,110 @@
+"""Tests for the literal parameterization of generated SQL."""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.customer import Base, Customer
+from src.services.query_service import QueryService, executable
+from src.services.result_cache import ResultCache
+from src.utils.sql_fingerprint import normalize
+
+engine = create_async_engine(
+    "sqlite+aiosqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+@pytest.fixture
+async def db_session():
+    """Create a database with two customers."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with TestingSessionLocal() as session:
+        session.add_all([
+            Customer(name="John O'Neil", email="john@example.com"),
+            Customer(name="Jane Doe", email="jane@example.com"),
+        ])
+        await session.commit()
+        yield session
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+@pytest.mark.parametrize("sql, template, values", [
+    (
+        "SELECT * FROM customers WHERE name = 'John O''Neil' AND id > 5 LIMIT 10",
+        "SELECT * FROM customers WHERE name = 'John O''Neil' AND id > :p0 LIMIT :p1",
+        [5, 10],
+    ),
+    (
+        "SELECT id FROM customers WHERE id IN (1, 2) AND created_at BETWEEN '2024-01-01' AND '2024-02-01'",
+        "SELECT id FROM customers WHERE id IN (:p0, :p1) AND created_at BETWEEN '2024-01-01' AND '2024-02-01'",
+        [1, 2],
+    ),
+    (
+        "SELECT id FROM customers WHERE id IN (SELECT id FROM orders WHERE total >= 9.5 AND n < 3) OFFSET 20",
+        "SELECT id FROM customers WHERE id IN (SELECT id FROM orders WHERE total >= 9.5 AND n < :p0) OFFSET :p1",
+        [3, 20],
+    ),
+])
+def test_compared_integers_are_lifted(sql, template, values):
+    """Test that compared integers become bind parameters, in order, and other literals stay."""
+    query = normalize(sql)
+    assert query.sql == template
+    assert [value for _, value in query.params] == values
+
+@pytest.mark.parametrize("sql", [
+    "SELECT 'label' AS kind, count(*) FROM customers GROUP BY 1 ORDER BY 2",
+    "SELECT * FROM customers WHERE created_at >= '2024-01-01'",
+    "SELECT * FROM customers WHERE id = '5'",
+    "SELECT * FROM customers WHERE id = '5'::int OR id = 6::bigint",
+    "SELECT * FROM customers WHERE coalesce(id, 0) = id",
+])
+def test_strings_and_untyped_positions_stay_inline(sql):
+    """Test that strings, casts and literals whose type the context does not give are left in the SQL."""
+    query = normalize(sql)
+    assert query.sql == sql
+    assert query.params == ()
+
+def test_lifted_statements_compile_for_asyncpg():
+    """Test that lifted parameters are bound as integers, never as VARCHAR."""
+    sql = "SELECT * FROM customers WHERE created_at >= '2024-01-01' AND id = '5' AND id > 7 LIMIT 3000000000"
+
+    compiled = str(executable(sql).compile(dialect=postgresql.asyncpg.dialect()))
+
+    assert compiled == (
+        "SELECT * FROM customers WHERE created_at >= '2024-01-01' AND id = '5' "
+        "AND id > $1::INTEGER LIMIT $2::BIGINT"
+    )
+
+def test_fingerprint_is_shared_by_query_shape():
+    """Test that only the values differ between queries of the same shape."""
+    first = normalize("SELECT * FROM customers WHERE id = 1 LIMIT 5")
+    second = normalize("select *\n  from customers where id = 2 limit 7")
+
+    assert first.fingerprint == second.fingerprint
+    assert first.cache_key != second.cache_key
+    assert normalize("SELECT * FROM customers WHERE id = 1").cache_key != normalize(
+        "SELECT * FROM customers WHERE id = '1'"
+    ).cache_key
+
+@pytest.mark.asyncio
+async def test_parameterized_execution(db_session):
+    """Test that the parameterized statement returns the rows of the literal query."""
+    sql = "SELECT name FROM customers WHERE name = 'John O''Neil' OR id = 2 ORDER BY id LIMIT 5"
+
+    assert executable(sql).text == "SELECT name FROM customers WHERE name = 'John O''Neil' OR id = :p0 ORDER BY id LIMIT :p1"
+    rows = await QueryService(db_session).execute(sql)
+    assert rows == [{"name": "John O'Neil"}, {"name": "Jane Doe"}]
+
+def test_result_cache_keys_on_values():
+    """Test that queries of the same shape with other values do not share results."""
+    cache = ResultCache(max_bytes=1_000_000, ttl=60)
+    sql = "SELECT * FROM customers WHERE id = 1"
+    cache.put(sql, [{"id": 1}], cache.snapshot(sql))
+
+    assert cache.get("select * from customers where id = 1")[0] == [{"id": 1}]
+    assert cache.get("SELECT * FROM customers WHERE id = 2") is None
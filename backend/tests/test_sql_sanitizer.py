@@ -0,0 +1,33 @@
+"""Tests for the SQL sanitizer."""
+
+import pytest
+
+from src.utils.sql_sanitizer import is_safe_select
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM customers",
+    "  select name, email from customers where id = 1",
+    "SELECT * FROM customers WHERE address = 'UNION street'",
+    "SELECT * FROM customers WHERE note = 'drop; -- it''s fine /* really */'",
+    'SELECT "update" FROM customers',
+    "SELECT * FROM customers WHERE created_at > now() - interval '1 day'",
+])
+def test_safe_queries(sql):
+    """Test that read-only queries are accepted, whatever their literals contain."""
+    assert is_safe_select(sql)
+
+@pytest.mark.parametrize("sql", [
+    "DELETE FROM customers",
+    "WITH x AS (DELETE FROM customers RETURNING *) SELECT * FROM x",
+    "SELECT * FROM customers; DROP TABLE customers",
+    "SELECT * FROM customers UNION SELECT * FROM secrets",
+    "SELECT * FROM customers -- trailing comment",
+    "SELECT * FROM customers /* comment */",
+    "SELECT * FROM customers WHERE name = 'unterminated",
+    "SELECT E'\\''; DROP TABLE customers; --'",
+    "SELECT $$'$$; DROP TABLE customers; --'",
+    "SELECT pg_sleep(1) FROM customers FOR UPDATE",
+])
+def test_unsafe_queries(sql):
+    """Test that writes, stacked statements, comments and ambiguous quoting are rejected."""
+    assert not is_safe_select(sql)
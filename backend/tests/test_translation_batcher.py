@@ -0,0 +1,145 @@
+"""Tests for micro-batching of translations."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.translator import LLMBackend
+from src.translator.batching import TranslationBatcher
+
+class BatchCompletions:
+    """Chat completions stand-in answering single and batched requests."""
+
+    def __init__(self, broken_batches=False):
+        self.broken_batches = broken_batches
+        self.requests = []
+
+    async def create(self, messages, **kwargs):
+        content = messages[-1]["content"]
+        self.requests.append(content)
+        await asyncio.sleep(0)
+        if content.startswith("["):
+            questions = json.loads(content)
+            answers = questions[:-1] if self.broken_batches else questions
+            body = {"answers": [f"SELECT '{question}'" for question in answers]}
+        else:
+            body = {"sql": f"SELECT '{content}'"}
+        message = SimpleNamespace(content=json.dumps(body))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+def batching_backend(completions, window=0.01, max_size=16):
+    """Create an LLM backend batching its requests."""
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return LLMBackend(client, models=["model"], batch_window=window, batch_max_size=max_size)
+
+@pytest.mark.asyncio
+async def test_concurrent_questions_share_one_request():
+    """Test that questions within the window are answered by one request."""
+    completions = BatchCompletions()
+    backend = batching_backend(completions)
+
+    questions = [f"q{i}" for i in range(5)]
+    answers = await asyncio.gather(*(backend.translate(question) for question in questions))
+
+    assert answers == [f"SELECT '{question}'" for question in questions]
+    assert completions.requests == [json.dumps(questions)]
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_before_the_window():
+    """Test that a batch is sent as soon as it reaches its maximum size."""
+    completions = BatchCompletions()
+    backend = batching_backend(completions, window=60, max_size=2)
+
+    answers = await asyncio.wait_for(
+        asyncio.gather(backend.translate("a"), backend.translate("b")),
+        timeout=1,
+    )
+    assert answers == ["SELECT 'a'", "SELECT 'b'"]
+    assert len(completions.requests) == 1
+
+@pytest.mark.asyncio
+async def test_single_question_uses_plain_request():
+    """Test that a lone question is sent without the batch prompt."""
+    completions = BatchCompletions()
+    backend = batching_backend(completions)
+
+    assert await backend.translate("alone") == "SELECT 'alone'"
+    assert completions.requests == ["alone"]
+
+@pytest.mark.asyncio
+async def test_mismatched_batch_falls_back_to_single_requests():
+    """Test that a batched answer that does not line up is retried per question."""
+    completions = BatchCompletions(broken_batches=True)
+    backend = batching_backend(completions)
+
+    answers = await asyncio.gather(backend.translate("a"), backend.translate("b"))
+
+    assert answers == ["SELECT 'a'", "SELECT 'b'"]
+    assert completions.requests[0] == json.dumps(["a", "b"])
+    assert sorted(completions.requests[1:]) == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_batches_are_kept_per_model():
+    """Test that questions for different models are never batched together."""
+    sent = []
+
+    async def send_batch(questions, model, deadline):
+        sent.append((model, questions))
+        return [f"{model}:{question}" for question in questions]
+
+    async def send_one(question, model, deadline):
+        sent.append((model, [question]))
+        return f"{model}:{question}"
+
+    batcher = TranslationBatcher(send_batch, send_one, window=0.01, max_size=16)
+    answers = await asyncio.gather(
+        batcher.submit("a", "small"),
+        batcher.submit("b", "large"),
+        batcher.submit("c", "small"),
+    )
+
+    assert answers == ["small:a", "large:b", "small:c"]
+    assert sorted(sent) == [("large", ["b"]), ("small", ["a", "c"])]
+
+@pytest.mark.asyncio
+async def test_batch_is_sent_with_the_earliest_deadline():
+    """Test that a batch is sent by the deadline of its most urgent question."""
+    deadlines = []
+
+    async def send_batch(questions, model, deadline):
+        deadlines.append(deadline)
+        return questions
+
+    async def send_one(question, model, deadline):
+        return question
+
+    batcher = TranslationBatcher(send_batch, send_one, window=0.01, max_size=16)
+    await asyncio.gather(
+        batcher.submit("a", "model", 20.0),
+        batcher.submit("b", "model", 10.0),
+        batcher.submit("c", "model"),
+    )
+    assert deadlines == [10.0]
+
+@pytest.mark.asyncio
+async def test_escalated_tiers_share_the_deadline(monkeypatch):
+    """Test that every tier of a batched translation is bound by the same deadline."""
+    client = SimpleNamespace(chat=SimpleNamespace(completions=BatchCompletions()))
+
+    async def escalate(sql):
+        return "check"
+
+    backend = LLMBackend(client, models=["small", "large"], check=escalate, batch_window=0.01)
+    deadlines = []
+    request = backend.request
+
+    async def recording_request(model, messages, deadline=None):
+        deadlines.append(deadline)
+        return await request(model, messages, deadline)
+
+    monkeypatch.setattr(backend, "request", recording_request)
+    assert await backend.translate("a") == "SELECT 'a'"
+    assert len(deadlines) == 2
+    assert deadlines[0] is not None and deadlines[0] == deadlines[1]
@@ -0,0 +1,82 @@
+"""Tests for the translation cache."""
+
+import pytest
+
+from src.services import query_service
+from src.services.query_service import QueryService
+from src.services.translation_cache import TranslationCache, normalize_question, translation_cache
+from src.settings import settings
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    """Start every test with an empty global cache."""
+    translation_cache.clear()
+    yield
+    translation_cache.clear()
+
+def test_normalize_question():
+    """Test that whitespace and trailing punctuation are ignored."""
+    assert normalize_question("  Show   ALL customers?? ") == "Show ALL customers"
+
+def test_questions_differing_in_case_are_cached_apart():
+    """Test that a value written in another case does not hit the cached translation."""
+    cache = TranslationCache(max_size=10, ttl=60)
+    cache.set("customers named Alice", "SELECT * FROM customers WHERE name = 'Alice'")
+    assert cache.get("customers named alice") is None
+    assert cache.get("customers  named Alice?") == "SELECT * FROM customers WHERE name = 'Alice'"
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = TranslationCache(max_size=2, ttl=60)
+    cache.set("a", "SELECT 1")
+    cache.set("b", "SELECT 2")
+    assert cache.get("a") == "SELECT 1"
+    cache.set("c", "SELECT 3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "SELECT 1"
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_expiration(monkeypatch):
+    """Test that entries expire after their TTL."""
+    cache = TranslationCache(max_size=10, ttl=5)
+    now = [1000.0]
+    monkeypatch.setattr("src.services.translation_cache.time.monotonic", lambda: now[0])
+    cache.set("a", "SELECT 1")
+    now[0] += 6
+
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_schema_version_scopes_keys(monkeypatch):
+    """Test that changing the schema version drops cached SQL."""
+    cache = TranslationCache(max_size=10, ttl=60)
+    monkeypatch.setattr(settings, "schema_version", "rev1")
+    cache.set("a", "SELECT 1")
+    monkeypatch.setattr(settings, "schema_version", "rev2")
+
+    assert cache.get("a") is None
+
+def test_todo_is_not_cached():
+    """Test that failed translations are retried instead of cached."""
+    cache = TranslationCache(max_size=10, ttl=60)
+    cache.set("a", "-- TODO")
+    assert cache.get("a") is None
+
+@pytest.mark.asyncio
+async def test_query_service_uses_cache(monkeypatch):
+    """Test that repeated questions only reach the translator once."""
+    calls = []
+
+    async def fake_translate(question):
+        calls.append(question)
+        return "-- BLOCKED"
+
+    monkeypatch.setattr(query_service, "translate", fake_translate)
+    service = QueryService(session=None)
+    hits = translation_cache.stats()["hits"]
+    await service.process_query("Show all customers", "test_key")
+    await service.process_query("Show  all customers?", "test_key")
+
+    assert calls == ["Show all customers"]
+    assert translation_cache.stats()["hits"] == hits + 1
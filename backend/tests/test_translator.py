@@ -0,0 +1,187 @@
+"""Tests for the translator backends and chain."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.models.customer import Base
+from src.translator import (
+    LLMBackend,
+    PatternBackend,
+    TranslatorBackend,
+    TranslationUnavailableError,
+    TranslatorChain,
+    create_translator_chain,
+)
+from src.utils.metrics import registry
+
+@pytest.fixture(scope="module")
+def patterns():
+    """Create a pattern backend for the application models."""
+    return PatternBackend(Base.metadata)
+
+class FakeCompletions:
+    """Chat completions stand-in answering every question with the same SQL."""
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=json.dumps({"sql": self.sql}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+class TieredCompletions:
+    """Chat completions stand-in answering with a fixed SQL (or raising an error) per model."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.models = []
+
+    async def create(self, model, **kwargs):
+        self.models.append(model)
+        if isinstance(self.answers[model], Exception):
+            raise self.answers[model]
+        message = SimpleNamespace(content=json.dumps({"sql": self.answers[model]}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+def tiered_backend(answers, check=None, **kwargs):
+    """Create a two-tier LLM backend over canned answers."""
+    completions = TieredCompletions(answers)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return LLMBackend(client, models=["small", "large"], check=check, **kwargs), completions
+
+class StaticBackend(TranslatorBackend):
+    """Backend giving a fixed answer."""
+
+    def __init__(self, name, answer):
+        self.name = name
+        self.answer = answer
+
+    async def translate(self, question):
+        return self.answer
+
+@pytest.mark.parametrize("question, sql", [
+    ("show all customers", "SELECT * FROM customers"),
+    ("How many customers are there?", "SELECT COUNT(*) AS count FROM customers"),
+    ("list customers named \"John O'Neil\"", "SELECT * FROM customers WHERE name = 'John O''Neil'"),
+    ("customers called O'Neil", "SELECT * FROM customers WHERE name = 'O''Neil'"),
+    ("show customer #7", "SELECT * FROM customers WHERE id = 7"),
+    ("customers with email bob@example.com", "SELECT * FROM customers WHERE email = 'bob@example.com'"),
+    ("latest 5 customers", "SELECT * FROM customers ORDER BY created_at DESC LIMIT 5"),
+])
+def test_pattern_backend_answers_common_questions(patterns, question, sql):
+    """Test that common question shapes are translated locally."""
+    assert patterns.match(question) == sql
+
+@pytest.mark.parametrize("question", [
+    "what is the average order value per region",
+    "customers with id abc",
+    "delete all customers",
+    "customers whose name is not John",
+    "customers whose email is null",
+    "customers whose name is John and email is x",
+    "customers named John or Jane",
+    "customers with email ending in gmail.com",
+    "customers whose email ends with gmail.com",
+    "customers whose name starts with Jo",
+    "customers whose name contains Jo",
+    "customers whose name like Jo",
+    "customers with id greater than 5",
+    "customers named John Smith",
+    "customers where id is ²",
+    "show customer #²",
+    "latest ٣ customers",
+])
+def test_pattern_backend_declines_other_questions(patterns, question):
+    """Test that unknown questions and values not fitting the column are declined."""
+    assert patterns.match(question) is None
+
+@pytest.mark.asyncio
+async def test_chain_falls_back_and_counts_hits(patterns):
+    """Test that the LLM only answers the questions the patterns decline."""
+    completions = FakeCompletions("SELECT name FROM customers ORDER BY name")
+    llm = LLMBackend(SimpleNamespace(chat=SimpleNamespace(completions=completions)), models=["test-model"])
+    chain = TranslatorChain([patterns, llm])
+
+    assert await chain.translate("count customers") == "SELECT COUNT(*) AS count FROM customers"
+    assert await chain.translate("customer names in alphabetical order") == "SELECT name FROM customers ORDER BY name"
+    assert completions.calls == 1
+    assert chain.hits == {"patterns": 1, "llm": 1}
+    assert chain.misses == {"patterns": 1, "llm": 0}
+
+@pytest.mark.asyncio
+async def test_chain_without_answer_returns_todo():
+    """Test that a chain whose backends all decline returns the TODO marker."""
+    chain = TranslatorChain([StaticBackend("none", None)])
+    assert await chain.translate("anything") == "-- TODO"
+    assert chain.stats()["none"]["misses"] == 1
+
+def test_create_translator_chain():
+    """Test building a chain from the TRANSLATOR_BACKENDS setting."""
+    chain = create_translator_chain("llm, patterns")
+    assert [backend.name for backend in chain.backends] == ["llm", "patterns"]
+    with pytest.raises(ValueError):
+        create_translator_chain("patterns,unknown")
+
+def routing_count(model, decision):
+    """Read a routing decision counter."""
+    return registry.get_sample_value(
+        "cloudlinker_translator_routing_total", {"model": model, "decision": decision}
+    ) or 0.0
+
+@pytest.mark.asyncio
+async def test_small_model_answer_is_kept():
+    """Test that a valid answer of the first tier is returned without escalation."""
+    before = routing_count("small", "answered")
+    backend, completions = tiered_backend({"small": "SELECT 1", "large": "SELECT 2"})
+    assert await backend.translate("question") == "SELECT 1"
+    assert completions.models == ["small"]
+    assert routing_count("small", "answered") == before + 1
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("small_answer, reason", [
+    ("-- TODO", "todo"),
+    ("SELECT 1; DROP TABLE customers", "unsafe"),
+])
+async def test_small_model_answer_is_escalated(small_answer, reason):
+    """Test that TODO and unsafe answers go to the next tier."""
+    before = routing_count("small", f"escalated_{reason}")
+    backend, completions = tiered_backend({"small": small_answer, "large": "SELECT 2"})
+    assert await backend.translate("question") == "SELECT 2"
+    assert completions.models == ["small", "large"]
+    assert routing_count("small", f"escalated_{reason}") == before + 1
+
+@pytest.mark.asyncio
+async def test_failed_check_is_escalated():
+    """Test that answers failing the EXPLAIN check go to the next tier, but not the last tier's."""
+    checked = []
+
+    async def check(sql):
+        checked.append(sql)
+        return "explain"
+
+    backend, completions = tiered_backend({"small": "SELECT nope FROM customers", "large": "SELECT 2"}, check)
+    assert await backend.translate("question") == "SELECT 2"
+    assert checked == ["SELECT nope FROM customers"]
+
+@pytest.mark.asyncio
+async def test_blocked_answer_is_not_escalated():
+    """Test that a refusal of the first tier is final."""
+    backend, completions = tiered_backend({"small": "-- BLOCKED", "large": "SELECT 2"})
+    assert await backend.translate("question") == "-- BLOCKED"
+    assert completions.models == ["small"]
+
+@pytest.mark.asyncio
+async def test_rejected_answer_is_not_returned_when_next_tier_is_unavailable():
+    """Test that an escalated answer is never the fallback of an unavailable tier."""
+    before = routing_count("large", "unavailable")
+    backend, completions = tiered_backend(
+        {"small": "SELECT 1; DROP TABLE customers", "large": RuntimeError("boom")}, max_attempts=1
+    )
+    with pytest.raises(TranslationUnavailableError):
+        await backend.translate("question")
+    assert completions.models == ["small", "large"]
+    assert routing_count("large", "unavailable") == before + 1